@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Agency crosswalk and budget / payments / payroll reconciliation.
+
+The same agency is spelled differently across sources and years:
+"Department of Human Services" (budgets) vs "Human Services Dept"
+(payroll), "Council for MN of African Heri" (truncated at 30 characters)
+vs "African Heritage Council". Every name is reduced to a token key
+(abbreviations expanded, generic words like Dept/Board/Office and the
+state name dropped, plurals folded, self-acronyms like "LCC" removed);
+equal keys are one agency. Leftover names are matched through an inverted
+token-prefix index, so a truncated token ("HERI") still pairs with its
+full form.
+
+The variance report joins per-agency, per-year budget, spend, payment and
+payroll totals in one pandas merge.
+
+Usage:
+    python scripts/agency_crosswalk.py [output_dir]
+
+Writes agency_crosswalk.csv, agency_variance.csv and org_agency_map_seed.sql
+(rows for checkbook.org_agency_map) to output_dir (default: current directory).
+"""
+
+import csv
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_DIR = ROOT / "minnesota_gov" / "Budget"
+PAYMENTS_DIR = ROOT / "minnesota_gov" / "Payments"
+PAYROLL_DIR = ROOT / "minnesota_gov" / "State Payrole"
+PAYROLL_AGENCY_LIST = Path(__file__).resolve().parent / "fy2025_agency_list.txt"
+
+# Source precedence for the canonical display name
+SOURCES = ('budgets', 'payments', 'payroll')
+
+ABBREVIATIONS = {
+    'DEPT': 'DEPARTMENT', 'BD': 'BOARD', 'COMM': 'COMMISSION', 'COMMN': 'COMMISSION',
+    'SVC': 'SERVICES', 'SVCS': 'SERVICES', 'SRVCS': 'SERVICES', 'SERV': 'SERVICES',
+    'MED': 'MEDICAL', 'LEG': 'LEGISLATIVE', 'PROF': 'PROFESSIONAL', 'STD': 'STANDARDS',
+    'ED': 'EDUCATION', 'TRG': 'TRAINING', 'RESRCH': 'RESEARCH', 'INNOVN': 'INNOVATION',
+    'AUTHRTY': 'AUTHORITY', 'FIN': 'FINANCE', 'DISCL': 'DISCLOSURE', 'INTERGOVT': 'INTERGOVERNMENTAL',
+    'MINN': 'MINNESOTA', 'MN': 'MINNESOTA', 'UNIV': 'UNIVERSITY', 'ATTY': 'ATTORNEY',
+}
+# Words that carry no identity once the rest of the name is known
+GENERIC_WORDS = {'OF', 'THE', 'FOR', 'ON', 'AND', 'MINNESOTA', 'STATE', 'DEPARTMENT', 'BOARD', 'OFFICE'}
+
+# Renamed agencies that share no words with their successor
+MANUAL_ALIASES = {
+    'Board of Teaching': 'Prof Educator Licensing Std Bd',
+}
+
+MIN_PREFIX = 3
+
+
+def agency_tokens(name: str) -> List[str]:
+    """Normalized, de-duplicated identity tokens of an agency name."""
+    text = re.sub(r"[’']S\b", '', name.upper())
+    text = text.replace('&', ' AND ')
+    raw = [t for t in re.split(r'[^A-Z0-9]+', text) if t]
+    tokens = []
+    for token in raw:
+        token = ABBREVIATIONS.get(token, token)
+        if token in GENERIC_WORDS:
+            continue
+        if len(token) > 3 and token.endswith('S') and not token.endswith('SS'):
+            token = token[:-1]
+        tokens.append(token)
+
+    # Drop a token that is the acronym of the others ("LCC-Leg Coordinating Comm")
+    for token in list(tokens):
+        others = [t for t in tokens if t != token]
+        if len(token) >= 2 and len(others) >= 2 and token == ''.join(t[0] for t in others)[:len(token)]:
+            tokens.remove(token)
+
+    return sorted(set(tokens))
+
+
+def agency_key(name: str) -> str:
+    return ' '.join(agency_tokens(name))
+
+
+def agency_id(name: str) -> str:
+    """URL-safe ID derived from the canonical display name."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def _prefix_match(a: List[str], b: List[str]) -> bool:
+    """Every token pairs with a distinct token it prefixes or is prefixed by."""
+    if len(a) != len(b):
+        return False
+    remaining = list(b)
+    for token in a:
+        match = next((t for t in remaining
+                      if min(len(t), len(token)) >= MIN_PREFIX and (t.startswith(token) or token.startswith(t))), None)
+        if match is None:
+            return False
+        remaining.remove(match)
+    return True
+
+
+def build_crosswalk(observations: Iterable[Tuple[str, int, str]]) -> List[Dict]:
+    """Build the crosswalk from (source, year, raw name) observations.
+
+    Returns one row per (source, source_name) with agency_id, canonical_name
+    and the years it was seen.
+    """
+    seen = defaultdict(set)
+    for source, year, name in observations:
+        if name and name.strip():
+            seen[(source, name.strip())].add(year)
+
+    names = sorted({name for _, name in seen})
+    alias_of = {name: MANUAL_ALIASES.get(name, name) for name in names}
+    keys = {name: agency_key(alias_of[name]) for name in names}
+
+    # Group exact keys, then merge near keys through the token-prefix index
+    by_key = defaultdict(list)
+    for name in names:
+        by_key[keys[name]].append(name)
+    key_list = sorted(by_key, key=lambda k: (-len(by_key[k]), k))
+    parent = {k: k for k in key_list}
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    index = defaultdict(set)
+    for key in key_list:
+        for token in key.split():
+            index[token[:MIN_PREFIX]].add(key)
+    for key in key_list:
+        tokens = key.split()
+        if not tokens:
+            continue
+        candidates = set.intersection(*(index[t[:MIN_PREFIX]] for t in tokens))
+        for other in candidates:
+            if other != key and _prefix_match(tokens, other.split()):
+                ra, rb = find(key), find(other)
+                if ra != rb:
+                    parent[max(ra, rb, key=key_list.index)] = min(ra, rb, key=key_list.index)
+
+    # Canonical display name: most recent budget spelling, else payments, else payroll
+    groups = defaultdict(list)
+    for (source, name), years in seen.items():
+        groups[find(keys[name])].append((source, name, years))
+
+    rows = []
+    for members in groups.values():
+        canonical = max(members, key=lambda m: (-SOURCES.index(m[0]), max(m[2]), m[1]))[1]
+        for source, name, years in members:
+            rows.append({
+                'agency_id': agency_id(canonical),
+                'canonical_name': canonical,
+                'source': source,
+                'source_name': name,
+                'first_year': min(years),
+                'last_year': max(years),
+            })
+    rows.sort(key=lambda r: (r['agency_id'], SOURCES.index(r['source']), r['source_name']))
+    return rows
+
+
+def load_budgets() -> pd.DataFrame:
+    frames = [pd.read_csv(p, encoding='utf-8-sig', usecols=['Budget Period', 'Agency', 'Budget Amount', 'Spend Amount'])
+              for p in sorted(BUDGET_DIR.glob('*_ALL_budgets.csv'))]
+    df = pd.concat(frames, ignore_index=True)
+    return df.rename(columns={'Budget Period': 'year', 'Agency': 'name',
+                              'Budget Amount': 'budget_amount', 'Spend Amount': 'spend_amount'})
+
+
+def load_payments() -> pd.DataFrame:
+    frames = [pd.read_csv(p, encoding='utf-8-sig', usecols=['Budget Period', 'Agency', 'Payment Amount'])
+              for p in sorted(PAYMENTS_DIR.glob('*_payments.csv'))]
+    df = pd.concat(frames, ignore_index=True)
+    return df.rename(columns={'Budget Period': 'year', 'Agency': 'name', 'Payment Amount': 'payment_amount'})
+
+
+def load_payroll() -> pd.DataFrame:
+    """Payroll agency wage totals from the workbooks, or FY2025 names only when they are absent."""
+    frames = []
+    for path in sorted(PAYROLL_DIR.glob('fiscal-year-*.xlsx')) if PAYROLL_DIR.exists() else []:
+        year = int(re.search(r'(\d{4})', path.stem).group(1))
+        xl = pd.ExcelFile(path)
+        hr_sheet = next((s for s in xl.sheet_names if 'HR INFO' in s), None)
+        earn_sheet = next((s for s in xl.sheet_names if 'EARNINGS' in s), None)
+        if not hr_sheet or not earn_sheet:
+            continue
+        hr = pd.read_excel(path, sheet_name=hr_sheet, usecols=['TEMPORARY_ID', 'AGENCY_NAME'])
+        earnings = pd.read_excel(path, sheet_name=earn_sheet, usecols=['TEMPORARY_ID', 'TOTAL_WAGES'])
+        earnings = earnings.drop_duplicates(subset=['TEMPORARY_ID'], keep='first')
+        # EARNINGS totals are per employee, so credit them once, to the first HR record's agency
+        hr = hr.drop_duplicates(subset=['TEMPORARY_ID'], keep='first')
+        df = hr.merge(earnings, on='TEMPORARY_ID', how='left')
+        df['TOTAL_WAGES'] = pd.to_numeric(df['TOTAL_WAGES'], errors='coerce').fillna(0)
+        frames.append(pd.DataFrame({'year': year, 'name': df['AGENCY_NAME'], 'payroll_wages': df['TOTAL_WAGES']}))
+
+    if not frames and PAYROLL_AGENCY_LIST.exists():
+        names = [n.strip() for n in PAYROLL_AGENCY_LIST.read_text().splitlines() if n.strip()]
+        frames.append(pd.DataFrame({'year': 2025, 'name': names, 'payroll_wages': float('nan')}))
+
+    if not frames:
+        return pd.DataFrame(columns=['year', 'name', 'payroll_wages'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def variance_report(crosswalk: List[Dict], budgets: pd.DataFrame, payments: pd.DataFrame,
+                    payroll: pd.DataFrame) -> pd.DataFrame:
+    """Per agency-year budget, spend, payments and payroll, with variance columns."""
+    lookup = pd.DataFrame(crosswalk)[['source', 'source_name', 'agency_id', 'canonical_name']]
+
+    def totals(df: pd.DataFrame, source: str, measures: List[str]) -> pd.DataFrame:
+        mapped = df.merge(lookup[lookup['source'] == source], left_on='name', right_on='source_name', how='inner')
+        return mapped.groupby(['agency_id', 'year'], as_index=False)[measures].sum(min_count=1)
+
+    report = totals(budgets, 'budgets', ['budget_amount', 'spend_amount'])
+    report = report.merge(totals(payments, 'payments', ['payment_amount']), on=['agency_id', 'year'], how='outer')
+    report = report.merge(totals(payroll, 'payroll', ['payroll_wages']), on=['agency_id', 'year'], how='outer')
+    names = lookup.drop_duplicates('agency_id').set_index('agency_id')['canonical_name']
+    report.insert(1, 'canonical_name', report['agency_id'].map(names))
+
+    report['spend_vs_budget'] = report['spend_amount'] / report['budget_amount'].where(report['budget_amount'] != 0)
+    report['payments_minus_spend'] = report['payment_amount'] - report['spend_amount']
+    report['payroll_share_of_spend'] = report['payroll_wages'] / report['spend_amount'].where(report['spend_amount'] != 0)
+    return report.sort_values(['agency_id', 'year']).round(4).reset_index(drop=True)
+
+
+def escape_sql(value) -> str:
+    if value is None:
+        return 'NULL'
+    if isinstance(value, int):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def seed_sql(crosswalk: List[Dict]) -> str:
+    lines = [
+        "-- Seed checkbook.org_agency_map",
+        "-- Generated by scripts/agency_crosswalk.py",
+        "",
+        "INSERT INTO checkbook.org_agency_map (source, source_name, agency_id, canonical_name, first_year, last_year)",
+        "VALUES",
+    ]
+    values = [
+        f"  ({', '.join(escape_sql(r[c]) for c in ('source', 'source_name', 'agency_id', 'canonical_name', 'first_year', 'last_year'))})"
+        for r in crosswalk
+    ]
+    lines.append(',\n'.join(values))
+    lines.append("ON CONFLICT (source, source_name) DO UPDATE SET")
+    lines.append("  agency_id = EXCLUDED.agency_id,")
+    lines.append("  canonical_name = EXCLUDED.canonical_name,")
+    lines.append("  first_year = EXCLUDED.first_year,")
+    lines.append("  last_year = EXCLUDED.last_year;")
+    return '\n'.join(lines) + '\n'
+
+
+def observations(frames: Dict[str, pd.DataFrame]) -> Iterable[Tuple[str, int, str]]:
+    for source, df in frames.items():
+        for year, name in df[['year', 'name']].drop_duplicates().itertuples(index=False):
+            if isinstance(name, str):
+                yield source, int(year), name
+
+
+if __name__ == "__main__":
+    output_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path('.')
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    frames = {'budgets': load_budgets(), 'payments': load_payments(), 'payroll': load_payroll()}
+    crosswalk = build_crosswalk(observations(frames))
+    report = variance_report(crosswalk, frames['budgets'], frames['payments'], frames['payroll'])
+
+    with open(output_dir / 'agency_crosswalk.csv', 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(crosswalk[0].keys()))
+        writer.writeheader()
+        writer.writerows(crosswalk)
+    report.to_csv(output_dir / 'agency_variance.csv', index=False)
+    (output_dir / 'org_agency_map_seed.sql').write_text(seed_sql(crosswalk), encoding='utf-8')
+
+    agencies = {r['agency_id'] for r in crosswalk}
+    renamed = defaultdict(set)
+    for r in crosswalk:
+        renamed[r['agency_id']].add(r['source_name'])
+    print(f"✅ Mapped {len(crosswalk)} source names to {len(agencies)} agencies "
+          f"({sum(len(v) > 1 for v in renamed.values())} with more than one spelling)")
+    print(f"   Variance rows: {len(report):,}")
+    print(f"   Wrote agency_crosswalk.csv, agency_variance.csv, org_agency_map_seed.sql to {output_dir}")
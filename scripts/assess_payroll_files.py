@@ -6,34 +6,20 @@ Outputs file locations, sizes, structure, row counts, column mapping, sample dat
 import os
 from pathlib import Path
 
-try:
-    import openpyxl
-except ImportError:
-    print("Run: pip install openpyxl")
-    raise
+from common import find_active_column, find_sheet_by_pattern, lazy_import
+
+openpyxl = lazy_import('openpyxl')
 
 ROOT = Path(__file__).resolve().parent.parent
 EXCEL_DIR = ROOT / "minnesota_gov" / "State Payrole"
 FISCAL_YEARS = [2020, 2021, 2022, 2023, 2024, 2025]
 
 
-def find_sheet_by_pattern(workbook, pattern: str):
-    for name in workbook.sheetnames:
-        if pattern.lower() in name.lower():
-            return name
-    return None
-
-
 def get_active_col(workbook):
     hr_name = find_sheet_by_pattern(workbook, "HR INFO")
     if not hr_name:
         return None
-    sheet = workbook[hr_name]
-    headers = [c.value for c in sheet[1]]
-    for h in headers:
-        if h and "ACTIVE_ON_JUNE_30" in str(h).upper():
-            return h
-    return None
+    return find_active_column(c.value for c in workbook[hr_name][1])
 
 
 def main():
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Content-addressed catalog for the GIS source files and everything derived
+from them.
+
+- Source files are identified by sha256 of their bytes (cached per path,
+  size and mtime, so unchanged files are not re-read). The three copies of
+  struc_school_buildings.gpkg are one asset.
+- Each GeoPackage layer also gets a content digest (schema + rows in fid
+  order), so the same layer shipped inside different files is detected.
+- Derived artifacts (GeoJSON, NDJSON rows, indexes, ...) are stored once
+  under objects/<key>, keyed by the input digest, artifact kind, build
+  parameters and DERIVE_VERSION. derive() returns the cached object when it
+  exists and only calls the builder otherwise.
+
+Everything lives under .cache/gis_assets (catalog.json + objects/).
+
+Usage:
+    python scripts/asset_store.py scan [root]
+    python scripts/asset_store.py build [geojson|ndjson] [root] [--srs EPSG]
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+GIS_DIR = ROOT / "minnesota_gov" / "GIS"
+STORE_DIR = ROOT / ".cache" / "gis_assets"
+
+SOURCE_SUFFIXES = {'.gpkg', '.geojson', '.json', '.md'}
+DERIVE_VERSION = 2
+CHUNK_SIZE = 1 << 20
+
+
+class AssetStore:
+    """Digest catalog plus a content-addressed object directory."""
+
+    def __init__(self, store_dir: Path = STORE_DIR):
+        self.store_dir = Path(store_dir)
+        self.objects_dir = self.store_dir / 'objects'
+        self.catalog_path = self.store_dir / 'catalog.json'
+        self.catalog = {'files': {}, 'layers': {}}
+        if self.catalog_path.exists():
+            self.catalog = json.loads(self.catalog_path.read_text(encoding='utf-8'))
+
+    def save(self) -> None:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.catalog_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.catalog, indent=2, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.catalog_path)
+
+    def file_digest(self, path: Path) -> str:
+        """sha256 of a file, reusing the catalog entry while size and mtime are unchanged."""
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = str(path.relative_to(ROOT)) if path.is_relative_to(ROOT) else str(path)
+        entry = self.catalog['files'].get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        self.catalog['files'][key] = {'sha256': digest.hexdigest(), 'size': stat.st_size,
+                                      'mtime_ns': stat.st_mtime_ns}
+        return digest.hexdigest()
+
+    def layer_digests(self, gpkg_path: Path) -> Dict[str, str]:
+        """{layer: digest} for every feature/attribute table, cached per file digest."""
+        file_sha = self.file_digest(gpkg_path)
+        cached = self.catalog['layers'].get(file_sha)
+        if cached is None:
+            cached = compute_layer_digests(gpkg_path)
+            self.catalog['layers'][file_sha] = cached
+        return cached
+
+    def object_path(self, key: str, suffix: str = '') -> Path:
+        return self.objects_dir / key[:2] / f"{key}{suffix}"
+
+    def derive(self, input_digest: str, kind: str, build: Callable[[Path], None],
+               params: Optional[Dict] = None, suffix: str = '') -> Path:
+        """Return the cached artifact for (input, kind, params), building it once if missing.
+
+        build(path) must write the artifact to path; it is written to a temp
+        file first and moved into place, so a failed build leaves no object.
+        """
+        key = artifact_key(input_digest, kind, params)
+        path = self.object_path(key, suffix)
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        try:
+            build(tmp)
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        return path
+
+
+def artifact_key(input_digest: str, kind: str, params: Optional[Dict] = None) -> str:
+    spec = json.dumps([DERIVE_VERSION, kind, input_digest, params or {}], sort_keys=True)
+    return hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+
+def compute_layer_digests(gpkg_path: Path) -> Dict[str, str]:
+    """Hash each layer's column schema and rows (in primary-key order)."""
+    conn = sqlite3.connect(f"file:{gpkg_path}?mode=ro", uri=True)
+    try:
+        digests = {}
+        tables = [r[0] for r in conn.execute(
+            "SELECT table_name FROM gpkg_contents WHERE data_type IN ('features', 'attributes') ORDER BY table_name")]
+        for table in tables:
+            digest = hashlib.sha256()
+            columns = [(name, declared) for _, name, declared, _, _, _ in conn.execute(f'PRAGMA table_info("{table}")')]
+            digest.update(repr(columns).encode('utf-8'))
+            for row in conn.execute(f'SELECT * FROM "{table}" ORDER BY 1'):
+                digest.update(repr(row).encode('utf-8'))
+            digests[table] = digest.hexdigest()
+        return digests
+    finally:
+        conn.close()
+
+
+def find_sources(root: Path = GIS_DIR) -> List[Path]:
+    return sorted(p for p in Path(root).rglob('*') if p.is_file() and p.suffix.lower() in SOURCE_SUFFIXES)
+
+
+def scan(store: AssetStore, root: Path = GIS_DIR):
+    """Digest every source file; returns ({sha256: [paths]}, {layer_digest: [(path, layer)]})."""
+    by_file = defaultdict(list)
+    by_layer = defaultdict(list)
+    for path in find_sources(root):
+        sha = store.file_digest(path)
+        by_file[sha].append(path)
+        if path.suffix.lower() == '.gpkg' and len(by_file[sha]) == 1:
+            for layer, digest in store.layer_digests(path).items():
+                by_layer[digest].append((path, layer))
+    store.save()
+    return dict(by_file), dict(by_layer)
+
+
+def unique_layers(store: AssetStore, paths: List[Path]) -> List[tuple]:
+    """(path, layer, layer_digest) for each distinct layer across the given GeoPackages."""
+    seen, layers = set(), []
+    for path in paths:
+        for layer, digest in store.layer_digests(path).items():
+            if digest not in seen:
+                seen.add(digest)
+                layers.append((path, layer, digest))
+    return layers
+
+
+def build_layer_artifact(path: Path, layer: str, kind: str, srs: Optional[int] = None) -> Callable[[Path], None]:
+    """Builder writing one layer as a GeoJSON FeatureCollection or gpkg_features NDJSON (layer CRS or srs)."""
+    from gpkg_ingest import discover_layers, iter_feature_batches
+
+    info = next(l for l in discover_layers(path) if l['layer'] == layer)
+
+    def build(out: Path) -> None:
+        with open(out, 'w', encoding='utf-8') as f:
+            if kind == 'ndjson':
+                for batch in iter_feature_batches(info, srs=srs):
+                    f.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in batch)
+                return
+            f.write('{"type": "FeatureCollection", "features": [\n')
+            first = True
+            for batch in iter_feature_batches(info, srs=srs):
+                for row in batch:
+                    feature = {'type': 'Feature', 'id': row['fid'], 'properties': row['properties'],
+                               'geometry': row['geometry']}
+                    f.write(('' if first else ',\n') + json.dumps(feature, ensure_ascii=False))
+                    first = False
+            f.write('\n]}\n')
+
+    return build
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'scan'
+    store = AssetStore()
+
+    if command == 'scan':
+        root = Path(sys.argv[2]) if len(sys.argv) > 2 else GIS_DIR
+        by_file, by_layer = scan(store, root)
+        print(f"📁 {sum(len(p) for p in by_file.values())} files, {len(by_file)} unique")
+        for sha, paths in sorted(by_file.items(), key=lambda kv: str(kv[1][0])):
+            if len(paths) > 1:
+                print(f"⚠️  {len(paths)} identical copies ({sha[:12]}):")
+                for path in paths:
+                    print(f"     {path.relative_to(ROOT)}")
+        for digest, places in by_layer.items():
+            if len(places) > 1:
+                names = ', '.join(f"{p.name}:{layer}" for p, layer in places)
+                print(f"⚠️  Identical layer in different files ({digest[:12]}): {names}")
+    elif command == 'build':
+        args = sys.argv[2:]
+        srs = None
+        if '--srs' in args:
+            idx = args.index('--srs')
+            try:
+                srs = int(args[idx + 1])
+            except (IndexError, ValueError):
+                print("Usage: python3 asset_store.py build [geojson|ndjson] [root] [--srs EPSG]")
+                sys.exit(1)
+            del args[idx:idx + 2]
+        kind = args[0] if args else 'geojson'
+        if kind not in ('geojson', 'ndjson'):
+            print("Usage: python3 asset_store.py build [geojson|ndjson] [root] [--srs EPSG]")
+            sys.exit(1)
+        root = Path(args[1]) if len(args) > 1 else GIS_DIR
+        params = {'srs': srs} if srs else None
+        built = cached = 0
+        for path, layer, digest in unique_layers(store, sorted(Path(root).rglob('*.gpkg'))):
+            target = store.object_path(artifact_key(digest, kind, params), f'.{kind}')
+            if target.exists():
+                cached += 1
+            else:
+                try:
+                    store.derive(digest, kind, build_layer_artifact(path, layer, kind, srs), params=params,
+                                 suffix=f'.{kind}')
+                except ValueError as e:
+                    print(f"Error: {layer}: {e}")
+                    sys.exit(1)
+                built += 1
+            print(f"  {layer} -> {target.relative_to(ROOT)}")
+        store.save()
+        print(f"✅ {built} built, {cached} already cached")
+    else:
+        print("Usage: python3 asset_store.py [scan|build] ...")
+        sys.exit(1)
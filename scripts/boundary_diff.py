@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Change detection between two releases of a boundary layer.
+
+Features are keyed by their stable ids and fingerprinted twice:
+
+    ctu               GNIS_FEATURE_ID + COUNTY_GNIS_FEATURE_ID (one row per
+                      city / county part, as in ctu_boundaries)
+    school_district   sdorgid
+    precinct          PrecinctID
+
+    attributes        sha256 of the properties (sorted JSON), ignoring
+                      OBJECTID and Shape_* fields
+    geometry          sha256 of the repaired geometry (geometry_validate),
+                      rounded to the layer precision (geometry_codec), with
+                      ring start, hole order and part order normalized, so
+                      a re-export of the same shapes hashes the same
+
+Matching by key gives unchanged / attribute_changed / geometry_changed
+(geometry wins when both changed; changed_fields lists the attributes).
+Leftover features whose geometry hash matches across releases are the same
+feature under a new key: attribute_changed with previous_key. Anything
+else is added or removed.
+
+The older release can be a snapshot (keys, properties and hashes only),
+so the previous files need not be kept. Deltas are NDJSON rows
+{layer, key, change, ...}; added and changed rows carry properties and
+GeoJSON geometry (release CRS, or --srs), removed rows only the key.
+
+Usage:
+    python scripts/boundary_diff.py snapshot <layer> <out.json> [source]
+    python scripts/boundary_diff.py diff <layer> <old: snapshot.json | source> [new source]
+                                    [--out deltas.ndjson] [--srs EPSG]
+
+A source is a GeoPackage (ctu, school_district) or a precinct directory;
+the new source defaults to the current file under minnesota_gov.
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from boundary_overlay import GPKG_LAYERS
+from geometry_codec import default_precision, encode_geometry
+from geometry_validate import repair_geometry
+from gpkg_geometry import decode_gpkg_geometry, geometry_column, iter_polygons, to_geojson
+from precinct_features import PRECINCT_DIR, iter_all_features, precinct_files, read_collection_metadata
+from reproject import WGS84, reproject_geometries
+
+KEY_FIELDS = {
+    'ctu': ('GNIS_FEATURE_ID', 'COUNTY_GNIS_FEATURE_ID'),
+    'school_district': ('sdorgid',),
+    'precinct': ('PrecinctID',),
+}
+IGNORED_ATTRIBUTES = {'objectid', 'fid', 'shape_length', 'shape_area', 'shape_leng'}
+CHANGE_TYPES = ('added', 'removed', 'attribute_changed', 'geometry_changed')
+
+
+class Feature(NamedTuple):
+    properties: Dict
+    attributes: str                 # attribute digest
+    geometry_digest: Optional[str]
+    geometry: Optional[dict] = None  # not kept in snapshots
+
+
+class Release:
+    """One release of a layer: label, CRS and features by key."""
+
+    def __init__(self, layer: str, label: Optional[str], srs_id: Optional[int], features: Dict[str, Feature]):
+        self.layer = layer
+        self.label = label
+        self.srs_id = srs_id
+        self.features = features
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def save_snapshot(self, path) -> None:
+        snapshot = {
+            'layer': self.layer,
+            'label': self.label,
+            'srs_id': self.srs_id,
+            'features': {key: {'properties': f.properties, 'attributes': f.attributes, 'geometry': f.geometry_digest}
+                         for key, f in self.features.items()},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+
+    @classmethod
+    def load_snapshot(cls, path) -> 'Release':
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        features = {key: Feature(v['properties'], v['attributes'], v['geometry'])
+                    for key, v in snapshot['features'].items()}
+        return cls(snapshot['layer'], snapshot.get('label'), snapshot.get('srs_id'), features)
+
+
+def attribute_digest(properties: Dict) -> str:
+    kept = {k: v for k, v in properties.items() if k.lower() not in IGNORED_ATTRIBUTES}
+    return hashlib.sha256(json.dumps(kept, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _canonical_ring(ring: np.ndarray, precision: int) -> np.ndarray:
+    """Round, drop repeats and rotate a closed ring to start at its smallest vertex."""
+    ring = np.round(ring[:-1], precision)
+    keep = np.ones(len(ring), dtype=bool)
+    keep[1:] = np.any(ring[1:] != ring[:-1], axis=1)
+    ring = ring[keep]
+    if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    start = int(np.lexsort((ring[:, 1], ring[:, 0]))[0]) if len(ring) else 0
+    ring = np.roll(ring, -start, axis=0)
+    return np.vstack([ring, ring[:1]])
+
+
+def geometry_digest(geometry: Optional[dict], srs_id: Optional[int]) -> Optional[str]:
+    """Order-independent hash of a geometry at the layer's stored precision; None when empty."""
+    repaired, _ = repair_geometry(geometry)
+    if not repaired:
+        return None
+    precision = default_precision(srs_id)
+    polygons = list(iter_polygons(repaired))
+    if polygons:
+        parts = []
+        for polygon in polygons:
+            rings = [_canonical_ring(r, precision) for r in polygon]
+            rings = rings[:1] + sorted(rings[1:], key=lambda r: r.tobytes())
+            parts.append(encode_geometry({'type': 'Polygon', 'coordinates': rings}, precision))
+    else:
+        parts = [encode_geometry(repaired, precision)]
+    digest = hashlib.sha256()
+    for part in sorted(parts):
+        digest.update(len(part).to_bytes(4, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _merge(geometries: List[Optional[dict]]) -> Optional[dict]:
+    """Combine the polygons of several features sharing a key into one MultiPolygon."""
+    polygons = [p for g in geometries if g for p in iter_polygons(g)]
+    return {'type': 'MultiPolygon', 'coordinates': polygons} if polygons else None
+
+
+def build_release(layer: str, label: Optional[str], srs_id: Optional[int], rows) -> Release:
+    """Key, merge and fingerprint (properties, geometry) rows."""
+    key_fields = KEY_FIELDS[layer]
+    grouped: Dict[str, List] = {}
+    for properties, geometry in rows:
+        values = [properties.get(f) for f in key_fields]
+        if any(v is None for v in values):
+            continue
+        grouped.setdefault(':'.join(str(v) for v in values), []).append((properties, geometry))
+
+    features = {}
+    for key, group in grouped.items():
+        if len(group) == 1:
+            properties, geometry = group[0]
+            attributes = attribute_digest(properties)
+        else:
+            properties = group[0][0]
+            attributes = attribute_digest({'parts': sorted(attribute_digest(p) for p, _ in group)})
+            geometry = _merge([g for _, g in group])
+        features[key] = Feature(properties, attributes, geometry_digest(geometry, srs_id), geometry)
+    return Release(layer, label, srs_id, features)
+
+
+def load_gpkg_release(layer: str, gpkg_path, table: str) -> Release:
+    conn = sqlite3.connect(f"file:{gpkg_path}?mode=ro", uri=True)
+    try:
+        geom_col, srs_id = geometry_column(conn, table)
+        row = conn.execute("SELECT last_change FROM gpkg_contents WHERE table_name = ?", (table,)).fetchone()
+        cursor = conn.execute(f'SELECT * FROM "{table}"')
+        columns = [d[0] for d in cursor.description]
+        geom_idx = columns.index(geom_col)
+        rows = []
+        for values in cursor:
+            properties = {c: v for i, (c, v) in enumerate(zip(columns, values))
+                          if i != geom_idx and not isinstance(v, bytes)}
+            rows.append((properties, decode_gpkg_geometry(values[geom_idx])))
+    finally:
+        conn.close()
+    return build_release(layer, row[0] if row else None, srs_id, rows)
+
+
+def load_precinct_release(precinct_dir=PRECINCT_DIR) -> Release:
+    paths = precinct_files(precinct_dir)
+    label = read_collection_metadata(paths[0]).get('date') if paths else None
+    rows = [(f.get('properties') or {}, f.get('geometry')) for f in iter_all_features(precinct_dir)]
+    return build_release('precinct', label, WGS84, rows)
+
+
+def load_release(layer: str, source=None) -> Release:
+    """Load a layer release from a snapshot JSON, a GeoPackage / precinct dir, or the current default."""
+    if source is not None and Path(source).suffix == '.json':
+        release = Release.load_snapshot(source)
+        if release.layer != layer:
+            raise ValueError(f"{source} is a {release.layer} snapshot, not {layer}")
+        return release
+    if layer == 'precinct':
+        return load_precinct_release(source or PRECINCT_DIR)
+    gpkg_path, table, _, _ = GPKG_LAYERS[layer]
+    return load_gpkg_release(layer, source or gpkg_path, table)
+
+
+def _in_crs(new: Release, srs_id: Optional[int]) -> Dict[str, Optional[str]]:
+    """New-release geometry digests, computed in srs_id when the releases' CRSs differ."""
+    if srs_id is None or new.srs_id is None or srs_id == new.srs_id:
+        return {key: f.geometry_digest for key, f in new.features.items()}
+    keys = list(new.features)
+    moved = reproject_geometries([new.features[k].geometry for k in keys], new.srs_id, srs_id)
+    return {key: geometry_digest(g, srs_id) for key, g in zip(keys, moved)}
+
+
+def diff_releases(old: Release, new: Release) -> List[Dict]:
+    """Classify every feature across two releases; unchanged features are left out."""
+    new_digests = _in_crs(new, old.srs_id)
+    changes = []
+
+    for key in sorted(new.features.keys() & old.features.keys()):
+        before, after = old.features[key], new.features[key]
+        geometry_changed = before.geometry_digest != new_digests[key]
+        if not geometry_changed and before.attributes == after.attributes:
+            continue
+        change = {'key': key, 'change': 'geometry_changed' if geometry_changed else 'attribute_changed'}
+        if before.attributes != after.attributes:
+            fields = before.properties.keys() | after.properties.keys()
+            change['changed_fields'] = sorted(f for f in fields if f.lower() not in IGNORED_ATTRIBUTES
+                                              and before.properties.get(f) != after.properties.get(f))
+        changes.append(change)
+
+    # Same shape under a new key: a re-keyed feature rather than remove + add
+    removed = sorted(old.features.keys() - new.features.keys())
+    added = sorted(new.features.keys() - old.features.keys())
+    by_geometry = {}
+    for key in removed:
+        digest = old.features[key].geometry_digest
+        if digest:
+            by_geometry.setdefault(digest, []).append(key)
+    rekeyed = set()
+    for key in added:
+        candidates = by_geometry.get(new_digests[key])
+        if candidates:
+            previous = candidates.pop(0)
+            rekeyed.add(previous)
+            fields = old.features[previous].properties.keys() | new.features[key].properties.keys()
+            changes.append({'key': key, 'change': 'attribute_changed', 'previous_key': previous,
+                            'changed_fields': sorted(
+                                f for f in fields if f.lower() not in IGNORED_ATTRIBUTES
+                                and old.features[previous].properties.get(f) != new.features[key].properties.get(f))})
+        else:
+            changes.append({'key': key, 'change': 'added'})
+    changes.extend({'key': key, 'change': 'removed'} for key in removed if key not in rekeyed)
+    return changes
+
+
+def delta_rows(changes: List[Dict], new: Release, srs: Optional[int] = None) -> List[Dict]:
+    """Attach properties and geometry (optionally reprojected) to every non-removed change."""
+    loaded = [c for c in changes if c['change'] != 'removed']
+    geometries = [new.features[c['key']].geometry for c in loaded]
+    if srs and new.srs_id and srs != new.srs_id:
+        geometries = reproject_geometries(geometries, new.srs_id, srs)
+    rows = []
+    geometry_by_key = {c['key']: g for c, g in zip(loaded, geometries)}
+    for change in changes:
+        row = {'layer': new.layer, **change}
+        if change['change'] != 'removed':
+            feature = new.features[change['key']]
+            row['properties'] = feature.properties
+            row['geometry'] = to_geojson(geometry_by_key[change['key']])
+            row['srs_id'] = srs or new.srs_id
+        rows.append(row)
+    return rows
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--out', '--srs'):
+        if flag in args:
+            idx = args.index(flag)
+            if idx + 1 >= len(args):
+                print("Usage: python3 boundary_diff.py diff <layer> <old> [new] [--out deltas.ndjson] [--srs EPSG]")
+                sys.exit(1)
+            options[flag] = args[idx + 1]
+            del args[idx:idx + 2]
+    if len(args) < 3 or args[0] not in ('snapshot', 'diff') or args[1] not in KEY_FIELDS:
+        print("Usage:")
+        print("  python3 boundary_diff.py snapshot <layer> <out.json> [source]")
+        print("  python3 boundary_diff.py diff <layer> <old> [new] [--out deltas.ndjson] [--srs EPSG]")
+        print(f"  layers: {', '.join(KEY_FIELDS)}")
+        sys.exit(1)
+    command, layer = args[0], args[1]
+
+    try:
+        srs = int(options['--srs']) if '--srs' in options else None
+        if command == 'snapshot':
+            release = load_release(layer, args[3] if len(args) > 3 else None)
+            release.save_snapshot(args[2])
+            print(f"✅ {layer} ({release.label}): {len(release):,} features -> {args[2]}")
+            return
+        old = load_release(layer, args[2])
+        new = load_release(layer, args[3] if len(args) > 3 else None)
+        rows = delta_rows(diff_releases(old, new), new, srs)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    counts = Counter(row['change'] for row in rows)
+    summary = ', '.join(f"{counts[c]:,} {c}" for c in CHANGE_TYPES)
+    unchanged = len(new) - counts['added'] - counts['attribute_changed'] - counts['geometry_changed']
+    print(f"📁 {layer}: {old.label} -> {new.label}: {summary}, {unchanged:,} unchanged")
+    if '--out' in options:
+        with open(options['--out'], 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        print(f"✅ {len(rows):,} deltas -> {options['--out']}")
+
+
+if __name__ == "__main__":
+    main()
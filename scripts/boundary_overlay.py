@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Polygon overlay of the boundary layers into many-to-many crosswalks:
+school districts, school attendance areas, cities (CTUs) and voting
+precincts, all in EPSG:26915 (precincts are projected from WGS84).
+
+For a pair of layers A and B, the boundary of each overlap A_i ∩ B_j is
+the part of A_i's boundary inside B_j plus the part of B_j's boundary
+inside A_i, so its area follows from Green's theorem without building the
+intersection polygons:
+
+  1. Candidate crossing edges come from an STR tree over B's edges; every
+     edge is split where it crosses (or runs along) an edge of the other
+     layer, so each piece lies wholly inside or outside any feature.
+  2. Pieces between two crossing / touching points form a run with one
+     containment status, classified by a batch point-in-polygon test of a
+     point just left of one piece (the interior side, rings being oriented).
+     A run of B lying along an edge of A is left to A's side so it counts
+     once.
+  3. Run cross products are summed per (A_i, B_j) pair with bincount.
+
+Overlaps below MIN_FRACTION of both features (slivers where layers from
+different sources disagree by a few metres) are dropped.
+
+Rows go to civic.boundary_crosswalks, keyed by
+(source_type, source_id, target_type, target_id).
+
+Usage:
+    python scripts/boundary_overlay.py [--dry-run] [--out rows.ndjson] [source:target ...]
+
+Example:
+    python scripts/boundary_overlay.py --out crosswalk.ndjson ctu:precinct
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from district_dissolve import oriented_rings
+from district_geocoder import JURISDICTION_GPKG, POINT_CHUNK_SIZE, PolygonLayer
+from geometry_measure import lonlat_to_utm
+from gpkg_geometry import decode_gpkg_geometry, geometry_column, iter_polygons
+from precinct_features import PRECINCT_DIR, iter_all_features
+from spatial_index import STRtree
+
+ROOT = Path(__file__).resolve().parent.parent
+GIS_DIR = ROOT / "minnesota_gov" / "GIS"
+SCHOOL_DISTRICT_GPKG = GIS_DIR / "School Data" / "school_districts" / "bdry_school_district_boundaries.gpkg"
+ATTENDANCE_AREA_GPKG = GIS_DIR / "gpkg_bdry_school_attendance_areas" / "bdry_school_attendance_areas.gpkg"
+
+# layer -> (GeoPackage, table, id column, name column)
+GPKG_LAYERS = {
+    'school_district': (SCHOOL_DISTRICT_GPKG, 'school_district_boundaries', 'sdorgid', 'prefname'),
+    'attendance_area': (ATTENDANCE_AREA_GPKG, 'school_attendance_areas', 'OBJECTID', 'elem_name'),
+    'ctu': (JURISDICTION_GPKG, 'City_Boundaries_in_Minnesota', 'GNIS_FEATURE_ID', 'FEATURE_NAME'),
+}
+OVERLAY_PAIRS = [
+    ('ctu', 'school_district'),
+    ('ctu', 'attendance_area'),
+    ('ctu', 'precinct'),
+    ('precinct', 'school_district'),
+    ('precinct', 'attendance_area'),
+]
+
+MIN_FRACTION = 0.001
+INTERIOR_OFFSET = 0.001   # metres; side-test points sit this far off each edge piece
+SPLIT_EPSILON = 1e-9      # edge parameter margin; splits closer to an end are ignored
+COLLINEAR_TOLERANCE = 1e-6
+BATCH_SIZE = 1000
+TARGET_SCHEMA = 'civic'
+TARGET_TABLE = 'boundary_crosswalks'
+
+
+class BoundaryLayer:
+    """Polygon features as oriented edges (exteriors CCW, holes CW) with a point-in-polygon index."""
+
+    def __init__(self, name: str, ids: List, names: List, geometries: List[Optional[dict]]):
+        self.name = name
+        # Features sharing an id (a city split across counties) become one multi-ring feature
+        rings_by_id, names_by_id = {}, {}
+        for fid, label, geometry in zip(ids, names, geometries):
+            rings = list(oriented_rings(geometry)) if geometry else []
+            if rings and fid is not None:
+                rings_by_id.setdefault(fid, []).extend(rings)
+                names_by_id.setdefault(fid, label)
+        self.ids = list(rings_by_id)
+        self.names = [names_by_id[fid] for fid in self.ids]
+
+        # Even-odd containment ignores nesting, so every ring can go in as one Polygon
+        polygons = [{'type': 'Polygon', 'coordinates': rings_by_id[fid]} for fid in self.ids]
+        self.polygons = PolygonLayer(name, [{} for _ in polygons], polygons, 26915)
+        self.edges = self.polygons.edges
+        self.edge_feature = self.polygons.edge_feature
+        self.edge_tree = self.polygons.edge_tree
+        ring_edges = [len(ring) - 1 for fid in self.ids for ring in rings_by_id[fid]]
+        self.ring_start = np.zeros(len(self.edges), dtype=bool)
+        self.ring_start[np.cumsum([0] + ring_edges[:-1]).astype(np.int64)] = True
+
+        self.origin = (self.polygons.boxes[:, :2] + self.polygons.boxes[:, 2:]) / 2
+        origin = self.origin[self.edge_feature]
+        self.area = np.bincount(self.edge_feature, _cross(self.edges[:, :2] - origin, self.edges[:, 2:] - origin),
+                                minlength=len(self)) / 2
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def contains_pairs(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(point_index, feature_index) for every feature containing a point, in chunks."""
+        hits_p, hits_f = [], []
+        for start in range(0, len(points), POINT_CHUNK_SIZE):
+            p, f = self.polygons.contains_pairs(points[start:start + POINT_CHUNK_SIZE])
+            hits_p.append(p + start)
+            hits_f.append(f)
+        if not hits_p:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(hits_p), np.concatenate(hits_f)
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[:, 0] * b[:, 0] + a[:, 1] * b[:, 1]
+
+
+def _point_segment_distance(points: np.ndarray, start: np.ndarray, direction: np.ndarray) -> np.ndarray:
+    length_sq = _dot(direction, direction)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip(np.where(length_sq > 0, _dot(points - start, direction) / length_sq, 0.0), 0.0, 1.0)
+    return np.hypot(*(points - start - t[:, None] * direction).T)
+
+
+def _edge_events(a_edges: np.ndarray, b_edges: np.ndarray, b_tree: STRtree):
+    """Find where A edges cross, touch or run along B edges.
+
+    Returns ((a_edge, t), (b_edge, u), a_touched, b_touched): split parameters
+    for both layers, and per-edge flags for edges whose start vertex lies on
+    an edge of the other layer.
+    """
+    boxes = np.column_stack([np.minimum(a_edges[:, 0], a_edges[:, 2]), np.minimum(a_edges[:, 1], a_edges[:, 3]),
+                             np.maximum(a_edges[:, 0], a_edges[:, 2]), np.maximum(a_edges[:, 1], a_edges[:, 3])])
+    ia, ib = b_tree.query_bboxes(boxes)
+    p, r = a_edges[ia, :2], a_edges[ia, 2:] - a_edges[ia, :2]
+    q, s = b_edges[ib, :2], b_edges[ib, 2:] - b_edges[ib, :2]
+    qp = q - p
+    denom = _cross(r, s)
+    r_len, s_len = np.hypot(*r.T), np.hypot(*s.T)
+    parallel = np.abs(denom) <= 1e-12 * r_len * s_len
+    valid = (r_len > 0) & (s_len > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = _cross(qp, s) / denom
+        u = _cross(qp, r) / denom
+        inside_t = (t > SPLIT_EPSILON) & (t < 1 - SPLIT_EPSILON)
+        inside_u = (u > SPLIT_EPSILON) & (u < 1 - SPLIT_EPSILON)
+        crossing = valid & ~parallel
+        a_split = [(ia[crossing & inside_t & (u >= 0) & (u <= 1)], t[crossing & inside_t & (u >= 0) & (u <= 1)])]
+        b_split = [(ib[crossing & inside_u & (t >= 0) & (t <= 1)], u[crossing & inside_u & (t >= 0) & (t <= 1)])]
+
+        # Overlapping collinear edges: split each at the other's end points
+        collinear = valid & parallel & (np.abs(_cross(qp, r)) <= COLLINEAR_TOLERANCE * r_len)
+        r2, s2 = _dot(r, r), _dot(s, s)
+        for t_end in (_dot(qp, r) / r2, _dot(qp + s, r) / r2):
+            keep = collinear & (t_end > SPLIT_EPSILON) & (t_end < 1 - SPLIT_EPSILON)
+            a_split.append((ia[keep], t_end[keep]))
+        for u_end in (_dot(-qp, s) / s2, _dot(r - qp, s) / s2):
+            keep = collinear & (u_end > SPLIT_EPSILON) & (u_end < 1 - SPLIT_EPSILON)
+            b_split.append((ib[keep], u_end[keep]))
+
+    # Vertices sitting on the other layer's boundary, where containment can change without a split
+    a_touched = np.zeros(len(a_edges), dtype=bool)
+    b_touched = np.zeros(len(b_edges), dtype=bool)
+    a_touched[ia[_point_segment_distance(p, q, s) <= COLLINEAR_TOLERANCE]] = True
+    b_touched[ib[_point_segment_distance(q, p, r) <= COLLINEAR_TOLERANCE]] = True
+
+    def stack(splits):
+        return np.concatenate([e for e, _ in splits]), np.concatenate([v for _, v in splits])
+
+    return stack(a_split), stack(b_split), a_touched, b_touched
+
+
+class _Pieces:
+    """Edges of one layer cut at the split points, grouped into runs.
+
+    A run is a stretch of ring between consecutive crossing / touching
+    points, so every piece in it has the same containment in the other
+    layer; only one representative (the longest piece) is tested. Per-run
+    sums of the pieces' cross products (about `shift`) and of their vectors
+    give any per-pair origin's Green's theorem term without revisiting pieces.
+    """
+
+    def __init__(self, layer: BoundaryLayer, split_edge: np.ndarray, split_t: np.ndarray,
+                 touched: np.ndarray, shift: np.ndarray):
+        edges = layer.edges
+        n = len(edges)
+        edge = np.concatenate([np.arange(n), np.arange(n), split_edge])
+        t = np.concatenate([np.zeros(n), np.ones(n), split_t])
+        order = np.lexsort((t, edge))
+        edge, t = edge[order], t[order]
+        piece = (edge[1:] == edge[:-1]) & (t[1:] > t[:-1])
+        edge, t0, t1 = edge[:-1][piece], t[:-1][piece], t[1:][piece]
+        origin, direction = edges[edge, :2] - shift, edges[edge, 2:] - edges[edge, :2]
+        start, end = origin + t0[:, None] * direction, origin + t1[:, None] * direction
+
+        begins = (t0 > 0) | ((t0 == 0) & (layer.ring_start[edge] | touched[edge]))
+        if len(begins):
+            begins[0] = True
+        run = np.cumsum(begins) - 1
+        n_runs = int(run[-1]) + 1 if len(run) else 0
+        length = np.hypot(*(end - start).T)
+        order = np.lexsort((-length, run))
+        first = np.r_[True, run[order][1:] != run[order][:-1]] if len(order) else np.zeros(0, dtype=bool)
+        rep = order[first]
+
+        self.feature = layer.edge_feature[edge[rep]]
+        self.start, self.end = start[rep] + shift, end[rep] + shift
+        self.cross = np.bincount(run, _cross(start, end), minlength=n_runs)
+        self.vector = np.column_stack([np.bincount(run, end[:, 0] - start[:, 0], minlength=n_runs),
+                                       np.bincount(run, end[:, 1] - start[:, 1], minlength=n_runs)])
+
+    def side_points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Points INTERIOR_OFFSET to the left and right of each representative piece's midpoint."""
+        d = self.end - self.start
+        length = np.hypot(*d.T)
+        normal = np.column_stack([-d[:, 1], d[:, 0]]) / np.where(length > 0, length, 1)[:, None]
+        mid = (self.start + self.end) / 2
+        return mid + INTERIOR_OFFSET * normal, mid - INTERIOR_OFFSET * normal
+
+    def twice_area(self, run: np.ndarray, origin: np.ndarray) -> np.ndarray:
+        """Sum over each run's pieces of cross(start - origin, end - origin); origin already shifted."""
+        return self.cross[run] - _cross(origin, self.vector[run])
+
+
+def overlay_areas(a: BoundaryLayer, b: BoundaryLayer) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (a_index, b_index, overlap area m²) for every pair of overlapping features."""
+    (a_split_edge, a_t), (b_split_edge, b_u), a_touched, b_touched = _edge_events(a.edges, b.edges, b.edge_tree)
+    shift = a.origin.mean(axis=0) if len(a) else np.zeros(2)
+
+    # Runs of A's boundary whose interior side lies inside a B feature
+    a_runs = _Pieces(a, a_split_edge, a_t, a_touched, shift)
+    left, _ = a_runs.side_points()
+    run_a, fb_a = b.contains_pairs(left)
+    fa_a = a_runs.feature[run_a]
+    twice_a = a_runs.twice_area(run_a, a.origin[fa_a] - shift)
+
+    # Runs of B's boundary strictly inside an A feature (both sides), so shared edges count once
+    b_runs = _Pieces(b, b_split_edge, b_u, b_touched, shift)
+    left, right = b_runs.side_points()
+    run_l, fa_l = a.contains_pairs(left)
+    run_r, fa_r = a.contains_pairs(right)
+    width = np.int64(max(len(a), 1))
+    both = np.intersect1d(run_l * width + fa_l, run_r * width + fa_r)
+    run_b, fa_b = both // width, both % width
+    fb_b = b_runs.feature[run_b]
+    twice_b = b_runs.twice_area(run_b, a.origin[fa_b] - shift)
+
+    key = np.concatenate([fa_a, fa_b]) * np.int64(len(b)) + np.concatenate([fb_a, fb_b])
+    keys, inverse = np.unique(key, return_inverse=True)
+    area = np.bincount(inverse.ravel(), np.concatenate([twice_a, twice_b]), minlength=len(keys)) / 2
+    positive = area > 0
+    keys, area = keys[positive], area[positive]
+    return keys // len(b), keys % len(b), area
+
+
+def crosswalk_rows(a: BoundaryLayer, b: BoundaryLayer, min_fraction: float = MIN_FRACTION) -> List[Dict]:
+    """civic.boundary_crosswalks rows for every non-sliver overlap of A (source) and B (target)."""
+    ia, ib, area = overlay_areas(a, b)
+    source_fraction = np.clip(area / a.area[ia], 0, 1)
+    target_fraction = np.clip(area / b.area[ib], 0, 1)
+    keep = np.maximum(source_fraction, target_fraction) >= min_fraction
+    rows = []
+    for i, j, overlap, fs, ft in zip(ia[keep], ib[keep], area[keep], source_fraction[keep], target_fraction[keep]):
+        rows.append({
+            'source_type': a.name,
+            'source_id': str(a.ids[i]),
+            'source_name': a.names[i],
+            'target_type': b.name,
+            'target_id': str(b.ids[j]),
+            'target_name': b.names[j],
+            'overlap_m2': round(float(overlap), 1),
+            'source_fraction': round(float(fs), 6),
+            'target_fraction': round(float(ft), 6),
+        })
+    return rows
+
+
+def load_gpkg_boundaries(name: str, gpkg_path, table: str, id_field: str, name_field: str) -> BoundaryLayer:
+    conn = sqlite3.connect(gpkg_path)
+    try:
+        geom_col, srs_id = geometry_column(conn, table)
+        if srs_id != 26915:
+            raise ValueError(f"{table} is EPSG:{srs_id}, expected EPSG:26915")
+        rows = conn.execute(f'SELECT "{id_field}", "{name_field}", "{geom_col}" FROM "{table}"').fetchall()
+    finally:
+        conn.close()
+    return BoundaryLayer(name, [r[0] for r in rows], [r[1] for r in rows],
+                         [decode_gpkg_geometry(r[2]) for r in rows])
+
+
+def project_polygons(geometry: Optional[dict]) -> Optional[dict]:
+    """Project a WGS84 (Multi)Polygon to UTM 15N with one lonlat_to_utm call per feature."""
+    if not geometry:
+        return None
+    polygons = list(iter_polygons(geometry))
+    rings = [ring for polygon in polygons for ring in polygon]
+    if not rings:
+        return None
+    projected = iter(np.split(lonlat_to_utm(np.concatenate(rings)), np.cumsum([len(r) for r in rings])[:-1]))
+    return {'type': 'MultiPolygon', 'coordinates': [[next(projected) for _ in polygon] for polygon in polygons]}
+
+
+def load_precinct_boundaries(precinct_dir=PRECINCT_DIR) -> BoundaryLayer:
+    ids, names, geometries = [], [], []
+    for feature in iter_all_features(precinct_dir):
+        props = feature.get('properties') or {}
+        ids.append(props.get('PrecinctID'))
+        names.append(props.get('Precinct'))
+        geometries.append(project_polygons(feature.get('geometry')))
+    return BoundaryLayer('precinct', ids, names, geometries)
+
+
+def load_layer(name: str) -> BoundaryLayer:
+    if name == 'precinct':
+        return load_precinct_boundaries()
+    return load_gpkg_boundaries(name, *GPKG_LAYERS[name])
+
+
+def main():
+    args = sys.argv[1:]
+    dry_run = '--dry-run' in args
+    out_path = None
+    if '--out' in args:
+        idx = args.index('--out')
+        if idx + 1 >= len(args):
+            print("Usage: python3 boundary_overlay.py [--dry-run] [--out rows.ndjson] [source:target ...]")
+            sys.exit(1)
+        out_path = args[idx + 1]
+        del args[idx:idx + 2]
+
+    known = set(GPKG_LAYERS) | {'precinct'}
+    pairs = [tuple(a.split(':', 1)) for a in args if not a.startswith('--')] or OVERLAY_PAIRS
+    for pair in pairs:
+        if len(pair) != 2 or not set(pair) <= known:
+            print(f"Error: unknown layer pair {':'.join(pair)} (layers: {', '.join(sorted(known))})")
+            sys.exit(1)
+    for name in {n for pair in pairs for n in pair} - {'precinct'}:
+        if not Path(GPKG_LAYERS[name][0]).exists():
+            print(f"Error: GeoPackage not found: {GPKG_LAYERS[name][0]}")
+            sys.exit(1)
+
+    layers: Dict[str, BoundaryLayer] = {}
+    rows = []
+    for source, target in pairs:
+        for name in (source, target):
+            if name not in layers:
+                layers[name] = load_layer(name)
+                print(f"📁 {name}: {len(layers[name]):,} features, {len(layers[name].edges):,} edges")
+        pair_rows = crosswalk_rows(layers[source], layers[target])
+        rows.extend(pair_rows)
+        print(f"✅ {source} × {target}: {len(pair_rows):,} overlaps")
+
+    if out_path:
+        with open(out_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        print(f"✅ {len(rows):,} rows -> {out_path}")
+        return
+
+    from common import supabase_client
+
+    supabase = supabase_client(dry_run=dry_run)
+    table = supabase.schema(TARGET_SCHEMA).from_(TARGET_TABLE)
+    for start in range(0, len(rows), BATCH_SIZE):
+        table.upsert(rows[start:start + BATCH_SIZE], on_conflict='source_type,source_id,target_type,target_id').execute()
+    print(f"✅ {len(rows):,} rows -> {TARGET_SCHEMA}.{TARGET_TABLE}")
+    if dry_run and supabase.report():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Precomputed checkbook rollups, accumulated by the importers in the same pass
+that parses the source rows.
+
+Each Rollup sums a set of measure columns per key tuple (e.g. agency × fiscal
+year × fund × program) and counts rows (and optionally distinct values), so
+dashboard totals become key lookups in the *_rollups tables instead of scans
+over checkbook.budgets / payments / payroll.
+
+Rollups are upserted on their key columns, so re-importing a year overwrites
+its rows rather than adding to them.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+BATCH_SIZE = 1000
+
+
+class Rollup:
+    """Sum `measures` and count rows per distinct value of `keys`.
+
+    Measures listed in `once_measures` are added only for the first record of
+    each `once_per` value within a key (for source rows that repeat a per-entity
+    total on every record).
+    """
+
+    def __init__(self, table: str, keys: Sequence[str], measures: Sequence[str],
+                 count_column: Optional[str] = 'row_count', distinct: Optional[Dict[str, str]] = None,
+                 once_per: Optional[str] = None, once_measures: Sequence[str] = ()):
+        self.table = table
+        self.keys = tuple(keys)
+        self.measures = tuple(measures)
+        self.count_column = count_column
+        self.distinct = dict(distinct or {})
+        self.once_per = once_per
+        self._once = {i for i, measure in enumerate(self.measures) if measure in set(once_measures)}
+        self._sums: Dict[tuple, List[float]] = {}
+        self._counts: Dict[tuple, int] = {}
+        self._sets: Dict[tuple, Dict[str, set]] = {}
+        self._seen: Dict[tuple, set] = {}
+
+    def add(self, record: Dict) -> None:
+        key = tuple(record.get(k) for k in self.keys)
+        sums = self._sums.get(key)
+        if sums is None:
+            sums = self._sums[key] = [0.0] * len(self.measures)
+            self._counts[key] = 0
+            self._sets[key] = {column: set() for column in self.distinct}
+            self._seen[key] = set()
+        first = True
+        if self.once_per is not None:
+            entity = record.get(self.once_per)
+            first = entity not in self._seen[key]
+            self._seen[key].add(entity)
+        for i, measure in enumerate(self.measures):
+            if first or i not in self._once:
+                sums[i] += record.get(measure) or 0.0
+        self._counts[key] += 1
+        for column, field in self.distinct.items():
+            value = record.get(field)
+            if value is not None:
+                self._sets[key][column].add(value)
+
+    def add_all(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self._sums)
+
+    def rows(self) -> List[Dict]:
+        """Return one record per key, with sums rounded to cents."""
+        rows = []
+        for key, sums in self._sums.items():
+            row = dict(zip(self.keys, key))
+            row.update({measure: round(total, 2) for measure, total in zip(self.measures, sums)})
+            if self.count_column:
+                row[self.count_column] = self._counts[key]
+            row.update({column: len(values) for column, values in self._sets[key].items()})
+            rows.append(row)
+        return rows
+
+
+def budget_rollup() -> Rollup:
+    """Agency × budget period × fund × program totals for checkbook.budgets."""
+    return Rollup(
+        'budget_rollups',
+        keys=('budget_period', 'agency', 'fund', 'program'),
+        measures=('available_amount', 'obligated_amount', 'spend_amount', 'remaining_amount',
+                  'budget_amount', 'budget_remaining_amount'),
+    )
+
+
+def payment_rollup() -> Rollup:
+    """Agency × budget period totals for checkbook.payments."""
+    return Rollup(
+        'payment_rollups',
+        keys=('budget_period', 'agency'),
+        measures=('payment_amount',),
+        distinct={'payee_count': 'payee_id'},
+    )
+
+
+def payroll_rollup() -> Rollup:
+    """Fiscal year × agency × bargaining unit × county wage totals, headcount and FTE.
+
+    The importers write one row per HR record with the employee's full earnings
+    on each, so wages are summed once per temporary_id and headcount counts
+    distinct employees; FTE is per position and sums over every record.
+    """
+    wages = ('regular_wages', 'overtime_wages', 'other_wages', 'total_wages')
+    return Rollup(
+        'payroll_rollups',
+        keys=('fiscal_year', 'agency_name', 'bargaining_unit_name', 'location_county_name'),
+        measures=wages + ('position_fte',),
+        count_column=None,
+        distinct={'headcount': 'temporary_id'},
+        once_per='temporary_id',
+        once_measures=wages,
+    )
+
+
+def upload_rollup(supabase, rollup: Rollup) -> int:
+    """Upsert a rollup's rows into checkbook.<table>, overwriting existing keys."""
+    rows = rollup.rows()
+    on_conflict = ','.join(rollup.keys)
+    for i in range(0, len(rows), BATCH_SIZE):
+        supabase.schema('checkbook').from_(rollup.table).upsert(
+            rows[i:i + BATCH_SIZE],
+            on_conflict=on_conflict,
+        ).execute()
+    print(f"  Rollup {rollup.table}: {len(rows):,} rows upserted")
+    return len(rows)
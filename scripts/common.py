@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Shared startup helpers for the import scripts.
+
+- lazy_import: heavy dependencies (supabase, pandas, openpyxl) are only
+  imported when first used, so parsing, dry runs and file inspection don't
+  pay for pandas or the HTTP stack.
+- load_env / supabase_client: one .env.local / .env loader and one client
+  factory with the usual error messages (or the local dry-run sink).
+- Excel cell parsers and sheet lookup shared by the payroll scripts.
+"""
+
+import importlib
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_env_loaded = False
+
+
+class LazyModule:
+    """Module proxy that imports on first attribute access."""
+
+    def __init__(self, name: str, install_hint: Optional[str] = None):
+        self._name = name
+        self._install_hint = install_hint or name.split('.')[0]
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError:
+                print(f"Error: {self._name} not installed. Run: pip install {self._install_hint}")
+                sys.exit(1)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazy_import(name: str, install_hint: Optional[str] = None) -> LazyModule:
+    return LazyModule(name, install_hint)
+
+
+def load_env() -> None:
+    """Load .env.local, then .env (existing variables win), once per process."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    for name in ('.env.local', '.env'):
+        path = ROOT / name
+        if path.exists():
+            load_dotenv(path)
+
+
+def supabase_client(dry_run: bool = False):
+    """Create a service-role Supabase client from the environment, exiting on misconfiguration.
+
+    With dry_run, returns a dry_run.DryRunClient that validates and counts
+    writes locally instead (no credentials needed).
+    """
+    if dry_run:
+        from dry_run import DryRunClient
+        return DryRunClient()
+
+    load_env()
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL') or os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_SERVICE_KEY')
+
+    if not supabase_url:
+        print("Error: NEXT_PUBLIC_SUPABASE_URL not set in environment")
+        sys.exit(1)
+
+    if not supabase_key:
+        print("Error: SUPABASE_SERVICE_ROLE_KEY not set in environment")
+        sys.exit(1)
+
+    create_client = lazy_import('supabase', 'supabase python-dotenv').create_client
+    try:
+        return create_client(supabase_url, supabase_key)
+    except Exception as e:
+        print(f"Error creating Supabase client: {e}")
+        sys.exit(1)
+
+
+def find_sheet_by_pattern(workbook, pattern: str) -> Optional[str]:
+    """Find sheet name containing pattern (workbook or list of sheet names)."""
+    names = getattr(workbook, 'sheetnames', None) or getattr(workbook, 'sheet_names', None) or workbook
+    for sheet_name in names:
+        if pattern.lower() in sheet_name.lower():
+            return sheet_name
+    return None
+
+
+def find_active_column(headers: Iterable) -> Optional[str]:
+    """Get the ACTIVE_ON_JUNE_30 column name (varies by year)."""
+    for col_name in headers:
+        if col_name and 'ACTIVE_ON_JUNE_30' in str(col_name).upper():
+            return col_name
+    return None
+
+
+def parse_cell_integer(value) -> Optional[int]:
+    """Parse value to integer, return None if invalid."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return int(value)
+        except (ValueError, TypeError):
+            return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value or value == '-':
+            return None
+        try:
+            return int(float(value))
+        except (ValueError, TypeError):
+            return None
+    return None
+
+
+def parse_cell_float(value) -> Optional[float]:
+    """Parse value to float, return None if invalid."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value or value == '-':
+            return None
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+    return None
+
+
+def parse_cell_text(value) -> Optional[str]:
+    """Normalize text field: empty strings become None."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return str(value).strip() if value else None
+    if isinstance(value, str):
+        value = value.strip()
+        return value if value and value != '-' else None
+    return None
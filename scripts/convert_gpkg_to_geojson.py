@@ -2,6 +2,9 @@
 """
 Convert GeoPackage CTU boundaries to GeoJSON
 Uses sqlite3 to read the GeoPackage and converts geometry to GeoJSON
+
+--bbox minx,miny,maxx,maxy (GeoPackage CRS) and --county NAME limit the
+output to one region; the bbox goes through the GeoPackage R-tree.
 """
 
 import sqlite3
@@ -9,6 +12,8 @@ import json
 import sys
 from pathlib import Path
 
+from gpkg_geometry import parse_region_args, select_features
+
 def extract_geometry_from_blob(blob):
     """Extract geometry from GeoPackage blob format"""
     # GeoPackage stores geometry in a binary format
@@ -22,33 +27,28 @@ def extract_geometry_from_blob(blob):
     # For now, return None and let ogr2ogr handle it, or use a proper library
     return None
 
-def convert_gpkg_to_geojson(gpkg_path, output_path):
+def convert_gpkg_to_geojson(gpkg_path, output_path, bbox=None, county=None):
     """Convert GeoPackage to GeoJSON"""
     conn = sqlite3.connect(gpkg_path)
-    cursor = conn.cursor()
     
-    # Get all CTU records
-    cursor.execute("""
-        SELECT 
-            CTU_CLASS,
-            FEATURE_NAME,
-            GNIS_FEATURE_ID,
-            COUNTY_NAME,
-            COUNTY_CODE,
-            COUNTY_GNIS_FEATURE_ID,
-            POPULATION,
-            Acres,
-            SHAPE
-        FROM city_township_unorg
-        WHERE CTU_CLASS IS NOT NULL
+    # Get CTU records (only the requested region's features)
+    where = """CTU_CLASS IS NOT NULL
             AND FEATURE_NAME IS NOT NULL
             AND COUNTY_NAME IS NOT NULL
-            AND COUNTY_NAME != 'NV'
-        ORDER BY CTU_CLASS, FEATURE_NAME
-    """)
+            AND COUNTY_NAME != 'NV'"""
+    params = []
+    if county:
+        where += " AND UPPER(COUNTY_NAME) = UPPER(?)"
+        params.append(county)
+    rows = select_features(
+        conn, 'city_township_unorg',
+        ['CTU_CLASS', 'FEATURE_NAME', 'GNIS_FEATURE_ID', 'COUNTY_NAME', 'COUNTY_CODE',
+         'COUNTY_GNIS_FEATURE_ID', 'POPULATION', 'Acres'],
+        bbox=bbox, where=where, params=params, order_by='CTU_CLASS, FEATURE_NAME',
+    )
     
     features = []
-    for row in cursor.fetchall():
+    for row in rows:
         ctu_class, feature_name, gnis_id, county_name, county_code, county_gnis_id, population, acres, shape_blob = row
         
         # Skip invalid records
@@ -91,8 +91,13 @@ def convert_gpkg_to_geojson(gpkg_path, output_path):
     return len(features)
 
 if __name__ == "__main__":
-    gpkg_path = sys.argv[1] if len(sys.argv) > 1 else "minnesota_gov/gpkg_bdry_mn_city_township_unorg/bdry_mn_city_township_unorg.gpkg"
-    output_path = sys.argv[2] if len(sys.argv) > 2 else "temp_ctu_geojson.json"
+    try:
+        args, bbox, county = parse_region_args(sys.argv[1:])
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    gpkg_path = args[0] if len(args) > 0 else "minnesota_gov/gpkg_bdry_mn_city_township_unorg/bdry_mn_city_township_unorg.gpkg"
+    output_path = args[1] if len(args) > 1 else "temp_ctu_geojson.json"
     
-    convert_gpkg_to_geojson(gpkg_path, output_path)
+    convert_gpkg_to_geojson(gpkg_path, output_path, bbox=bbox, county=county)
 
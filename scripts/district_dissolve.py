@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Dissolve precinct polygons into district polygons by any attribute key.
+
+Every ring is oriented (exteriors counter-clockwise, holes clockwise) and
+broken into directed edges over a shared vertex table. An edge shared by
+two neighbouring precincts appears once in each direction, so dissolving a
+group is cancelling each edge against its reverse; whatever is left is the
+group's outline, which is stitched back into rings and re-nested into
+polygons with holes. Coordinates are snapped to the source resolution
+first so shared vertices compare equal.
+
+Usage:
+    python scripts/district_dissolve.py <key> <output_geojson> [precinct_dir]
+
+Example:
+    python scripts/district_dissolve.py MNSenDist senate_districts.geojson
+"""
+
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from gpkg_geometry import iter_polygons
+from precinct_features import PRECINCT_DIR, iter_all_features
+from spatial_index import STRtree
+
+# Precinct files declare "xy_coordinate_resolution": 0.0001
+PRECINCT_PRECISION = 4
+
+
+def _signed_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0] - ring[0, 0], ring[:, 1] - ring[0, 1]
+    return float((x[:-1] * y[1:] - x[1:] * y[:-1]).sum() / 2)
+
+
+def oriented_rings(geometry: dict, precision: Optional[int] = None) -> Iterable[np.ndarray]:
+    """Yield closed rings with exteriors counter-clockwise and holes clockwise; degenerate rings dropped."""
+    for polygon in iter_polygons(geometry):
+        for ring_idx, ring in enumerate(polygon):
+            if precision is not None:
+                ring = np.round(ring, precision)
+            if len(ring) < 3:
+                continue
+            if not np.array_equal(ring[0], ring[-1]):
+                ring = np.vstack([ring, ring[:1]])
+            area = _signed_area(ring)
+            if area == 0:
+                continue
+            # Exterior rings counter-clockwise, holes clockwise
+            if (ring_idx == 0) != (area > 0):
+                ring = ring[::-1]
+            yield ring
+
+
+def _ring_edges(rings: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (vertices, from_idx, to_idx) for every directed ring edge over a shared vertex table."""
+    coords = np.concatenate(rings)
+    vertices, inverse = np.unique(coords, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    # Edge i runs from vertex i to vertex i + 1 unless i closes its ring
+    is_edge = np.ones(len(coords) - 1, dtype=bool)
+    is_edge[np.cumsum([len(r) for r in rings])[:-1] - 1] = False
+    start, end = inverse[:-1][is_edge], inverse[1:][is_edge]
+    keep = start != end
+    return vertices, start[keep].astype(np.int64), end[keep].astype(np.int64)
+
+
+def _cancel_shared_edges(start: np.ndarray, end: np.ndarray, n_vertices: int) -> np.ndarray:
+    """Return a mask of directed edges left after cancelling each edge against its reverse."""
+    n = np.int64(n_vertices)
+    forward = start * n + end
+
+    keys, counts = np.unique(forward, return_counts=True)
+    reverse_keys = (keys % n) * n + keys // n
+    pos = np.clip(np.searchsorted(keys, reverse_keys), 0, len(keys) - 1)
+    net = counts - np.where(keys[pos] == reverse_keys, counts[pos], 0)
+
+    # Keep the first `net` occurrences of each directed edge
+    order = np.argsort(forward, kind='stable')
+    sorted_forward = forward[order]
+    rank = np.empty(len(forward), dtype=np.int64)
+    rank[order] = np.arange(len(forward)) - np.searchsorted(sorted_forward, sorted_forward)
+    return rank < net[np.searchsorted(keys, forward)]
+
+
+def _split_t_junctions(vertices: np.ndarray, start: np.ndarray, end: np.ndarray,
+                       tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Split edges at vertices of other edges lying on them, so both sides share vertices."""
+    a, b = vertices[start], vertices[end]
+    boxes = np.column_stack([np.minimum(a, b) - tolerance, np.maximum(a, b) + tolerance])
+    candidates = np.unique(np.concatenate([start, end]))
+    point_idx, edge_idx = STRtree.build(boxes).query_points(vertices[candidates])
+    vertex = candidates[point_idx]
+    keep = (vertex != start[edge_idx]) & (vertex != end[edge_idx])
+    vertex, edge_idx = vertex[keep], edge_idx[keep]
+
+    d = b[edge_idx] - a[edge_idx]
+    rel = vertices[vertex] - a[edge_idx]
+    length_sq = (d * d).sum(axis=1)
+    t = (rel * d).sum(axis=1) / length_sq
+    distance = np.abs(d[:, 0] * rel[:, 1] - d[:, 1] * rel[:, 0]) / np.sqrt(length_sq)
+    on_edge = (distance <= tolerance) & (t > 0) & (t < 1)
+    if not on_edge.any():
+        return start, end
+    vertex, edge_idx, t = vertex[on_edge], edge_idx[on_edge], t[on_edge]
+
+    # Rebuild each edge as start -> split points (by t) -> end
+    n_edges = len(start)
+    all_edge = np.concatenate([np.arange(n_edges), np.arange(n_edges), edge_idx])
+    all_t = np.concatenate([np.zeros(n_edges), np.ones(n_edges), t])
+    all_vertex = np.concatenate([start, end, vertex])
+    order = np.lexsort((all_t, all_edge))
+    all_edge, all_vertex = all_edge[order], all_vertex[order]
+    same_edge = all_edge[:-1] == all_edge[1:]
+    new_start, new_end = all_vertex[:-1][same_edge], all_vertex[1:][same_edge]
+    keep = new_start != new_end
+    return new_start[keep], new_end[keep]
+
+
+def _boundary_edges(rings: List[np.ndarray], tolerance: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Cancel shared edges; return (vertices, from_idx, to_idx) of the outline edges."""
+    vertices, start, end = _ring_edges(rings)
+    survive = _cancel_shared_edges(start, end, len(vertices))
+    start, end = start[survive], end[survive]
+    if len(start):
+        # Neighbours don't always share every vertex; split and cancel again
+        start, end = _split_t_junctions(vertices, start, end, tolerance)
+        survive = _cancel_shared_edges(start, end, len(vertices))
+        start, end = start[survive], end[survive]
+    return vertices, start, end
+
+
+def _stitch_rings(vertices: np.ndarray, start: np.ndarray, end: np.ndarray) -> List[np.ndarray]:
+    outgoing = defaultdict(list)
+    for edge_idx, vertex in enumerate(start.tolist()):
+        outgoing[vertex].append(edge_idx)
+
+    used = np.zeros(len(start), dtype=bool)
+    end_list = end.tolist()
+    rings = []
+    for first in range(len(start)):
+        if used[first]:
+            continue
+        path = [int(start[first])]
+        edge = first
+        while edge is not None and not used[edge]:
+            used[edge] = True
+            vertex = end_list[edge]
+            path.append(vertex)
+            if vertex == path[0]:
+                break
+            edge = next((e for e in outgoing[vertex] if not used[e]), None)
+        if len(path) >= 4 and path[0] == path[-1]:
+            rings.append(vertices[path])
+    return rings
+
+
+def _ring_contains(ring: np.ndarray, x: float, y: float) -> bool:
+    x0, y0, x1, y1 = ring[:-1, 0], ring[:-1, 1], ring[1:, 0], ring[1:, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crosses = ((y0 > y) != (y1 > y)) & (x < (x1 - x0) * (y - y0) / (y1 - y0) + x0)
+    return bool(crosses.sum() % 2)
+
+
+def _assemble_polygons(rings: List[np.ndarray]) -> List[List[np.ndarray]]:
+    """Nest clockwise rings (holes) inside the smallest counter-clockwise ring containing them."""
+    shells, holes = [], []
+    for ring in rings:
+        (shells if _signed_area(ring) > 0 else holes).append(ring)
+
+    shell_areas = [_signed_area(s) for s in shells]
+    shell_boxes = [(s[:, 0].min(), s[:, 1].min(), s[:, 0].max(), s[:, 1].max()) for s in shells]
+    polygons = [[shell] for shell in shells]
+    for hole in holes:
+        # Test a vertex-free point inside the hole: the midpoint of its first edge
+        x, y = (hole[0] + hole[1]) / 2
+        best = None
+        for i, (minx, miny, maxx, maxy) in enumerate(shell_boxes):
+            if minx <= x <= maxx and miny <= y <= maxy and _ring_contains(shells[i], x, y):
+                if best is None or shell_areas[i] < shell_areas[best]:
+                    best = i
+        if best is not None:
+            polygons[best].append(hole)
+    return polygons
+
+
+def dissolve_geometries(geometries: Iterable[dict], precision: Optional[int] = None) -> Optional[dict]:
+    """Union polygon geometries into one MultiPolygon by shared-edge cancellation."""
+    rings = [ring for geometry in geometries if geometry for ring in oriented_rings(geometry, precision)]
+    if not rings:
+        return None
+    tolerance = 10.0 ** -precision if precision is not None else 1e-9
+    vertices, start, end = _boundary_edges(rings, tolerance)
+    polygons = _assemble_polygons(_stitch_rings(vertices, start, end))
+    return {
+        "type": "MultiPolygon",
+        "coordinates": [[ring.tolist() for ring in polygon] for polygon in polygons],
+    }
+
+
+def dissolve_features(features: Iterable[dict], key: str, precision: Optional[int] = None) -> Dict[str, dict]:
+    """Group features by properties[key] and dissolve each group.
+
+    Returns {key value: {"geometry": MultiPolygon, "count": member count}}.
+    """
+    groups = defaultdict(list)
+    for feature in features:
+        value = (feature.get('properties') or {}).get(key)
+        if value is None:
+            continue
+        groups[value].append(feature.get('geometry'))
+
+    return {
+        value: {"geometry": dissolve_geometries(geometries, precision), "count": len(geometries)}
+        for value, geometries in groups.items()
+    }
+
+
+def _sort_key(value) -> Tuple:
+    text = str(value)
+    digits = ''.join(c for c in text if c.isdigit())
+    return (int(digits) if digits else 0, text)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python3 district_dissolve.py <key> <output_geojson> [precinct_dir]")
+        sys.exit(1)
+
+    key = sys.argv[1]
+    output_path = sys.argv[2]
+    precinct_dir = Path(sys.argv[3]) if len(sys.argv) > 3 else PRECINCT_DIR
+
+    if not precinct_dir.exists():
+        print(f"ERROR: Precinct directory not found: {precinct_dir}")
+        sys.exit(1)
+
+    districts = dissolve_features(iter_all_features(precinct_dir), key, PRECINCT_PRECISION)
+
+    features = []
+    for value in sorted(districts, key=_sort_key):
+        district = districts[value]
+        features.append({
+            "type": "Feature",
+            "properties": {key: value, "precinct_count": district["count"]},
+            "geometry": district["geometry"],
+        })
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+    print(f"✅ Dissolved precincts into {len(features)} {key} districts")
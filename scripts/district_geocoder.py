@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Batch point-in-polygon geocoder: annotate points with every jurisdiction
+(precinct, congressional / senate / house district, city) they fall in.
+
+Each polygon layer packs all ring edges of all features into flat arrays
+and indexes both the feature boxes and the edge boxes with an STR tree.
+A point is first paired with candidate features by bbox, then a
+horizontal ray from the point to the nearer side of the feature's box is matched
+against the edge index and crossings are counted with numpy (even-odd
+rule, so holes and multipolygons are handled without special cases).
+
+Usage:
+    python scripts/district_geocoder.py <points_gpkg> <output_json> [points_table]
+
+Points are read from a GeoPackage layer (point geometries as-is, polygons
+by centroid); the polygon layers are reprojected to the points' CRS at load
+(reproject.py).
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gpkg_geometry import (
+    decode_gpkg_geometry, geometry_column, iter_polygons, primary_key_column, geometry_bounds,
+)
+from precinct_features import PRECINCT_DIR, iter_all_features
+from reproject import WGS84, reproject_geometries
+from spatial_index import STRtree, default_feature_table
+
+ROOT = Path(__file__).resolve().parent.parent
+JURISDICTION_GPKG = ROOT / "minnesota_gov" / "GIS" / "gov_jurisdictions" / "gpkg_bdry_jurisdiction" / "bdry_jurisdiction.gpkg"
+
+PRECINCT_FIELDS = ['Precinct', 'PrecinctID', 'County', 'CongDist', 'MNSenDist', 'MNLegDist', 'CtyComDist']
+CITY_FIELDS = ['FEATURE_NAME', 'GNIS_FEATURE_ID', 'COUNTY_NAME']
+POINT_CHUNK_SIZE = 100000
+
+
+class PolygonLayer:
+    """Polygon features packed into edge arrays with feature and edge STR indexes."""
+
+    def __init__(self, name: str, properties: List[dict], geometries: List[dict], srs_id: int):
+        self.name = name
+        self.srs_id = srs_id
+        self.properties = []
+
+        edges, edge_feature, boxes = [], [], []
+        for props, geometry in zip(properties, geometries):
+            if not geometry:
+                continue
+            rings = [ring for polygon in iter_polygons(geometry) for ring in polygon if len(ring) >= 3]
+            if not rings:
+                continue
+            feature_idx = len(self.properties)
+            for ring in rings:
+                if not np.array_equal(ring[0], ring[-1]):
+                    ring = np.vstack([ring, ring[:1]])
+                edges.append(np.hstack([ring[:-1], ring[1:]]))
+                edge_feature.append(np.full(len(ring) - 1, feature_idx, dtype=np.int64))
+            boxes.append(geometry_bounds(geometry))
+            self.properties.append(props)
+
+        self.edges = np.concatenate(edges) if edges else np.zeros((0, 4))
+        self.edge_feature = np.concatenate(edge_feature) if edge_feature else np.zeros(0, dtype=np.int64)
+        self.boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+
+        edge_boxes = np.column_stack([
+            np.minimum(self.edges[:, 0], self.edges[:, 2]), np.minimum(self.edges[:, 1], self.edges[:, 3]),
+            np.maximum(self.edges[:, 0], self.edges[:, 2]), np.maximum(self.edges[:, 1], self.edges[:, 3]),
+        ])
+        self.feature_tree = STRtree.build(self.boxes)
+        self.edge_tree = STRtree.build(edge_boxes)
+
+    def __len__(self) -> int:
+        return len(self.properties)
+
+    def contains_pairs(self, points) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (point_index, feature_index) for every feature containing a point."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        pair_point, pair_feature = self.feature_tree.query_points(points)
+        if not len(pair_point):
+            return pair_point, pair_feature
+
+        # Cast each ray toward the nearer side of the feature's box to touch fewer edges
+        px, py = points[pair_point, 0], points[pair_point, 1]
+        minx, maxx = self.boxes[pair_feature, 0], self.boxes[pair_feature, 2]
+        east = (maxx - px) <= (px - minx)
+        rays = np.column_stack([np.where(east, px, minx), py, np.where(east, maxx, px), py])
+        ray_idx, edge_idx = self.edge_tree.query_bboxes(rays)
+        same = self.edge_feature[edge_idx] == pair_feature[ray_idx]
+        ray_idx, edge_idx = ray_idx[same], edge_idx[same]
+
+        x0, y0, x1, y1 = self.edges[edge_idx].T
+        rx, ry = px[ray_idx], py[ray_idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cross_x = (x1 - x0) * (ry - y0) / (y1 - y0) + x0
+        crosses = ((y0 > ry) != (y1 > ry)) & np.where(east[ray_idx], rx < cross_x, rx > cross_x)
+
+        inside = np.bincount(ray_idx[crosses], minlength=len(pair_point)) % 2 == 1
+        return pair_point[inside], pair_feature[inside]
+
+    def locate(self, points) -> np.ndarray:
+        """Return the index of a containing feature per point, or -1."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(len(points), len(self), dtype=np.int64)
+        for start in range(0, len(points), POINT_CHUNK_SIZE):
+            point_idx, feature_idx = self.contains_pairs(points[start:start + POINT_CHUNK_SIZE])
+            # Keep the lowest feature index where features overlap
+            np.minimum.at(result, start + point_idx, feature_idx)
+        result[result == len(self)] = -1
+        return result
+
+
+def load_gpkg_layer(name: str, gpkg_path, table: str, fields: Sequence[str],
+                    srs_id: Optional[int] = None) -> PolygonLayer:
+    """Load a GeoPackage polygon table as a PolygonLayer keeping only `fields`, optionally reprojected."""
+    conn = sqlite3.connect(gpkg_path)
+    try:
+        geom_col, layer_srs = geometry_column(conn, table)
+        columns = ', '.join(f'"{f}"' for f in fields)
+        properties, geometries = [], []
+        for row in conn.execute(f'SELECT {columns}, "{geom_col}" FROM "{table}"'):
+            properties.append(dict(zip(fields, row[:-1])))
+            geometries.append(decode_gpkg_geometry(row[-1]))
+    finally:
+        conn.close()
+    if srs_id and srs_id != layer_srs:
+        return PolygonLayer(name, properties, reproject_geometries(geometries, layer_srs, srs_id), srs_id)
+    return PolygonLayer(name, properties, geometries, layer_srs)
+
+
+def load_precinct_layer(precinct_dir=PRECINCT_DIR, fields: Sequence[str] = PRECINCT_FIELDS,
+                        srs_id: int = WGS84) -> PolygonLayer:
+    """Load the statewide voting precincts from the cd*.md FeatureCollections (WGS84), optionally reprojected."""
+    properties, geometries = [], []
+    for feature in iter_all_features(precinct_dir):
+        props = feature.get('properties') or {}
+        properties.append({k: props.get(k) for k in fields})
+        geometries.append(feature.get('geometry'))
+    if srs_id != WGS84:
+        geometries = reproject_geometries(geometries, WGS84, srs_id)
+    return PolygonLayer('precinct', properties, geometries, srs_id)
+
+
+def feature_point(geometry: Optional[dict]) -> Optional[Tuple[float, float]]:
+    """Point geometries as-is; polygons by the centroid of their largest exterior ring."""
+    if not geometry:
+        return None
+    if geometry["type"] == 'Point':
+        x, y = geometry["coordinates"][:2]
+        return float(x), float(y)
+
+    best, best_area = None, 0.0
+    for polygon in iter_polygons(geometry):
+        ring = polygon[0]
+        x, y = ring[:, 0] - ring[0, 0], ring[:, 1] - ring[0, 1]
+        cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+        area = cross.sum() / 2
+        if area and abs(area) > best_area:
+            cx = ((x[:-1] + x[1:]) * cross).sum() / (6 * area) + ring[0, 0]
+            cy = ((y[:-1] + y[1:]) * cross).sum() / (6 * area) + ring[0, 1]
+            best, best_area = (float(cx), float(cy)), abs(area)
+    if best is None:
+        bounds = geometry_bounds(geometry)
+        if bounds:
+            best = ((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2)
+    return best
+
+
+def geocode_points(points, layers: Sequence[PolygonLayer]) -> Dict[str, np.ndarray]:
+    """Locate every point in every layer; returns feature indexes keyed by layer name."""
+    return {layer.name: layer.locate(points) for layer in layers}
+
+
+def annotate_gpkg_points(gpkg_path, table: str, layers: Sequence[PolygonLayer]) -> List[dict]:
+    """Annotate each feature of a GeoPackage layer with the attributes of its containing polygons."""
+    conn = sqlite3.connect(gpkg_path)
+    try:
+        geom_col, srs_id = geometry_column(conn, table)
+        pk_col = primary_key_column(conn, table)
+        rows = conn.execute(f'SELECT "{pk_col}", "{geom_col}" FROM "{table}"').fetchall()
+    finally:
+        conn.close()
+
+    for layer in layers:
+        if layer.srs_id != srs_id:
+            raise ValueError(f"Layer '{layer.name}' is EPSG:{layer.srs_id} but points are EPSG:{srs_id}")
+
+    ids, points = [], []
+    for fid, blob in rows:
+        point = feature_point(decode_gpkg_geometry(blob))
+        if point is not None:
+            ids.append(fid)
+            points.append(point)
+    points = np.array(points, dtype=np.float64).reshape(-1, 2)
+
+    located = geocode_points(points, layers)
+    records = []
+    for i, fid in enumerate(ids):
+        record = {"id": fid, "x": points[i, 0], "y": points[i, 1]}
+        for layer in layers:
+            idx = located[layer.name][i]
+            record[layer.name] = layer.properties[idx] if idx >= 0 else None
+        records.append(record)
+    return records
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python3 district_geocoder.py <points_gpkg> <output_json> [points_table]")
+        sys.exit(1)
+
+    points_gpkg = sys.argv[1]
+    output_path = sys.argv[2]
+
+    if not Path(points_gpkg).exists():
+        print(f"ERROR: GeoPackage file not found: {points_gpkg}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(points_gpkg)
+    points_table = sys.argv[3] if len(sys.argv) > 3 else default_feature_table(conn)
+    _, points_srs = geometry_column(conn, points_table)
+    conn.close()
+
+    # Both polygon layers are brought into the points' CRS (precincts are WGS84)
+    try:
+        layers = [
+            load_gpkg_layer('city', JURISDICTION_GPKG, 'City_Boundaries_in_Minnesota', CITY_FIELDS, points_srs),
+            load_precinct_layer(srs_id=points_srs),
+        ]
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    records = annotate_gpkg_points(points_gpkg, points_table, layers)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2)
+
+    print(f"✅ Geocoded {len(records)} points against {', '.join(l.name for l in layers)}")
+    for layer in layers:
+        matched = sum(1 for r in records if r[layer.name])
+        print(f"   {layer.name}: {matched} matched")
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Dry-run sink for the import scripts.
+
+DryRunClient stands in for the Supabase client: importers run their full
+parse -> normalize -> join pipeline and call upsert/insert as usual, but each
+batch is checked against the table's column types (INTEGER range, NUMERIC
+precision, NOT NULL, CHECK values), JSON-serialized as the HTTP client would,
+and counted instead of sent. report() prints throughput and reject reasons.
+
+Column specs mirror supabase/migrations; only the columns importers write
+are listed (id, created_at and trigger-maintained columns are omitted).
+
+Usage (importers):
+    python scripts/import_budgets.py --dry-run
+    python scripts/import_fy2025_payroll.py --dry-run
+
+Usage (validate a JSON / NDJSON file of rows, extra columns ignored):
+    python scripts/dry_run.py <table> <rows.json>
+"""
+
+import json
+import math
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MAX_EXAMPLES = 5
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+_PAYROLL_WAGES = {c: 'NUMERIC(15, 2) NOT NULL DEFAULT 0'
+                  for c in ('regular_wages', 'overtime_wages', 'other_wages', 'total_wages')}
+_BUDGET_AMOUNTS = {c: 'NUMERIC(15, 2) NOT NULL DEFAULT 0'
+                   for c in ('available_amount', 'obligated_amount', 'spend_amount', 'remaining_amount',
+                             'budget_amount', 'budget_remaining_amount')}
+
+TABLES: Dict[str, Dict[str, str]] = {
+    'budgets': {
+        'budget_period': 'INTEGER NOT NULL',
+        'agency': 'TEXT', 'fund': 'TEXT', 'program': 'TEXT', 'activity': 'TEXT',
+        **_BUDGET_AMOUNTS,
+        'row_digest': 'TEXT',
+    },
+    'payments': {
+        'budget_period': 'INTEGER NOT NULL',
+        'payment_amount': 'NUMERIC(15, 2) NOT NULL DEFAULT 0',
+        'agency': 'TEXT', 'payee': 'TEXT', 'payee_id': 'TEXT',
+    },
+    'payroll': {
+        'temporary_id': 'TEXT NOT NULL',
+        'record_nbr': 'INTEGER',
+        **{c: 'TEXT' for c in (
+            'employee_name', 'agency_nbr', 'agency_name', 'department_nbr', 'department_name',
+            'branch_code', 'branch_name', 'job_code', 'job_title', 'location_nbr', 'location_name',
+            'location_county_name', 'reg_temp_code', 'reg_temp_desc', 'classified_code',
+            'classified_desc', 'last_hire_date', 'full_part_time_code', 'full_part_time_desc',
+            'active_on_june_30', 'salary_plan_grid', 'comp_frequency_code', 'comp_frequency_desc',
+            'bargaining_unit_name', 'fiscal_year')},
+        **{c: 'INTEGER' for c in (
+            'original_hire_date', 'job_entry_date', 'salary_grade_range', 'max_salary_step',
+            'bargaining_unit_nbr')},
+        'compensation_rate': 'NUMERIC(15, 2)',
+        'position_fte': 'NUMERIC(5, 2)',
+        **_PAYROLL_WAGES,
+    },
+    'budget_rollups': {
+        'budget_period': 'INTEGER NOT NULL',
+        'agency': 'TEXT', 'fund': 'TEXT', 'program': 'TEXT',
+        **_BUDGET_AMOUNTS,
+        'row_count': 'INTEGER NOT NULL DEFAULT 0',
+    },
+    'payment_rollups': {
+        'budget_period': 'INTEGER NOT NULL',
+        'agency': 'TEXT',
+        'payment_amount': 'NUMERIC(15, 2) NOT NULL DEFAULT 0',
+        'row_count': 'INTEGER NOT NULL DEFAULT 0',
+        'payee_count': 'INTEGER NOT NULL DEFAULT 0',
+    },
+    'payroll_rollups': {
+        'fiscal_year': 'TEXT NOT NULL',
+        'agency_name': 'TEXT', 'bargaining_unit_name': 'TEXT', 'location_county_name': 'TEXT',
+        **_PAYROLL_WAGES,
+        'position_fte': 'NUMERIC(12, 2) NOT NULL DEFAULT 0',
+        'headcount': 'INTEGER NOT NULL DEFAULT 0',
+    },
+    'ctu_boundaries': {
+        'ctu_class': "TEXT NOT NULL CHECK IN ('CITY', 'TOWNSHIP', 'UNORGANIZED TERRITORY')",
+        'feature_name': 'TEXT NOT NULL',
+        'gnis_feature_id': 'TEXT',
+        'county_name': 'TEXT NOT NULL',
+        'county_code': 'TEXT',
+        'county_gnis_feature_id': 'TEXT',
+        'population': 'INTEGER',
+        'acres': 'NUMERIC(12, 2)',
+        'geometry_compact': 'BYTEA',
+    },
+    'gpkg_features': {
+        'source': 'TEXT NOT NULL',
+        'layer': 'TEXT NOT NULL',
+        'fid': 'INTEGER NOT NULL',
+        'geometry_type': 'TEXT',
+        'srs_id': 'INTEGER',
+        'properties': 'JSONB NOT NULL DEFAULT',
+        'geometry': 'JSONB',
+        **{c: 'DOUBLE PRECISION' for c in ('bbox_minx', 'bbox_miny', 'bbox_maxx', 'bbox_maxy')},
+    },
+    'nearest_facilities': {
+        'origin_type': "TEXT NOT NULL CHECK IN ('ctu', 'precinct')",
+        'origin_id': 'TEXT NOT NULL',
+        'origin_name': 'TEXT',
+        'facility_type': "TEXT NOT NULL CHECK IN ('school', 'park_and_ride', 'park_and_pool', 'transit_stop')",
+        'rank': 'INTEGER NOT NULL',
+        'facility_fid': 'INTEGER NOT NULL',
+        'facility_name': 'TEXT',
+        'distance_m': 'NUMERIC(10, 1) NOT NULL',
+    },
+    'boundary_crosswalks': {
+        'source_type': "TEXT NOT NULL CHECK IN ('ctu', 'precinct', 'school_district', 'attendance_area')",
+        'source_id': 'TEXT NOT NULL',
+        'source_name': 'TEXT',
+        'target_type': "TEXT NOT NULL CHECK IN ('ctu', 'precinct', 'school_district', 'attendance_area')",
+        'target_id': 'TEXT NOT NULL',
+        'target_name': 'TEXT',
+        'overlap_m2': 'DOUBLE PRECISION NOT NULL',
+        'source_fraction': 'NUMERIC(7, 6) NOT NULL',
+        'target_fraction': 'NUMERIC(7, 6) NOT NULL',
+    },
+}
+
+SPEC_RE = re.compile(r'^(INTEGER|TEXT|NUMERIC|DOUBLE PRECISION|JSONB|BYTEA)(?:\((\d+),\s*(\d+)\))?', re.I)
+CHECK_RE = re.compile(r"CHECK IN \((.*)\)", re.I)
+BYTEA_RE = re.compile(r'^\\x(?:[0-9a-fA-F]{2})*$')
+
+
+def parse_spec(spec: str) -> Dict:
+    """'NUMERIC(15, 2) NOT NULL DEFAULT 0' -> {'type', 'precision', 'scale', 'nullable', 'default', 'choices'}."""
+    match = SPEC_RE.match(spec)
+    check = CHECK_RE.search(spec)
+    return {
+        'type': match.group(1).upper(),
+        'precision': int(match.group(2)) if match.group(2) else None,
+        'scale': int(match.group(3)) if match.group(3) else None,
+        'nullable': 'NOT NULL' not in spec.upper(),
+        'default': 'DEFAULT' in spec.upper(),
+        'choices': set(re.findall(r"'([^']*)'", check.group(1))) if check else None,
+    }
+
+
+COLUMNS = {table: {name: parse_spec(spec) for name, spec in columns.items()} for table, columns in TABLES.items()}
+
+
+def check_value(column: Dict, value) -> Optional[str]:
+    """Return why value would be rejected by Postgres (no value, so reasons group), or None."""
+    if value is None:
+        return None if column['nullable'] else 'NULL in NOT NULL column'
+    if isinstance(value, float) and not math.isfinite(value):
+        return 'non-finite number'
+
+    kind = column['type']
+    if kind == 'INTEGER':
+        if isinstance(value, bool) or not isinstance(value, int):
+            return f'{type(value).__name__} for INTEGER'
+        if not INT_MIN <= value <= INT_MAX:
+            return 'out of INTEGER range'
+    elif kind == 'NUMERIC':
+        try:
+            number = Decimal(str(value)) if not isinstance(value, bool) else None
+        except InvalidOperation:
+            number = None
+        if number is None or not number.is_finite():
+            return f'{type(value).__name__} for NUMERIC'
+        if column['precision'] is not None:
+            limit = Decimal(10) ** (column['precision'] - column['scale'])
+            if abs(round(number, column['scale'])) >= limit:
+                return f"overflows NUMERIC({column['precision']}, {column['scale']})"
+    elif kind == 'DOUBLE PRECISION':
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return f'{type(value).__name__} for DOUBLE PRECISION'
+    elif kind == 'TEXT' and isinstance(value, (dict, list)):
+        return f'{type(value).__name__} for TEXT'
+    elif kind == 'BYTEA' and not (isinstance(value, str) and BYTEA_RE.match(value)):
+        return 'not a \\x hex literal for BYTEA'
+
+    if column['choices'] is not None and value not in column['choices']:
+        return 'fails CHECK'
+    return None
+
+
+def validate_row(table: str, row: Dict, allow_extra: bool = False) -> List[str]:
+    """List every reason the row would be rejected (empty if it would load)."""
+    columns = COLUMNS[table]
+    errors = []
+    for name, column in columns.items():
+        if name not in row:
+            if not column['nullable'] and not column['default']:
+                errors.append(f'{name}: missing NOT NULL column')
+            continue
+        reason = check_value(column, row[name])
+        if reason:
+            errors.append(f'{name}: {reason}')
+    if not allow_extra:
+        errors.extend(f'{name}: unknown column' for name in row if name not in columns)
+    return errors
+
+
+def duplicate_keys(rows: List[Dict], key_columns: List[str]) -> set:
+    """Indexes of rows repeating an earlier row's conflict key within the batch."""
+    seen, duplicates = set(), set()
+    for i, row in enumerate(rows):
+        key = tuple(json.dumps(row.get(c), default=str) for c in key_columns)
+        if key in seen:
+            duplicates.add(i)
+        seen.add(key)
+    return duplicates
+
+
+class DryRunResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class DryRunQuery:
+    """Chainable stand-in for a PostgREST request builder; writes are validated and counted."""
+
+    def __init__(self, client: 'DryRunClient', table: str):
+        self._client = client
+        self._table = table
+        self._rows = None
+        self._on_conflict = None
+
+    def upsert(self, rows, on_conflict: str = '', ignore_duplicates: bool = False, **kwargs):
+        self._rows = rows if isinstance(rows, list) else [rows]
+        # ON CONFLICT DO NOTHING tolerates repeated keys; DO UPDATE fails the whole batch
+        if on_conflict and not ignore_duplicates:
+            self._on_conflict = [c.strip() for c in on_conflict.split(',')]
+        return self
+
+    def insert(self, rows, **kwargs):
+        self._rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def _noop(self, *args, **kwargs):
+        return self
+
+    select = delete = update = eq = in_ = range = order = limit = _noop
+
+    def execute(self):
+        if self._rows is None:
+            return DryRunResult([])
+        return DryRunResult(self._client.record(self._table, self._rows, self._on_conflict))
+
+
+class DryRunClient:
+    """Local sink with the subset of the Supabase client API the importers use."""
+
+    def __init__(self, max_examples: int = MAX_EXAMPLES):
+        self.max_examples = max_examples
+        self.started = time.perf_counter()
+        self.rows = Counter()
+        self.rejected = Counter()
+        self.bytes = Counter()
+        self.reasons = defaultdict(Counter)
+        self.examples = defaultdict(list)
+
+    def schema(self, name: str) -> 'DryRunClient':
+        return self
+
+    def table(self, name: str) -> DryRunQuery:
+        return DryRunQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params=None) -> DryRunQuery:
+        return DryRunQuery(self, name)
+
+    def record(self, table: str, rows: List[Dict], on_conflict: Optional[List[str]] = None) -> List[Dict]:
+        """Validate and serialize one batch; returns the rows that would load."""
+        self.bytes[table] += len(json.dumps(rows, default=str))
+        self.rows[table] += len(rows)
+        duplicates = duplicate_keys(rows, on_conflict) if on_conflict else set()
+        if table not in COLUMNS and not duplicates:
+            return rows
+        accepted = []
+        for i, row in enumerate(rows):
+            errors = validate_row(table, row) if table in COLUMNS else []
+            if i in duplicates:
+                errors.append(f"duplicate ({','.join(on_conflict)}) in batch: "
+                              "ON CONFLICT DO UPDATE cannot affect row a second time")
+            elif duplicates:
+                errors.append('batch fails on a duplicate conflict key')
+            if not errors:
+                accepted.append(row)
+                continue
+            self.rejected[table] += 1
+            self.reasons[table].update(errors)
+            if len(self.examples[table]) < self.max_examples:
+                self.examples[table].append((errors, row))
+        return accepted
+
+    def report(self) -> int:
+        """Print rows, rejects and throughput per table; returns the total reject count."""
+        elapsed = time.perf_counter() - self.started
+        print()
+        print("=" * 60)
+        print("Dry Run Summary (nothing was written)")
+        print("=" * 60)
+        for table in sorted(self.rows):
+            rows = self.rows[table]
+            print(f"{table}: {rows:,} rows, {self.rejected[table]:,} rejected, "
+                  f"{self.bytes[table] / 1e6:.1f} MB serialized")
+            for reason, count in self.reasons[table].most_common():
+                print(f"  ⚠️  {count:,} x {reason}")
+            for errors, row in self.examples[table]:
+                print(f"     e.g. {'; '.join(errors)}: {json.dumps(row, default=str)[:200]}")
+        total = sum(self.rows.values())
+        print(f"Elapsed: {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s end to end)")
+        print("=" * 60)
+        return sum(self.rejected.values())
+
+
+def load_rows(path: Path) -> List[Dict]:
+    text = Path(path).read_text(encoding='utf-8')
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in COLUMNS:
+        print(f"Usage: python3 dry_run.py [{'|'.join(COLUMNS)}] <rows.json|rows.ndjson>")
+        sys.exit(1)
+
+    table, path = sys.argv[1], Path(sys.argv[2])
+    if not path.exists():
+        print(f"Error: File not found: {path}")
+        sys.exit(1)
+
+    rows = load_rows(path)
+    bad = [(i, errors) for i, errors in ((i, validate_row(table, r, allow_extra=True)) for i, r in enumerate(rows))
+           if errors]
+    for i, errors in bad[:20]:
+        print(f"  row {i}: {'; '.join(errors)}")
+    print(f"{'✅' if not bad else '⚠️ '} {len(rows) - len(bad):,}/{len(rows):,} rows valid for {table}")
+    sys.exit(1 if bad else 0)
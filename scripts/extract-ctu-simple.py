@@ -2,6 +2,12 @@
 """
 Extract CTU boundaries using only built-in Python libraries
 Reads GeoPackage as SQLite and exports geometry as base64 for PostGIS conversion
+
+--bbox minx,miny,maxx,maxy (GeoPackage CRS) and --county NAME limit the
+export to one region; the bbox goes through the GeoPackage R-tree.
+
+Acres, bbox, centroid and geometry_compact are in WGS84 (EPSG:4326) by
+default, or in --srs EPSG; the raw GeoPackage blob is left as stored.
 """
 
 import sqlite3
@@ -10,7 +16,20 @@ import sys
 import base64
 from pathlib import Path
 
-def extract_ctu_data(gpkg_path, output_path):
+from geometry_codec import bytea_literal, encode_geometry
+from geometry_measure import measure_fields, polygon_measures
+from geometry_validate import repair_geometries, summarize, write_issue_report
+from gpkg_geometry import decode_gpkg_geometry, geometry_column, parse_region_args, select_features
+from reproject import WGS84, reproject_geometries
+
+CTU_COLUMNS = ['CTU_CLASS', 'FEATURE_NAME', 'GNIS_FEATURE_ID', 'COUNTY_NAME', 'COUNTY_CODE',
+               'COUNTY_GNIS_FEATURE_ID', 'POPULATION']
+CTU_WHERE = """CTU_CLASS IS NOT NULL
+        AND FEATURE_NAME IS NOT NULL
+        AND COUNTY_NAME IS NOT NULL
+        AND COUNTY_NAME != 'NV'"""
+
+def extract_ctu_data(gpkg_path, output_path, bbox=None, county=None, srs=WGS84):
     """Extract CTU data - geometry will be converted via PostGIS ST_GeomFromGPKG"""
     
     if not Path(gpkg_path).exists():
@@ -18,29 +37,19 @@ def extract_ctu_data(gpkg_path, output_path):
         sys.exit(1)
     
     conn = sqlite3.connect(gpkg_path)
-    cursor = conn.cursor()
+    _, srs_id = geometry_column(conn, 'city_township_unorg')
     
-    # Read CTU data with geometry blob
-    cursor.execute("""
-      SELECT 
-        CTU_CLASS,
-        FEATURE_NAME,
-        GNIS_FEATURE_ID,
-        COUNTY_NAME,
-        COUNTY_CODE,
-        COUNTY_GNIS_FEATURE_ID,
-        POPULATION,
-        SHAPE
-      FROM city_township_unorg
-      WHERE CTU_CLASS IS NOT NULL
-        AND FEATURE_NAME IS NOT NULL
-        AND COUNTY_NAME IS NOT NULL
-        AND COUNTY_NAME != 'NV'
-      ORDER BY CTU_CLASS, FEATURE_NAME
-    """)
+    # Read CTU data with geometry blob (only the requested region's features)
+    where, params = CTU_WHERE, []
+    if county:
+        where += " AND UPPER(COUNTY_NAME) = UPPER(?)"
+        params.append(county)
+    rows = select_features(conn, 'city_township_unorg', CTU_COLUMNS, bbox=bbox, where=where, params=params,
+                           order_by='CTU_CLASS, FEATURE_NAME')
     
     records = []
-    for idx, row in enumerate(cursor.fetchall()):
+    geometries = []
+    for idx, row in enumerate(rows):
         ctu_class, feature_name, gnis_id, county_name, county_code, county_gnis_id, population, shape_blob = row
         
         # Store geometry as base64-encoded blob
@@ -48,6 +57,7 @@ def extract_ctu_data(gpkg_path, output_path):
         geometry_blob_b64 = None
         if shape_blob:
             geometry_blob_b64 = base64.b64encode(shape_blob).decode('utf-8')
+        geometries.append(decode_gpkg_geometry(shape_blob))
         
         record = {
             "ctu_class": ctu_class,
@@ -65,21 +75,61 @@ def extract_ctu_data(gpkg_path, output_path):
     
     conn.close()
     
+    # Validate and repair the decoded geometry in parallel; acres and the compact
+    # encoding use the repaired rings, the raw blob is reported via the issue file
+    results = repair_geometries(geometries)
+    summarize('city_township_unorg', results)
+    geometries = [geometry for geometry, _ in results]
+    report_path = Path(output_path).with_suffix('.issues.ndjson')
+    keys = [{"gnis_feature_id": r["gnis_feature_id"], "feature_name": r["feature_name"]} for r in records]
+    if write_issue_report(report_path, keys, results):
+        print(f"📁 Geometry issues -> {report_path}")
+    
+    # Reproject every CTU in one call (UTM 15N -> WGS84 by default)
+    if srs and srs_id and srs != srs_id:
+        print(f"Reprojecting EPSG:{srs_id} -> EPSG:{srs}")
+        try:
+            geometries = reproject_geometries(geometries, srs_id, srs)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        srs_id = srs
+    
+    # Compute acres, bbox and centroid from the decoded geometry in one batch
+    measures = polygon_measures(geometries, srs_id)
+    for idx, record in enumerate(records):
+        record.update(measure_fields(measures, idx))
+        if geometries[idx]:
+            record["geometry_compact"] = bytea_literal(encode_geometry(geometries[idx], srs_id=srs_id))
+    
     # Write to JSON file
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(records, f, indent=2)
     
     print(f"✅ Extracted {len(records)} CTU records")
     print(f"   Records with geometry: {sum(1 for r in records if r['geometry_blob_b64'])}")
+    print(f"   Records with acres: {sum(1 for r in records if r['acres'] is not None)}")
     return len(records)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python3 extract-ctu-simple.py <gpkg_path> <output_json_path>")
+    try:
+        args, bbox, county = parse_region_args(sys.argv[1:])
+        srs = WGS84
+        if '--srs' in args:
+            idx = args.index('--srs')
+            if idx + 1 >= len(args):
+                raise ValueError("--srs needs a value")
+            srs = int(args[idx + 1])
+            del args[idx:idx + 2]
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if len(args) < 2:
+        print("Usage: python3 extract-ctu-simple.py <gpkg_path> <output_json_path> [--bbox minx,miny,maxx,maxy] [--county NAME] [--srs EPSG]")
         sys.exit(1)
     
-    gpkg_path = sys.argv[1]
-    output_path = sys.argv[2]
+    gpkg_path = args[0]
+    output_path = args[1]
     
-    extract_ctu_data(gpkg_path, output_path)
+    extract_ctu_data(gpkg_path, output_path, bbox=bbox, county=county, srs=srs)
 
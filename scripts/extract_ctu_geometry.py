@@ -2,6 +2,11 @@
 """
 Extract CTU boundaries from GeoPackage with proper geometry conversion
 Uses fiona (GDAL Python bindings) to read GeoPackage geometry
+
+--bbox minx,miny,maxx,maxy (GeoPackage CRS) and --county NAME limit the
+export to one region; fiona's bbox filter uses the GeoPackage R-tree.
+Geometry is written in WGS84 (EPSG:4326) for the web map, or in --srs EPSG;
+the whole layer is reprojected in one batch (see reproject.py).
 """
 
 import sys
@@ -17,7 +22,22 @@ except ImportError:
     print("ERROR: fiona library not installed. Install with: pip install fiona")
     sys.exit(1)
 
-def extract_ctu_data(gpkg_path, output_path):
+from geometry_codec import bytea_literal, encode_geometry
+from geometry_measure import measure_fields, polygon_measures
+from geometry_validate import repair_geometries, summarize, write_issue_report
+from gpkg_geometry import parse_region_args, to_geojson
+from reproject import WGS84, reproject_geometries
+
+def crs_epsg_code(crs):
+    """Return the EPSG code of a fiona CRS (CRS object or legacy dict), or None"""
+    if hasattr(crs, 'to_epsg'):
+        return crs.to_epsg()
+    init = (crs or {}).get('init', '')
+    if init.lower().startswith('epsg:'):
+        return int(init.split(':')[1])
+    return None
+
+def extract_ctu_data(gpkg_path, output_path, bbox=None, county=None, srs=WGS84):
     """Extract CTU data with proper geometry from GeoPackage"""
     
     if not Path(gpkg_path).exists():
@@ -31,12 +51,17 @@ def extract_ctu_data(gpkg_path, output_path):
         with fiona.open(gpkg_path, layer='city_township_unorg') as src:
             # Get CRS info
             src_crs = src.crs
+            srs_id = crs_epsg_code(src_crs)
             print(f"Source CRS: {src_crs}")
             
-            # Read all features
-            for idx, feature in enumerate(src):
+            # Read all features (or only those in the requested bbox)
+            features = src.filter(bbox=bbox) if bbox else src
+            for idx, feature in enumerate(features):
                 props = feature.get('properties', {})
                 
+                if county and (props.get('COUNTY_NAME') or '').upper() != county.upper():
+                    continue
+                
                 # Skip invalid records
                 if not props.get('CTU_CLASS') or not props.get('FEATURE_NAME') or not props.get('COUNTY_NAME'):
                     continue
@@ -44,7 +69,7 @@ def extract_ctu_data(gpkg_path, output_path):
                 if props.get('COUNTY_NAME') == 'NV':
                     continue
                 
-                # Get geometry (fiona automatically handles coordinate transformation if needed)
+                # Get geometry (in the source CRS; reprojected below)
                 geometry = feature.get('geometry')
                 
                 if not geometry:
@@ -71,12 +96,41 @@ def extract_ctu_data(gpkg_path, output_path):
                     "county_code": str(props.get('COUNTY_CODE')) if props.get('COUNTY_CODE') else None,
                     "county_gnis_feature_id": str(props.get('COUNTY_GNIS_FEATURE_ID')) if props.get('COUNTY_GNIS_FEATURE_ID') else None,
                     "population": int(props.get('POPULATION')) if props.get('POPULATION') is not None else None,
-                    "acres": None,  # Not in source data
+                    "acres": None,  # Filled below from geometry
                     "geometry": feature_collection
                 }
                 
                 records.append(record)
         
+        # Validate and repair all geometries (in parallel) before anything is derived from them
+        results = repair_geometries([r["geometry"]["features"][0]["geometry"] for r in records])
+        summarize('city_township_unorg', results)
+        report_path = Path(output_path).with_suffix('.issues.ndjson')
+        keys = [{"gnis_feature_id": r["gnis_feature_id"], "feature_name": r["feature_name"]} for r in records]
+        if write_issue_report(report_path, keys, results):
+            print(f"📁 Geometry issues -> {report_path}")
+        geometries = [geometry for geometry, _ in results]
+        
+        # Reproject every CTU in one call (UTM 15N -> WGS84 by default)
+        if srs and srs_id and srs != srs_id:
+            print(f"Reprojecting EPSG:{srs_id} -> EPSG:{srs}")
+            geometries = reproject_geometries(geometries, srs_id, srs)
+            srs_id = srs
+        for record, geometry in zip(records, geometries):
+            record["geometry"]["features"][0]["geometry"] = to_geojson(geometry)
+        records = [r for r in records if r["geometry"]["features"][0]["geometry"]]
+        
+        # Compute acres, bbox and centroid for all CTUs in one batch
+        measures = polygon_measures(
+            [r["geometry"]["features"][0]["geometry"] for r in records], srs_id
+        )
+        for idx, record in enumerate(records):
+            record.update(measure_fields(measures, idx))
+            # Compact side encoding of the same geometry (see geometry_codec.py)
+            record["geometry_compact"] = bytea_literal(
+                encode_geometry(record["geometry"]["features"][0]["geometry"], srs_id=srs_id)
+            )
+        
         # Write to JSON file
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(records, f, indent=2)
@@ -91,12 +145,24 @@ def extract_ctu_data(gpkg_path, output_path):
         sys.exit(1)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python3 extract_ctu_geometry.py <gpkg_path> <output_json_path>")
+    try:
+        args, bbox, county = parse_region_args(sys.argv[1:])
+        srs = WGS84
+        if '--srs' in args:
+            idx = args.index('--srs')
+            if idx + 1 >= len(args):
+                raise ValueError("--srs needs a value")
+            srs = int(args[idx + 1])
+            del args[idx:idx + 2]
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    if len(args) < 2:
+        print("Usage: python3 extract_ctu_geometry.py <gpkg_path> <output_json_path> [--bbox minx,miny,maxx,maxy] [--county NAME] [--srs EPSG]")
         sys.exit(1)
     
-    gpkg_path = sys.argv[1]
-    output_path = sys.argv[2]
+    gpkg_path = args[0]
+    output_path = args[1]
     
-    extract_ctu_data(gpkg_path, output_path)
+    extract_ctu_data(gpkg_path, output_path, bbox=bbox, county=county, srs=srs)
 
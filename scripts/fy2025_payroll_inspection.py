@@ -6,23 +6,14 @@ Output: file details, headers, first 3 rows, null counts, distinct agencies, uni
 from pathlib import Path
 import json
 
-try:
-    import openpyxl
-except ImportError:
-    print("Run: pip install openpyxl")
-    raise
+from common import find_sheet_by_pattern as find_sheet, lazy_import
+
+openpyxl = lazy_import('openpyxl')
 
 ROOT = Path(__file__).resolve().parent.parent
 FILE = ROOT / "minnesota_gov" / "State Payrole" / "fiscal-year-2025.xlsx"
 
 
-def find_sheet(workbook, pattern):
-    for name in workbook.sheetnames:
-        if pattern.lower() in name.lower():
-            return name
-    return None
-
-
 def main():
     if not FILE.exists():
         print(f"File not found: {FILE}")
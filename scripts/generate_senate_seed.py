@@ -1,7 +1,39 @@
 #!/usr/bin/env python3
-"""Generate SQL seed file for Minnesota Senate from senate.md"""
+"""Generate SQL seed file for the Minnesota Senate or House
+
+Members come from roster_parser.load_members (senate.md / house.md merged
+with the peoples/ rosters). Emits one multi-row INSERT ... ON CONFLICT for
+people and one set-based INSERT ... SELECT ... JOIN for roles, so a chamber
+seeds in a handful of statements.
+
+Usage:
+    python scripts/generate_senate_seed.py [senate|house] [output_sql]
+"""
+
+import sys
+from pathlib import Path
+
+from roster_parser import GOV_DIR, PEOPLE_COLUMNS, load_members
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHAMBERS = {
+    'senate': {
+        'output': ROOT / 'supabase' / 'migrations' / '302_seed_mn_senate.sql',
+        'org_name': 'Minnesota Senate',
+        'org_slug': 'mn-senate',
+        'default_title': 'Senator',
+        'label': 'senators',
+    },
+    'house': {
+        'output': Path('seed_mn_house.sql'),
+        'org_name': 'Minnesota House of Representatives',
+        'org_slug': 'mn-house',
+        'default_title': 'Representative',
+        'label': 'representatives',
+    },
+}
 
-import re
 
 def escape_sql(s):
     """Escape SQL string values"""
@@ -11,149 +43,83 @@ def escape_sql(s):
     escaped = s.replace("'", "''")
     return f"'{escaped}'"
 
-with open('senate.md', 'r') as f:
-    content = f.read()
-
-# Parse senators from markdown
-senators = []
-current_senator = None
-office_lines = []
-
-for line in content.split('\n'):
-    line = line.strip()
-    
-    # Match senator header: ## X. Name
-    header_match = re.match(r'^##\s+(\d+)\.\s+(.+)$', line)
-    if header_match:
-        # Save previous senator if exists
-        if current_senator:
-            if office_lines:
-                current_senator['address'] = '\n'.join(office_lines).strip()
-            senators.append(current_senator)
-        
-        # Start new senator
-        current_senator = {
-            'number': header_match.group(1),
-            'name': header_match.group(2).strip(),
-            'district': None,
-            'party': None,
-            'title': None,
-            'phone': None,
-            'email': None,
-            'address': None,
-        }
-        office_lines = []
-        continue
-    
-    if not current_senator:
-        continue
-    
-    # Match fields
-    if line.startswith('**District:**'):
-        current_senator['district'] = line.replace('**District:**', '').strip()
-    elif line.startswith('**Party:**'):
-        current_senator['party'] = line.replace('**Party:**', '').strip()
-    elif line.startswith('**Title:**'):
-        current_senator['title'] = line.replace('**Title:**', '').strip()
-    elif line.startswith('**Phone:**'):
-        current_senator['phone'] = line.replace('**Phone:**', '').strip()
-        # Address is complete when we hit phone
-        if office_lines:
-            current_senator['address'] = '\n'.join(office_lines).strip()
-            office_lines = []
-    elif line.startswith('**Email:**'):
-        email_text = line.replace('**Email:**', '').strip()
-        # Extract email from markdown link or plain text
-        email_match = re.search(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', email_text)
-        if email_match:
-            current_senator['email'] = email_match.group(1)
-        elif 'Use Email Form' in email_text:
-            current_senator['email'] = None
-    elif line.startswith('**Office:**'):
-        office_lines = []  # Reset office lines
-        continue  # Office header, next lines are address
-    elif line and not line.startswith('---') and not line.startswith('**') and not line.startswith('#'):
-        # This is likely an address line (before phone/email)
-        if current_senator.get('phone') is None:
-            office_lines.append(line)
-
-# Don't forget the last senator
-if current_senator:
-    if office_lines:
-        current_senator['address'] = '\n'.join(office_lines).strip()
-    senators.append(current_senator)
-
-# Generate SQL
-sql_lines = [
-    "-- Seed Minnesota Senate members",
-    "-- Generated from senate.md",
-    "",
-    "-- ============================================================================",
-    "-- STEP 1: Insert senators into people table",
-    "-- ============================================================================",
-    "",
-]
-
-for senator in senators:
-    # Generate slug from name
-    slug = re.sub(r'[^a-zA-Z0-9\s-]', '', senator['name'].lower())
-    slug = re.sub(r'\s+', '-', slug)
-    slug = slug.strip('-')
-    
-    name = escape_sql(senator['name'])
-    party = escape_sql(senator['party'])
-    district = escape_sql(senator['district'])
-    email = escape_sql(senator['email'])
-    phone = escape_sql(senator['phone'])
-    address = escape_sql(senator['address'])
-    slug_val = escape_sql(slug)
-    
-    sql_lines.append(f"INSERT INTO civic.people (name, slug, party, district, email, phone, address)")
-    sql_lines.append(f"VALUES ({name}, {slug_val}, {party}, {district}, {email}, {phone}, {address})")
-    sql_lines.append(f"ON CONFLICT (slug) DO UPDATE SET")
-    sql_lines.append(f"  name = EXCLUDED.name,")
-    sql_lines.append(f"  party = EXCLUDED.party,")
-    sql_lines.append(f"  district = EXCLUDED.district,")
-    sql_lines.append(f"  email = EXCLUDED.email,")
-    sql_lines.append(f"  phone = EXCLUDED.phone,")
-    sql_lines.append(f"  address = EXCLUDED.address;")
-    sql_lines.append("")
-
-sql_lines.append("-- ============================================================================")
-sql_lines.append("-- STEP 2: Create roles for senators")
-sql_lines.append("-- ============================================================================")
-sql_lines.append("")
-
-# Get Minnesota Senate org ID
-sql_lines.append("-- First, ensure Minnesota Senate org exists")
-sql_lines.append("INSERT INTO civic.orgs (name, slug, org_type, parent_id)")
-sql_lines.append("SELECT 'Minnesota Senate', 'mn-senate', 'agency',")
-sql_lines.append("  (SELECT id FROM civic.orgs WHERE slug = 'legislative')")
-sql_lines.append("WHERE NOT EXISTS (SELECT 1 FROM civic.orgs WHERE slug = 'mn-senate');")
-sql_lines.append("")
-
-sql_lines.append("-- Create roles for each senator")
-for senator in senators:
-    slug = re.sub(r'[^a-zA-Z0-9\s-]', '', senator['name'].lower())
-    slug = re.sub(r'\s+', '-', slug)
-    slug = slug.strip('-')
-    
-    title = senator.get('title') or 'Senator'
-    title_escaped = escape_sql(title)
-    
-    sql_lines.append(f"INSERT INTO civic.roles (person_id, org_id, title, is_current)")
-    sql_lines.append(f"SELECT")
-    sql_lines.append(f"  (SELECT id FROM civic.people WHERE slug = '{slug}'),")
-    sql_lines.append(f"  (SELECT id FROM civic.orgs WHERE slug = 'mn-senate'),")
-    sql_lines.append(f"  {title_escaped},")
-    sql_lines.append(f"  true")
-    sql_lines.append(f"WHERE EXISTS (SELECT 1 FROM civic.people WHERE slug = '{slug}')")
-    sql_lines.append(f"  AND EXISTS (SELECT 1 FROM civic.orgs WHERE slug = 'mn-senate')")
-    sql_lines.append(f"ON CONFLICT DO NOTHING;")
-    sql_lines.append("")
-
-with open('supabase/migrations/302_seed_mn_senate.sql', 'w') as f:
-    f.write('\n'.join(sql_lines))
-
-print(f"Generated seed file with {len(senators)} senators")
 
+def generate_seed_sql(members, chamber):
+    """Return the seed SQL for one chamber as a string"""
+    config = CHAMBERS[chamber]
+    org_slug = escape_sql(config['org_slug'])
+
+    people_values = ',\n'.join(
+        f"  ({', '.join(escape_sql(m[c]) for c in PEOPLE_COLUMNS)})" for m in members
+    )
+    role_values = ',\n'.join(
+        f"  ({escape_sql(m['slug'])}, {escape_sql(m['title'] or config['default_title'])})" for m in members
+    )
+
+    return '\n'.join([
+        f"-- Seed {config['org_name']} members",
+        f"-- Generated from {chamber}.md and peoples/{chamber}.md",
+        "",
+        "-- ============================================================================",
+        f"-- STEP 1: Upsert {config['label']} into people table",
+        "-- ============================================================================",
+        "",
+        f"INSERT INTO civic.people ({', '.join(PEOPLE_COLUMNS)})",
+        "VALUES",
+        people_values,
+        "ON CONFLICT (slug) DO UPDATE SET",
+        "  name = EXCLUDED.name,",
+        "  party = EXCLUDED.party,",
+        "  district = EXCLUDED.district,",
+        "  email = EXCLUDED.email,",
+        "  phone = EXCLUDED.phone,",
+        "  address = EXCLUDED.address,",
+        "  building_id = COALESCE(EXCLUDED.building_id, civic.people.building_id);",
+        "",
+        "-- ============================================================================",
+        f"-- STEP 2: Create roles for {config['label']}",
+        "-- ============================================================================",
+        "",
+        f"-- First, ensure {config['org_name']} org exists",
+        "INSERT INTO civic.orgs (name, slug, org_type, parent_id)",
+        f"SELECT {escape_sql(config['org_name'])}, {org_slug}, 'agency',",
+        "  (SELECT id FROM civic.orgs WHERE slug = 'legislative')",
+        f"WHERE NOT EXISTS (SELECT 1 FROM civic.orgs WHERE slug = {org_slug});",
+        "",
+        f"-- Create current roles for every {config['label'][:-1]} in one statement",
+        "INSERT INTO civic.roles (person_id, org_id, title, is_current)",
+        "SELECT p.id, o.id, v.title, true",
+        "FROM (VALUES",
+        role_values,
+        ") AS v(slug, title)",
+        "JOIN civic.people p ON p.slug = v.slug",
+        f"JOIN civic.orgs o ON o.slug = {org_slug}",
+        "WHERE NOT EXISTS (",
+        "  SELECT 1 FROM civic.roles r",
+        "  WHERE r.person_id = p.id",
+        "    AND r.org_id = o.id",
+        "    AND r.is_current = true",
+        ");",
+        "",
+    ])
+
+
+if __name__ == '__main__':
+    chamber = sys.argv[1] if len(sys.argv) > 1 else 'senate'
+    if chamber not in CHAMBERS:
+        print(f"Usage: python3 generate_senate_seed.py [{'|'.join(CHAMBERS)}] [output_sql]")
+        sys.exit(1)
+
+    config = CHAMBERS[chamber]
+    output_path = Path(sys.argv[2]) if len(sys.argv) > 2 else config['output']
+
+    if not GOV_DIR.exists():
+        print(f"ERROR: Roster directory not found: {GOV_DIR}")
+        sys.exit(1)
+
+    members = load_members(chamber)
+
+    with open(output_path, 'w') as f:
+        f.write(generate_seed_sql(members, chamber))
+
+    print(f"Generated seed file with {len(members)} {config['label']}")
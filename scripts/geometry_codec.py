@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Compact binary geometry encoding (TWKB-style): coordinates are quantized to
+a fixed number of decimals, delta-encoded against the previous vertex and
+written as zigzag varints, so a CTU polygon is a few bytes per vertex
+instead of ~40 bytes of JSON text.
+
+Geometry blob:
+
+    byte 0        (FORMAT_VERSION << 4) | type (1 Point, 2 LineString,
+                  3 Polygon, 4 MultiPoint, 5 MultiLineString, 6 MultiPolygon)
+    varint        zigzag precision p (coordinates stored as round(v * 10**p))
+    varint        srs_id (0 = unknown)
+    varints       body: part / ring / vertex counts, each followed by its
+                  zigzag (dx, dy) deltas; deltas run across the whole
+                  geometry starting from (0, 0). Polygon rings omit the
+                  closing vertex.
+
+Container file (.mngeom), readable as a stream:
+
+    b'MNGEOM01', then per record: varint key length, UTF-8 key,
+    varint blob length, blob
+
+Both encoding and decoding are vectorized over the whole geometry; the
+matching TypeScript decoder is src/features/map/utils/compactGeometry.ts.
+
+Usage:
+    python scripts/geometry_codec.py pack <ctu_extract.json> <output.mngeom> [srs_id]
+    python scripts/geometry_codec.py unpack <input.mngeom> <output.geojson>
+
+pack infers EPSG:4326 when srs_id is omitted and the coordinates are lon/lat;
+projected extracts must name their srs_id.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+CONTAINER_MAGIC = b'MNGEOM01'
+GEOMETRY_TYPES = {'Point': 1, 'LineString': 2, 'Polygon': 3, 'MultiPoint': 4, 'MultiLineString': 5, 'MultiPolygon': 6}
+TYPE_NAMES = {code: name for name, code in GEOMETRY_TYPES.items()}
+
+GEOGRAPHIC_SRS = (4326, 4269)   # WGS84, NAD83 lon/lat
+GEOGRAPHIC_PRECISION = 6   # ~0.1 m in degrees
+PROJECTED_PRECISION = 2    # centimetres
+MAX_VARINT_BYTES = 10
+
+
+def default_precision(srs_id: Optional[int], coords: Optional[np.ndarray] = None) -> int:
+    """Decimals for a CRS; with no srs_id, geographic if the coordinates fit in lon/lat range."""
+    if srs_id is None and coords is not None:
+        srs_id = infer_srs(coords)
+    return GEOGRAPHIC_PRECISION if srs_id in GEOGRAPHIC_SRS else PROJECTED_PRECISION
+
+
+def infer_srs(coords: np.ndarray) -> Optional[int]:
+    """EPSG:4326 if every coordinate is a valid lon/lat, else None (projected, unknown)."""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if len(coords) and (np.abs(coords[:, 0]) <= 180).all() and (np.abs(coords[:, 1]) <= 90).all():
+        return 4326
+    return None
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.uint64)
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """LEB128-encode an array of unsigned integers."""
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, MAX_VARINT_BYTES):
+        nbytes += values >= np.uint64(1 << (7 * k))
+    ends = np.cumsum(nbytes)
+    starts = ends - nbytes
+    out = np.zeros(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    for k in range(int(nbytes.max()) if len(nbytes) else 0):
+        m = nbytes > k
+        chunk = (values[m] >> np.uint64(7 * k)) & np.uint64(0x7f)
+        more = (nbytes[m] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[m] + k] = (chunk | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def decode_varints(data) -> np.ndarray:
+    """Decode a buffer of consecutive LEB128 varints into a uint64 array."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.zeros(0, dtype=np.uint64)
+    last = (raw & 0x80) == 0
+    if not last[-1]:
+        raise ValueError("Truncated varint")
+    starts = np.flatnonzero(np.r_[True, last[:-1]])
+    value_of_byte = np.cumsum(np.r_[True, last[:-1]]) - 1
+    shift = (7 * (np.arange(len(raw)) - starts[value_of_byte])).astype(np.uint64)
+    return np.bitwise_or.reduceat((raw & 0x7f).astype(np.uint64) << shift, starts)
+
+
+def _parts(geometry: dict) -> Tuple[List[Optional[int]], List[np.ndarray]]:
+    """Flatten a geometry into its count stream and coordinate arrays (None marks where each array goes)."""
+    geom_type = geometry['type']
+    coords = geometry['coordinates']
+
+    def points(a):
+        return np.asarray(a, dtype=np.float64).reshape(-1, 2)
+
+    def ring(a):
+        a = points(a)
+        return a[:-1] if len(a) > 1 and np.array_equal(a[0], a[-1]) else a
+
+    if geom_type == 'Point':
+        return [None], [points(coords)[:1]]
+    if geom_type in ('LineString', 'MultiPoint'):
+        a = points(coords)
+        return [len(a), None], [a]
+    if geom_type in ('Polygon', 'MultiLineString'):
+        arrays = [ring(r) if geom_type == 'Polygon' else points(r) for r in coords]
+        stream = [len(arrays)]
+        for a in arrays:
+            stream += [len(a), None]
+        return stream, arrays
+    if geom_type == 'MultiPolygon':
+        stream, arrays = [len(coords)], []
+        for polygon in coords:
+            stream.append(len(polygon))
+            for r in polygon:
+                a = ring(r)
+                arrays.append(a)
+                stream += [len(a), None]
+        return stream, arrays
+    raise ValueError(f"Unsupported geometry type: {geom_type}")
+
+
+def encode_geometry(geometry: dict, precision: Optional[int] = None, srs_id: Optional[int] = None) -> bytes:
+    """Encode a GeoJSON-style geometry (lists or numpy arrays) as a compact blob."""
+    stream, arrays = _parts(geometry)
+
+    coords = np.concatenate(arrays) if arrays else np.zeros((0, 2))
+    precision = default_precision(srs_id, coords) if precision is None else precision
+    quantized = np.round(coords * 10.0 ** precision).astype(np.int64)
+    deltas = _zigzag(np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel())
+
+    values, offset, arrays_iter = [], 0, iter(arrays)
+    for item in stream:
+        if item is None:
+            n = 2 * len(next(arrays_iter))
+            values.append(deltas[offset:offset + n])
+            offset += n
+        else:
+            values.append(np.array([item], dtype=np.uint64))
+    header = np.array([_zigzag(np.array([precision]))[0], srs_id or 0], dtype=np.uint64)
+    body = np.concatenate([header] + values) if values else header
+    return bytes([(FORMAT_VERSION << 4) | GEOMETRY_TYPES[geometry['type']]]) + encode_varints(body)
+
+
+def _geometry_type(data: bytes) -> str:
+    if not data or data[0] >> 4 != FORMAT_VERSION or (data[0] & 0x0f) not in TYPE_NAMES:
+        raise ValueError("Not a compact geometry blob")
+    return TYPE_NAMES[data[0] & 0x0f]
+
+
+def read_header(data: bytes) -> Tuple[str, int, Optional[int]]:
+    """Return (geometry type, precision, srs_id or None) of a blob."""
+    geom_type = _geometry_type(data)
+    end, seen = 1, 0
+    while seen < 2:
+        seen += not data[end] & 0x80
+        end += 1
+    precision, srs_id = decode_varints(data[1:end])
+    return geom_type, int(_unzigzag(np.array([precision]))[0]), int(srs_id) or None
+
+
+def decode_geometry(data: bytes) -> dict:
+    """Decode a compact blob into a geometry with numpy coordinate arrays (like decode_gpkg_geometry)."""
+    geom_type = _geometry_type(data)
+    values = decode_varints(data[1:])
+    precision = int(_unzigzag(values[:1])[0])
+    pos = 2
+
+    # Walk the count stream to find each coordinate run
+    runs = []
+
+    def read_count() -> int:
+        nonlocal pos
+        pos += 1
+        return int(values[pos - 1])
+
+    def read_run(n: int) -> int:
+        nonlocal pos
+        runs.append((pos, n))
+        pos += 2 * n
+        return len(runs) - 1
+
+    if geom_type == 'Point':
+        shape = read_run(1)
+    elif geom_type in ('LineString', 'MultiPoint'):
+        shape = read_run(read_count())
+    elif geom_type in ('Polygon', 'MultiLineString'):
+        shape = [read_run(read_count()) for _ in range(read_count())]
+    else:
+        shape = [[read_run(read_count()) for _ in range(read_count())] for _ in range(read_count())]
+
+    index = np.concatenate([np.arange(start, start + 2 * n) for start, n in runs]) if runs else np.zeros(0, dtype=np.int64)
+    coords = np.cumsum(_unzigzag(values[index]).reshape(-1, 2), axis=0) / 10.0 ** precision
+    bounds = np.cumsum([0] + [n for _, n in runs])
+    arrays = [coords[bounds[i]:bounds[i + 1]] for i in range(len(runs))]
+
+    def ring(i):
+        a = arrays[i]
+        return np.vstack([a, a[:1]]) if len(a) else a
+
+    if geom_type == 'Point':
+        coordinates = arrays[shape][0]
+    elif geom_type in ('LineString', 'MultiPoint'):
+        coordinates = arrays[shape]
+    elif geom_type == 'Polygon':
+        coordinates = [ring(i) for i in shape]
+    elif geom_type == 'MultiLineString':
+        coordinates = [arrays[i] for i in shape]
+    else:
+        coordinates = [[ring(i) for i in polygon] for polygon in shape]
+    return {'type': geom_type, 'coordinates': coordinates}
+
+
+def bytea_literal(data: bytes) -> str:
+    """Postgres bytea hex input ('\\x...'), as PostgREST expects in JSON."""
+    return '\\x' + data.hex()
+
+
+def write_container(out: BinaryIO, records: Iterable[Tuple[str, bytes]]) -> int:
+    """Write (key, blob) records to a .mngeom stream; returns the record count."""
+    out.write(CONTAINER_MAGIC)
+    count = 0
+    for key, blob in records:
+        key_bytes = key.encode('utf-8')
+        out.write(encode_varints(np.array([len(key_bytes)])) + key_bytes)
+        out.write(encode_varints(np.array([len(blob)])) + blob)
+        count += 1
+    return count
+
+
+def _read_varint(stream: BinaryIO) -> Optional[int]:
+    value, shift = 0, 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("Truncated varint")
+            return None
+        value |= (byte[0] & 0x7f) << shift
+        if not byte[0] & 0x80:
+            return value
+        shift += 7
+
+
+def iter_container(stream: BinaryIO) -> Iterator[Tuple[str, bytes]]:
+    """Yield (key, blob) records from a .mngeom stream."""
+    if stream.read(len(CONTAINER_MAGIC)) != CONTAINER_MAGIC:
+        raise ValueError("Not a compact geometry container")
+    while True:
+        key_length = _read_varint(stream)
+        if key_length is None:
+            return
+        key = stream.read(key_length).decode('utf-8')
+        yield key, stream.read(_read_varint(stream))
+
+
+def _record_geometry(record: Dict) -> Optional[dict]:
+    geometry = record.get('geometry')
+    if geometry and geometry.get('type') == 'FeatureCollection':
+        features = geometry.get('features') or []
+        geometry = features[0].get('geometry') if features else None
+    return geometry
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if command == 'pack' and len(sys.argv) >= 4:
+        from gpkg_geometry import iter_coordinate_arrays
+
+        input_path, output_path = Path(sys.argv[2]), Path(sys.argv[3])
+        if not input_path.exists():
+            print(f"ERROR: Extract file not found: {input_path}")
+            sys.exit(1)
+        records = json.loads(input_path.read_text(encoding='utf-8'))
+        srs_id = int(sys.argv[4]) if len(sys.argv) > 4 else None
+        if srs_id is None:
+            sample = [_record_geometry(r) for r in records[:100]]
+            coords = [a for g in sample if g for a in iter_coordinate_arrays(g)]
+            srs_id = infer_srs(np.concatenate(coords)) if coords else None
+            if srs_id is None:
+                print("ERROR: Coordinates are not lon/lat; pass the projected srs_id (e.g. 26915)")
+                sys.exit(1)
+            print(f"⚠️  No srs_id given; inferred EPSG:{srs_id} from the coordinate range")
+
+        json_bytes = compact_bytes = 0
+        blobs = []
+        for idx, record in enumerate(records):
+            geometry = _record_geometry(record)
+            if not geometry:
+                continue
+            compact = record.get('geometry_compact')
+            blob = bytes.fromhex(compact[2:]) if compact else encode_geometry(geometry, srs_id=srs_id)
+            json_bytes += len(json.dumps(record['geometry'], separators=(',', ':')))
+            compact_bytes += len(blob)
+            blobs.append((record.get('gnis_feature_id') or str(idx), blob))
+        with open(output_path, 'wb') as f:
+            count = write_container(f, blobs)
+        ratio = json_bytes / compact_bytes if compact_bytes else 0
+        print(f"✅ Packed {count} geometries -> {output_path}")
+        print(f"   JSON {json_bytes:,} bytes -> compact {compact_bytes:,} bytes ({ratio:.1f}x smaller)")
+    elif command == 'unpack' and len(sys.argv) >= 4:
+        from gpkg_geometry import to_geojson
+
+        input_path, output_path = Path(sys.argv[2]), Path(sys.argv[3])
+        if not input_path.exists():
+            print(f"ERROR: Container not found: {input_path}")
+            sys.exit(1)
+        with open(input_path, 'rb') as f:
+            features = [{'type': 'Feature', 'id': key, 'properties': {}, 'geometry': to_geojson(decode_geometry(blob))}
+                        for key, blob in iter_container(f)]
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({'type': 'FeatureCollection', 'features': features}, f)
+        print(f"✅ Unpacked {len(features)} geometries -> {output_path}")
+    else:
+        print("Usage: python3 geometry_codec.py [pack <extract.json> <output.mngeom> [srs_id] | unpack <input.mngeom> <output.geojson>]")
+        sys.exit(1)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Vectorized polygon area, bounding box and centroid for whole layers.
+
+All rings of all features are packed into one coordinate array and the
+shoelace sums are taken per ring with numpy, so a batch of thousands of
+CTU polygons is measured in a single pass. Areas are equal-area:
+
+  - EPSG:4326 coordinates are projected to the ellipsoidal Lambert
+    cylindrical equal-area projection before summing.
+  - UTM coordinates (NAD83 / WGS84 zones) are corrected for the
+    transverse Mercator scale factor at each ring's centroid.
+  - Anything else is treated as planar metres.
+
+Holes (every ring after a polygon's first) are subtracted.
+lonlat_to_utm() projects WGS84 points into the UTM layers' metres and
+utm_to_lonlat() inverts it; reproject.py builds on both.
+"""
+
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from gpkg_geometry import iter_polygons
+
+SQUARE_METERS_PER_ACRE = 4046.8564224
+
+# GRS80 / WGS84 ellipsoid (identical to the precision that matters here)
+SEMI_MAJOR_AXIS = 6378137.0
+ECCENTRICITY_SQ = 0.00669438002290
+UTM_SCALE_FACTOR = 0.9996
+UTM_FALSE_EASTING = 500000.0
+MEAN_EARTH_RADIUS = 6371008.8
+
+
+class PackedPolygons(NamedTuple):
+    """Closed rings of many features concatenated into flat arrays."""
+    coords: np.ndarray          # (n_vertices, 2)
+    ring_offsets: np.ndarray    # (n_rings + 1,) start of each ring in coords
+    ring_feature: np.ndarray    # (n_rings,) feature index owning each ring
+    ring_is_hole: np.ndarray    # (n_rings,) True for interior rings
+    n_features: int
+
+
+class PolygonMeasures(NamedTuple):
+    area_m2: np.ndarray         # (n_features,) 0 where a feature has no polygon
+    bbox: np.ndarray            # (n_features, 4) minx, miny, maxx, maxy; NaN when empty
+    centroid: np.ndarray        # (n_features, 2) area-weighted; NaN when empty
+
+
+def pack_polygons(geometries: List[Optional[dict]]) -> PackedPolygons:
+    """Pack every polygon ring of `geometries` (closing open rings) into flat arrays."""
+    rings, ring_feature, ring_is_hole = [], [], []
+    for feature_idx, geometry in enumerate(geometries):
+        if not geometry:
+            continue
+        for polygon in iter_polygons(geometry):
+            for ring_idx, ring in enumerate(polygon):
+                if len(ring) < 3:
+                    continue
+                if not np.array_equal(ring[0], ring[-1]):
+                    ring = np.vstack([ring, ring[:1]])
+                rings.append(ring)
+                ring_feature.append(feature_idx)
+                ring_is_hole.append(ring_idx > 0)
+
+    lengths = np.array([len(r) for r in rings], dtype=np.int64)
+    return PackedPolygons(
+        coords=np.concatenate(rings) if rings else np.zeros((0, 2)),
+        ring_offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        ring_feature=np.array(ring_feature, dtype=np.int64),
+        ring_is_hole=np.array(ring_is_hole, dtype=bool),
+        n_features=len(geometries),
+    )
+
+
+def _authalic_q(lat_rad: np.ndarray) -> np.ndarray:
+    e = np.sqrt(ECCENTRICITY_SQ)
+    sin_lat = np.sin(lat_rad)
+    return (1 - ECCENTRICITY_SQ) * (
+        sin_lat / (1 - ECCENTRICITY_SQ * sin_lat ** 2)
+        - np.log((1 - e * sin_lat) / (1 + e * sin_lat)) / (2 * e)
+    )
+
+
+def equal_area_xy(lonlat: np.ndarray) -> np.ndarray:
+    """Project lon/lat degrees to ellipsoidal Lambert cylindrical equal-area metres."""
+    lon, lat = np.radians(lonlat[:, 0]), np.radians(lonlat[:, 1])
+    return np.column_stack([SEMI_MAJOR_AXIS * lon, SEMI_MAJOR_AXIS * _authalic_q(lat) / 2])
+
+
+def lonlat_to_utm(lonlat: np.ndarray, zone: int = 15) -> np.ndarray:
+    """Project lon/lat degrees to UTM easting/northing (northern hemisphere) with the Krüger series."""
+    lonlat = np.asarray(lonlat, dtype=np.float64).reshape(-1, 2)
+    flattening = 1 - np.sqrt(1 - ECCENTRICITY_SQ)
+    n = flattening / (2 - flattening)
+    rectifying_radius = SEMI_MAJOR_AXIS / (1 + n) * (1 + n ** 2 / 4 + n ** 4 / 64)
+    alpha = (n / 2 - 2 * n ** 2 / 3 + 5 * n ** 3 / 16, 13 * n ** 2 / 48 - 3 * n ** 3 / 5, 61 * n ** 3 / 240)
+
+    lat = np.radians(lonlat[:, 1])
+    dlon = np.radians(lonlat[:, 0] - (zone * 6 - 183))
+    c = 2 * np.sqrt(n) / (1 + n)
+    t = np.sinh(np.arctanh(np.sin(lat)) - c * np.arctanh(c * np.sin(lat)))
+    xi = np.arctan2(t, np.cos(dlon))
+    eta = np.arctanh(np.sin(dlon) / np.sqrt(1 + t ** 2))
+
+    easting, northing = eta.copy(), xi.copy()
+    for j, a in enumerate(alpha, start=1):
+        easting += a * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+        northing += a * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+    scale = UTM_SCALE_FACTOR * rectifying_radius
+    return np.column_stack([UTM_FALSE_EASTING + scale * easting, scale * northing])
+
+
+def utm_to_lonlat(xy: np.ndarray, zone: int = 15) -> np.ndarray:
+    """Inverse of lonlat_to_utm: UTM easting/northing (northern hemisphere) to lon/lat degrees."""
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    flattening = 1 - np.sqrt(1 - ECCENTRICITY_SQ)
+    n = flattening / (2 - flattening)
+    rectifying_radius = SEMI_MAJOR_AXIS / (1 + n) * (1 + n ** 2 / 4 + n ** 4 / 64)
+    beta = (n / 2 - 2 * n ** 2 / 3 + 37 * n ** 3 / 96, n ** 2 / 48 + n ** 3 / 15, 17 * n ** 3 / 480)
+    delta = (2 * n - 2 * n ** 2 / 3 - 2 * n ** 3 + 116 * n ** 4 / 45,
+             7 * n ** 2 / 3 - 8 * n ** 3 / 5 - 227 * n ** 4 / 45,
+             56 * n ** 3 / 15 - 136 * n ** 4 / 35,
+             4279 * n ** 4 / 630)
+
+    scale = UTM_SCALE_FACTOR * rectifying_radius
+    xi = xy[:, 1] / scale
+    eta = (xy[:, 0] - UTM_FALSE_EASTING) / scale
+    xi_prime, eta_prime = xi.copy(), eta.copy()
+    for j, b in enumerate(beta, start=1):
+        xi_prime -= b * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+        eta_prime -= b * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+
+    # Conformal latitude, then geodetic latitude by series
+    chi = np.arcsin(np.sin(xi_prime) / np.cosh(eta_prime))
+    lat = chi.copy()
+    for j, d in enumerate(delta, start=1):
+        lat += d * np.sin(2 * j * chi)
+    lon = (zone * 6 - 183) + np.degrees(np.arctan2(np.sinh(eta_prime), np.cos(xi_prime)))
+    return np.column_stack([lon, np.degrees(lat)])
+
+
+def is_utm_srs(srs_id: Optional[int]) -> bool:
+    """NAD83 (EPSG:269xx) and WGS84 (EPSG:326xx / 327xx) UTM zones."""
+    return srs_id is not None and (26901 <= srs_id <= 26923 or 32601 <= srs_id <= 32660 or 32701 <= srs_id <= 32760)
+
+
+def _ring_sums(coords: np.ndarray, packed: PackedPolygons):
+    """Return per-ring (signed area, centroid x, centroid y) via the shoelace formula."""
+    n_rings = len(packed.ring_feature)
+    lengths = np.diff(packed.ring_offsets)
+    ring_of_vertex = np.repeat(np.arange(n_rings), lengths)
+
+    # Work relative to each ring's first vertex to keep precision on large UTM values
+    origin = coords[packed.ring_offsets[:-1]]
+    local = coords - origin[ring_of_vertex]
+    x, y = local[:, 0], local[:, 1]
+
+    is_edge = np.ones(len(coords) - 1, dtype=bool) if len(coords) else np.zeros(0, dtype=bool)
+    is_edge[packed.ring_offsets[1:-1] - 1] = False
+    edge_ring = ring_of_vertex[:-1][is_edge]
+    x0, y0 = x[:-1][is_edge], y[:-1][is_edge]
+    x1, y1 = x[1:][is_edge], y[1:][is_edge]
+
+    cross = x0 * y1 - x1 * y0
+    area = np.bincount(edge_ring, cross, minlength=n_rings) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cx = np.bincount(edge_ring, (x0 + x1) * cross, minlength=n_rings) / (6 * area) + origin[:, 0]
+        cy = np.bincount(edge_ring, (y0 + y1) * cross, minlength=n_rings) / (6 * area) + origin[:, 1]
+    return area, cx, cy
+
+
+def polygon_measures(geometries: List[Optional[dict]], srs_id: Optional[int] = None) -> PolygonMeasures:
+    """Measure area (m²), bbox and centroid for each geometry in one vectorized batch.
+
+    bbox and centroid are in the geometries' own CRS.
+    """
+    packed = pack_polygons(geometries)
+    n = packed.n_features
+    area_m2 = np.zeros(n)
+    bbox = np.full((n, 4), np.nan)
+    centroid = np.full((n, 2), np.nan)
+    if not len(packed.ring_feature):
+        return PolygonMeasures(area_m2, bbox, centroid)
+
+    planar_area, cx, cy = _ring_sums(packed.coords, packed)
+    if srs_id == 4326:
+        ring_area, _, _ = _ring_sums(equal_area_xy(packed.coords), packed)
+        ring_area = np.abs(ring_area)
+    else:
+        ring_area = np.abs(planar_area)
+        if is_utm_srs(srs_id):
+            # Transverse Mercator point scale k ≈ k0 (1 + x² / 2R²), x = distance from central meridian
+            x = (cx - UTM_FALSE_EASTING) / UTM_SCALE_FACTOR
+            scale = UTM_SCALE_FACTOR * (1 + x ** 2 / (2 * MEAN_EARTH_RADIUS ** 2))
+            ring_area = ring_area / scale ** 2
+
+    sign = np.where(packed.ring_is_hole, -1.0, 1.0)
+    area_m2 = np.bincount(packed.ring_feature, sign * ring_area, minlength=n)
+
+    weight = sign * np.abs(planar_area)
+    total_weight = np.bincount(packed.ring_feature, weight, minlength=n)
+    ok = ~np.isnan(cx) & ~np.isnan(cy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centroid[:, 0] = np.bincount(packed.ring_feature[ok], (weight * cx)[ok], minlength=n) / total_weight
+        centroid[:, 1] = np.bincount(packed.ring_feature[ok], (weight * cy)[ok], minlength=n) / total_weight
+
+    lengths = np.diff(packed.ring_offsets)
+    vertex_feature = np.repeat(packed.ring_feature, lengths)
+    has_rings = np.bincount(packed.ring_feature, minlength=n) > 0
+    for col, ufunc in ((0, np.minimum), (1, np.minimum), (2, np.maximum), (3, np.maximum)):
+        values = np.full(n, np.inf if ufunc is np.minimum else -np.inf)
+        ufunc.at(values, vertex_feature, packed.coords[:, col % 2])
+        bbox[has_rings, col] = values[has_rings]
+
+    return PolygonMeasures(area_m2, bbox, centroid)
+
+
+def to_acres(area_m2) -> np.ndarray:
+    """Convert square metres to acres rounded for a NUMERIC(12, 2) column."""
+    return np.round(np.asarray(area_m2) / SQUARE_METERS_PER_ACRE, 2)
+
+
+def measure_fields(measures: PolygonMeasures, idx: int) -> dict:
+    """Return the acres / bbox / centroid record fields for one measured feature."""
+    if np.isnan(measures.bbox[idx, 0]):
+        return {"acres": None, "bbox": None, "centroid": None}
+    return {
+        "acres": float(to_acres(measures.area_m2[idx])),
+        "bbox": [float(v) for v in measures.bbox[idx]],
+        "centroid": [float(v) for v in measures.centroid[idx]],
+    }
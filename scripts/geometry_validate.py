@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Validate and repair decoded geometries before they are loaded.
+
+Each polygon ring is checked and, where it is safe, repaired in place:
+
+    unclosed_ring       first vertex != last vertex      closed
+    duplicate_points    consecutive identical vertices   removed
+    degenerate_ring     < 4 vertices or zero area        ring dropped (a
+                                                         dropped exterior
+                                                         drops its holes)
+    ring_orientation    exterior not counter-clockwise   reversed
+                        or hole not clockwise
+    self_intersection   two edges of the feature cross   reported only
+                        or overlap collinearly
+
+Line strings get the duplicate-point pass; points pass through. Edge
+crossings are found with a sort-and-sweep over all edges of a feature:
+edges sorted by min x, each compared only with the edges whose x range it
+sweeps over and whose y range overlaps, then tested exactly with
+orientation predicates. Edges sharing a ring vertex are not compared, and
+rings touching at a single vertex are not reported.
+
+Layers are validated in parallel: every layer is cut into chunks and all
+chunks of all layers share one process pool.
+
+Usage:
+    python scripts/geometry_validate.py [--out issues.ndjson] [--strict] [gpkg ...]
+
+With no paths, every *.gpkg under minnesota_gov/GIS is validated. --strict
+exits non-zero when any feature has an issue that was not repaired.
+"""
+
+import json
+import sqlite3
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gpkg_geometry import decode_gpkg_geometry, select_features
+
+MAX_WORKERS = 4
+CHUNK_SIZE = 2000
+PAIR_CHUNK_SIZE = 1_000_000
+
+POLYGON_TYPES = ('Polygon', 'MultiPolygon')
+LINE_TYPES = ('LineString', 'MultiLineString')
+
+
+class Issue(NamedTuple):
+    """One problem found in a feature; part/ring are -1 when not applicable."""
+    code: str
+    part: int = -1
+    ring: int = -1
+    count: int = 1
+    x: Optional[float] = None
+    y: Optional[float] = None
+    repaired: bool = True
+
+
+def _signed_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0] - ring[0, 0], ring[:, 1] - ring[0, 1]
+    return float((x[:-1] * y[1:] - x[1:] * y[:-1]).sum() / 2)
+
+
+def _drop_duplicates(coords: np.ndarray) -> Tuple[np.ndarray, int]:
+    keep = np.ones(len(coords), dtype=bool)
+    keep[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+    return coords[keep], int(len(coords) - keep.sum())
+
+
+def repair_ring(ring, is_hole: bool, part: int = -1, ring_idx: int = -1) -> Tuple[Optional[np.ndarray], List[Issue]]:
+    """Close, de-duplicate and orient one ring; None when it is degenerate."""
+    ring = np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+    issues = []
+    if len(ring) and not np.array_equal(ring[0], ring[-1]):
+        ring = np.vstack([ring, ring[:1]])
+        issues.append(Issue('unclosed_ring', part, ring_idx))
+    ring, removed = _drop_duplicates(ring)
+    if removed:
+        issues.append(Issue('duplicate_points', part, ring_idx, removed))
+    area = _signed_area(ring) if len(ring) >= 4 else 0.0
+    if area == 0:
+        issues.append(Issue('degenerate_ring', part, ring_idx, len(ring)))
+        return None, issues
+    if is_hole == (area > 0):
+        ring = ring[::-1]
+        issues.append(Issue('ring_orientation', part, ring_idx))
+    return ring, issues
+
+
+def _cross(ax, ay, bx, by):
+    return ax * by - ay * bx
+
+
+def edge_crossings(rings: Sequence[np.ndarray]) -> Tuple[int, Optional[Tuple[float, float]]]:
+    """Count crossing or collinear-overlapping edge pairs among closed rings; also return the first location."""
+    rings = [r for r in rings if len(r) >= 4]
+    if not rings:
+        return 0, None
+    origin = rings[0][0]
+    start = np.concatenate([r[:-1] for r in rings]) - origin
+    end = np.concatenate([r[1:] for r in rings]) - origin
+    ring_len = np.concatenate([np.full(len(r) - 1, len(r) - 1) for r in rings])
+    ring_id = np.repeat(np.arange(len(rings)), [len(r) - 1 for r in rings])
+    position = np.concatenate([np.arange(len(r) - 1) for r in rings])
+
+    xmin, xmax = np.minimum(start[:, 0], end[:, 0]), np.maximum(start[:, 0], end[:, 0])
+    ymin, ymax = np.minimum(start[:, 1], end[:, 1]), np.maximum(start[:, 1], end[:, 1])
+    order = np.argsort(xmin, kind='stable')
+    n = len(order)
+    # Sweep: edge order[i] can only meet the later edges whose xmin <= its xmax
+    stop = np.searchsorted(xmin[order], xmax[order], side='right')
+    counts = np.maximum(stop - np.arange(n) - 1, 0)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    total, location = 0, None
+    lo = 0
+    while lo < n:
+        hi = max(int(np.searchsorted(offsets, offsets[lo] + PAIR_CHUNK_SIZE, side='right')) - 1, lo + 1)
+        hi = min(hi, n)
+        chunk_counts = counts[lo:hi]
+        lo_idx = np.repeat(np.arange(lo, hi), chunk_counts)
+        hi_idx = lo_idx + 1 + np.arange(len(lo_idx)) - np.repeat(offsets[lo:hi] - offsets[lo], chunk_counts)
+        i, j = order[lo_idx], order[hi_idx]
+        lo = hi
+
+        keep = (ymin[j] <= ymax[i]) & (ymin[i] <= ymax[j])
+        # Edges sharing a vertex of the same ring always touch
+        gap = np.abs(position[i] - position[j])
+        keep &= ~((ring_id[i] == ring_id[j]) & ((gap == 1) | (gap == ring_len[i] - 1)))
+        i, j = i[keep], j[keep]
+        if not len(i):
+            continue
+
+        a, b, c, d = start[i], end[i], start[j], end[j]
+        ab, cd = b - a, d - c
+        d1 = _cross(ab[:, 0], ab[:, 1], c[:, 0] - a[:, 0], c[:, 1] - a[:, 1])
+        d2 = _cross(ab[:, 0], ab[:, 1], d[:, 0] - a[:, 0], d[:, 1] - a[:, 1])
+        d3 = _cross(cd[:, 0], cd[:, 1], a[:, 0] - c[:, 0], a[:, 1] - c[:, 1])
+        d4 = _cross(cd[:, 0], cd[:, 1], b[:, 0] - c[:, 0], b[:, 1] - c[:, 1])
+        proper = (d1 * d2 < 0) & (d3 * d4 < 0)
+
+        # Collinear edges overlapping over a positive length
+        axis = (np.abs(ab[:, 0]) < np.abs(ab[:, 1])).astype(int)
+        rows = np.arange(len(i))
+        a_lo = np.minimum(a[rows, axis], b[rows, axis])
+        a_hi = np.maximum(a[rows, axis], b[rows, axis])
+        c_lo = np.minimum(c[rows, axis], d[rows, axis])
+        c_hi = np.maximum(c[rows, axis], d[rows, axis])
+        overlap = (d1 == 0) & (d2 == 0) & (np.maximum(a_lo, c_lo) < np.minimum(a_hi, c_hi))
+
+        hits = proper | overlap
+        total += int(hits.sum())
+        if location is None and hits.any():
+            k = int(np.argmax(hits))
+            if proper[k]:
+                t = d3[k] / (d3[k] - d4[k])
+                point = a[k] + t * ab[k]
+            else:
+                # An endpoint of one edge lies inside the other
+                inside = [p for p, lo_, hi_ in ((c[k], a_lo[k], a_hi[k]), (d[k], a_lo[k], a_hi[k]))
+                          if lo_ <= p[axis[k]] <= hi_]
+                point = inside[0] if inside else a[k]
+            location = (float(point[0] + origin[0]), float(point[1] + origin[1]))
+    return total, location
+
+
+def _repair_polygon(rings, part: int) -> Tuple[Optional[List[np.ndarray]], List[Issue]]:
+    issues, repaired = [], []
+    for ring_idx, ring in enumerate(rings):
+        fixed, ring_issues = repair_ring(ring, ring_idx > 0, part, ring_idx)
+        issues.extend(ring_issues)
+        if fixed is None and ring_idx == 0:
+            if len(rings) > 1:
+                issues.append(Issue('degenerate_ring', part, -1, len(rings) - 1))
+            return None, issues
+        if fixed is not None:
+            repaired.append(fixed)
+    return repaired, issues
+
+
+def repair_geometry(geometry: Optional[dict]) -> Tuple[Optional[dict], List[Issue]]:
+    """Return (repaired geometry with numpy coordinates, issues); None when nothing valid is left."""
+    if not geometry:
+        return None, [Issue('empty_geometry', repaired=False)]
+    geom_type = geometry['type']
+    coords = geometry.get('coordinates')
+
+    if geom_type in POLYGON_TYPES:
+        parts = [coords] if geom_type == 'Polygon' else coords
+        issues, polygons = [], []
+        for part, rings in enumerate(parts):
+            polygon, part_issues = _repair_polygon(rings, part if geom_type == 'MultiPolygon' else -1)
+            issues.extend(part_issues)
+            if polygon:
+                polygons.append(polygon)
+        if not polygons:
+            return None, issues + [Issue('empty_geometry', repaired=False)]
+        crossings, location = edge_crossings([r for polygon in polygons for r in polygon])
+        if crossings:
+            issues.append(Issue('self_intersection', count=crossings, x=location[0], y=location[1], repaired=False))
+        if geom_type == 'Polygon':
+            return {'type': geom_type, 'coordinates': polygons[0]}, issues
+        return {'type': geom_type, 'coordinates': polygons}, issues
+
+    if geom_type in LINE_TYPES:
+        parts = [coords] if geom_type == 'LineString' else coords
+        issues, lines = [], []
+        for part, line in enumerate(parts):
+            line, removed = _drop_duplicates(np.asarray(line, dtype=np.float64).reshape(-1, 2))
+            if removed:
+                issues.append(Issue('duplicate_points', part if geom_type == 'MultiLineString' else -1, count=removed))
+            lines.append(line)
+        return {'type': geom_type, 'coordinates': lines[0] if geom_type == 'LineString' else lines}, issues
+
+    return geometry, []
+
+
+def issue_report(issues: Iterable[Issue]) -> List[Dict]:
+    """Issues as JSON-ready dicts, dropping unset fields."""
+    return [{k: v for k, v in issue._asdict().items() if v is not None and v != -1} for issue in issues]
+
+
+def has_errors(issues: Iterable[Issue]) -> bool:
+    return any(not issue.repaired for issue in issues)
+
+
+def _repair_chunk(geometries: List[Optional[dict]]) -> List[Tuple[Optional[dict], List[Issue]]]:
+    return [repair_geometry(g) for g in geometries]
+
+
+def repair_geometries(geometries: List[Optional[dict]], workers: int = MAX_WORKERS,
+                      chunk_size: int = CHUNK_SIZE) -> List[Tuple[Optional[dict], List[Issue]]]:
+    """repair_geometry over a list, chunked across worker processes."""
+    chunks = [geometries[i:i + chunk_size] for i in range(0, len(geometries), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return [result for chunk in chunks for result in _repair_chunk(chunk)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return [result for results in pool.map(_repair_chunk, chunks) for result in results]
+
+
+def print_issue_summary(label: str, features: int, errors: int, counts: Counter) -> None:
+    if not counts:
+        print(f"✅ {label}: {features:,} geometries valid")
+        return
+    detail = ', '.join(f"{code} {n:,}" for code, n in sorted(counts.items()))
+    marker = '⚠️ ' if errors else '✅'
+    print(f"{marker} {label}: {features:,} geometries, {errors:,} with unrepaired issues ({detail})")
+
+
+def summarize(label: str, results: Sequence[Tuple[Optional[dict], List[Issue]]]) -> None:
+    """Print one summary line for repair_geometries() results."""
+    counts = Counter(issue.code for _, issues in results for issue in issues)
+    errors = sum(1 for _, issues in results if has_errors(issues))
+    print_issue_summary(label, len(results), errors, counts)
+
+
+def write_issue_report(path, keys: Sequence[Dict], results: Sequence[Tuple[Optional[dict], List[Issue]]]) -> int:
+    """Write one NDJSON line ({**key, 'issues': [...]}) per feature with issues; nothing when there are none."""
+    lines = [json.dumps({**key, 'issues': issue_report(issues)}, ensure_ascii=False) + '\n'
+             for key, (_, issues) in zip(keys, results) if issues]
+    if lines:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+    return len(lines)
+
+
+def _layer_chunks(layer: Dict, chunk_size: int) -> List[Tuple]:
+    """Split a layer into primary-key ranges of about chunk_size features."""
+    conn = sqlite3.connect(f"file:{layer['path']}?mode=ro", uri=True)
+    try:
+        lo, hi = conn.execute(f'SELECT MIN("{layer["pk"]}"), MAX("{layer["pk"]}") FROM "{layer["layer"]}"').fetchone()
+    finally:
+        conn.close()
+    if lo is None:
+        return []
+    n_chunks = max(1, -(-layer['feature_count'] // chunk_size))
+    step = max(1, -(-(hi - lo + 1) // n_chunks))
+    return [(layer, start, start + step) for start in range(lo, hi + 1, step)]
+
+
+def validate_chunk(task) -> Dict:
+    """Worker: validate one pk range of a layer. task = (layer, pk_start, pk_stop)."""
+    layer, pk_start, pk_stop = task
+    pk = layer['pk']
+    counts, features, errors, reports = Counter(), 0, 0, []
+    conn = sqlite3.connect(f"file:{layer['path']}?mode=ro", uri=True)
+    try:
+        rows = select_features(conn, layer['layer'], [pk], where=f'"{pk}" >= ? AND "{pk}" < ?',
+                               params=(pk_start, pk_stop), order_by=f'"{pk}"')
+        for fid, blob in rows:
+            features += 1
+            _, issues = repair_geometry(decode_gpkg_geometry(blob))
+            if issues:
+                counts.update(issue.code for issue in issues)
+                errors += has_errors(issues)
+                reports.append({'source': layer['source'], 'layer': layer['layer'], 'fid': fid,
+                                'issues': issue_report(issues)})
+    finally:
+        conn.close()
+    return {'source': layer['source'], 'layer': layer['layer'], 'features': features,
+            'errors': errors, 'counts': counts, 'reports': reports}
+
+
+def validate_layers(layers: List[Dict], workers: int = MAX_WORKERS, chunk_size: int = CHUNK_SIZE) -> List[Dict]:
+    """Validate every feature layer in parallel; one merged result per layer, in input order."""
+    layers = [l for l in layers if l['geometry_column']]
+    tasks = [task for layer in layers for task in _layer_chunks(layer, chunk_size)]
+    merged = {(l['source'], l['layer']): {'source': l['source'], 'layer': l['layer'], 'features': 0,
+                                          'errors': 0, 'counts': Counter(), 'reports': []} for l in layers}
+    if tasks:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for result in pool.map(validate_chunk, tasks):
+                total = merged[(result['source'], result['layer'])]
+                total['features'] += result['features']
+                total['errors'] += result['errors']
+                total['counts'].update(result['counts'])
+                total['reports'].extend(result['reports'])
+    return list(merged.values())
+
+
+def main():
+    args = sys.argv[1:]
+    strict = '--strict' in args
+    out_path = None
+    if '--out' in args:
+        idx = args.index('--out')
+        if idx + 1 >= len(args):
+            print("Usage: python3 geometry_validate.py [--out issues.ndjson] [--strict] [gpkg ...]")
+            sys.exit(1)
+        out_path = args[idx + 1]
+        del args[idx:idx + 2]
+
+    from gpkg_ingest import collect_layers, find_gpkg_files
+
+    paths = [Path(a) for a in args if not a.startswith('--')] or find_gpkg_files()
+    missing = [p for p in paths if not p.exists()]
+    if missing:
+        print(f"Error: GeoPackage not found: {missing[0]}")
+        sys.exit(1)
+
+    results = validate_layers(collect_layers(paths))
+    errors = 0
+    for result in results:
+        print_issue_summary(f"{result['source']} / {result['layer']}", result['features'],
+                            result['errors'], result['counts'])
+        errors += result['errors']
+
+    if out_path:
+        with open(out_path, 'w', encoding='utf-8') as f:
+            for result in results:
+                f.writelines(json.dumps(report, ensure_ascii=False) + '\n' for report in result['reports'])
+        print(f"📁 Issue report -> {out_path}")
+    if strict and errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
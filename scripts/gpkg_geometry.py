@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+GeoPackage geometry blob decoding shared by the GIS extraction scripts.
+
+A GPKG geometry blob is a small header (magic, flags, srs_id, optional
+envelope) followed by standard WKB. Geometries decode to GeoJSON-shaped
+dicts whose coordinates are numpy arrays (one (n, 2) array per ring or
+line) so downstream code can work on whole coordinate arrays at once.
+Use to_geojson() before writing them out as JSON.
+
+select_features() reads a layer limited to a bounding box, through the
+GeoPackage R-tree extension (rtree_<table>_<column>) when the file has one
+and by pruning on each blob's header envelope when it doesn't.
+"""
+
+import sqlite3
+import struct
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+GPKG_MAGIC = b'GP'
+
+# Envelope indicator (flags bits 1-3) -> number of doubles in the envelope
+ENVELOPE_SIZES = {0: 0, 1: 4, 2: 6, 3: 6, 4: 8}
+
+WKB_TYPES = {
+    1: 'Point',
+    2: 'LineString',
+    3: 'Polygon',
+    4: 'MultiPoint',
+    5: 'MultiLineString',
+    6: 'MultiPolygon',
+    7: 'GeometryCollection',
+}
+
+# ISO WKB dimension block (type // 1000) -> doubles per vertex
+WKB_DIMS = {0: 2, 1: 3, 2: 3, 3: 4}
+
+Bounds = Tuple[float, float, float, float]
+
+
+def parse_gpkg_header(blob: bytes) -> Tuple[int, Optional[Bounds], int, bool]:
+    """Parse a GPKG blob header into (srs_id, envelope, wkb_offset, is_empty).
+
+    The envelope is returned as (minx, miny, maxx, maxy), or None when the
+    writer did not store one.
+    """
+    if len(blob) < 8 or blob[:2] != GPKG_MAGIC:
+        raise ValueError("Not a GeoPackage geometry blob")
+
+    flags = blob[3]
+    order = '<' if flags & 0x01 else '>'
+    envelope_code = (flags >> 1) & 0x07
+    is_empty = bool(flags & 0x10)
+    if envelope_code not in ENVELOPE_SIZES:
+        raise ValueError(f"Invalid GPKG envelope indicator: {envelope_code}")
+
+    srs_id = struct.unpack_from(order + 'i', blob, 4)[0]
+    n_doubles = ENVELOPE_SIZES[envelope_code]
+    envelope = None
+    if n_doubles:
+        minx, maxx, miny, maxy = struct.unpack_from(order + '4d', blob, 8)
+        envelope = (minx, miny, maxx, maxy)
+
+    return srs_id, envelope, 8 + n_doubles * 8, is_empty
+
+
+def _read_coords(buf: bytes, offset: int, order: str, ndim: int) -> Tuple[np.ndarray, int]:
+    count = struct.unpack_from(order + 'I', buf, offset)[0]
+    offset += 4
+    coords = np.frombuffer(buf, dtype=order + 'f8', count=count * ndim, offset=offset)
+    coords = coords.reshape(count, ndim)[:, :2].astype(np.float64)
+    return coords, offset + count * ndim * 8
+
+
+def _read_wkb(buf: bytes, offset: int) -> Tuple[dict, int]:
+    order = '<' if buf[offset] == 1 else '>'
+    wkb_type = struct.unpack_from(order + 'I', buf, offset + 1)[0]
+    offset += 5
+
+    base_type = wkb_type % 1000
+    ndim = WKB_DIMS.get(wkb_type // 1000, 2)
+    if base_type not in WKB_TYPES:
+        raise ValueError(f"Unsupported WKB geometry type: {wkb_type}")
+    geom_type = WKB_TYPES[base_type]
+
+    if base_type == 1:
+        point = np.frombuffer(buf, dtype=order + 'f8', count=ndim, offset=offset)[:2].astype(np.float64)
+        return {"type": geom_type, "coordinates": point}, offset + ndim * 8
+
+    if base_type == 2:
+        coords, offset = _read_coords(buf, offset, order, ndim)
+        return {"type": geom_type, "coordinates": coords}, offset
+
+    if base_type == 3:
+        n_rings = struct.unpack_from(order + 'I', buf, offset)[0]
+        offset += 4
+        rings = []
+        for _ in range(n_rings):
+            ring, offset = _read_coords(buf, offset, order, ndim)
+            rings.append(ring)
+        return {"type": geom_type, "coordinates": rings}, offset
+
+    n_parts = struct.unpack_from(order + 'I', buf, offset)[0]
+    offset += 4
+    parts = []
+    for _ in range(n_parts):
+        part, offset = _read_wkb(buf, offset)
+        parts.append(part)
+
+    if base_type == 7:
+        return {"type": geom_type, "geometries": parts}, offset
+    return {"type": geom_type, "coordinates": [p["coordinates"] for p in parts]}, offset
+
+
+def decode_wkb(wkb: bytes) -> dict:
+    """Decode a WKB geometry into a GeoJSON-shaped dict of numpy arrays."""
+    geometry, _ = _read_wkb(wkb, 0)
+    return geometry
+
+
+def decode_gpkg_geometry(blob: Optional[bytes]) -> Optional[dict]:
+    """Decode a GPKG geometry blob, returning None for NULL or empty geometries."""
+    if not blob:
+        return None
+    _, _, wkb_offset, is_empty = parse_gpkg_header(blob)
+    if is_empty:
+        return None
+    geometry, _ = _read_wkb(blob, wkb_offset)
+    return geometry
+
+
+def iter_coordinate_arrays(geometry: dict) -> Iterator[np.ndarray]:
+    """Yield every (n, 2) coordinate array in a geometry (points as (1, 2))."""
+    geom_type = geometry["type"]
+    if geom_type == 'GeometryCollection':
+        for part in geometry["geometries"]:
+            yield from iter_coordinate_arrays(part)
+        return
+
+    coords = geometry["coordinates"]
+    if geom_type == 'Point':
+        yield np.asarray(coords, dtype=np.float64)[:2].reshape(1, 2)
+    elif geom_type in ('LineString', 'MultiPoint'):
+        yield np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    elif geom_type in ('Polygon', 'MultiLineString'):
+        for ring in coords:
+            yield np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+    elif geom_type == 'MultiPolygon':
+        for polygon in coords:
+            for ring in polygon:
+                yield np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+
+
+def iter_polygons(geometry: dict) -> Iterator[List[np.ndarray]]:
+    """Yield each polygon (exterior ring first, then holes) in a geometry."""
+    geom_type = geometry["type"]
+    if geom_type == 'Polygon':
+        yield [np.asarray(r, dtype=np.float64).reshape(-1, 2) for r in geometry["coordinates"]]
+    elif geom_type == 'MultiPolygon':
+        for polygon in geometry["coordinates"]:
+            yield [np.asarray(r, dtype=np.float64).reshape(-1, 2) for r in polygon]
+    elif geom_type == 'GeometryCollection':
+        for part in geometry["geometries"]:
+            yield from iter_polygons(part)
+
+
+def geometry_bounds(geometry: dict) -> Optional[Bounds]:
+    """Compute (minx, miny, maxx, maxy) from a decoded geometry's coordinates."""
+    arrays = [a for a in iter_coordinate_arrays(geometry) if len(a)]
+    if not arrays:
+        return None
+    coords = np.concatenate(arrays)
+    minx, miny = coords.min(axis=0)
+    maxx, maxy = coords.max(axis=0)
+    return float(minx), float(miny), float(maxx), float(maxy)
+
+
+def gpkg_bounds(blob: Optional[bytes]) -> Optional[Bounds]:
+    """Return a blob's envelope, from the header when present, else from its coordinates."""
+    if not blob:
+        return None
+    _, envelope, _, is_empty = parse_gpkg_header(blob)
+    if is_empty:
+        return None
+    if envelope is not None:
+        return envelope
+    geometry = decode_gpkg_geometry(blob)
+    return geometry_bounds(geometry) if geometry else None
+
+
+def to_geojson(geometry: Optional[dict]):
+    """Convert numpy coordinate arrays in a decoded geometry to plain lists."""
+    if geometry is None:
+        return None
+    if geometry["type"] == 'GeometryCollection':
+        return {"type": geometry["type"], "geometries": [to_geojson(g) for g in geometry["geometries"]]}
+    return {"type": geometry["type"], "coordinates": _coords_to_lists(geometry["coordinates"])}
+
+
+def _coords_to_lists(coords):
+    if isinstance(coords, np.ndarray):
+        return coords.tolist()
+    return [_coords_to_lists(c) for c in coords]
+
+
+def geometry_column(conn, table: str) -> Tuple[str, int]:
+    """Look up (geometry column name, srs_id) for a table in gpkg_geometry_columns."""
+    row = conn.execute(
+        "SELECT column_name, srs_id FROM gpkg_geometry_columns WHERE table_name = ?",
+        (table,)
+    ).fetchone()
+    if not row:
+        raise ValueError(f"No geometry column registered for table: {table}")
+    return row[0], row[1]
+
+
+def primary_key_column(conn, table: str) -> str:
+    """Return the integer primary key column of a GeoPackage feature table."""
+    for _, name, col_type, _, _, pk in conn.execute(f'PRAGMA table_info("{table}")'):
+        if pk and col_type.upper() == 'INTEGER':
+            return name
+    return 'rowid'
+
+
+def parse_bbox(text: str) -> Bounds:
+    """Parse 'minx,miny,maxx,maxy' (in the layer's CRS) into a bounds tuple."""
+    values = [float(v) for v in text.split(',')]
+    if len(values) != 4 or values[0] > values[2] or values[1] > values[3]:
+        raise ValueError(f"Expected minx,miny,maxx,maxy, got: {text}")
+    return tuple(values)
+
+
+def parse_region_args(argv: Sequence[str]) -> Tuple[List[str], Optional[Bounds], Optional[str]]:
+    """Split CLI args into (positional, bbox, county) for the --bbox / --county extract filters."""
+    args, bbox, county = list(argv), None, None
+    for flag in ('--bbox', '--county'):
+        if flag in args:
+            idx = args.index(flag)
+            if idx + 1 >= len(args):
+                raise ValueError(f"{flag} needs a value")
+            value = args[idx + 1]
+            del args[idx:idx + 2]
+            if flag == '--bbox':
+                bbox = parse_bbox(value)
+            else:
+                county = value
+    return args, bbox, county
+
+
+def bounds_intersect(a: Bounds, b: Bounds) -> bool:
+    return a[0] <= b[2] and a[2] >= b[0] and a[1] <= b[3] and a[3] >= b[1]
+
+
+def rtree_table(conn, table: str, geom_col: str) -> Optional[str]:
+    """Return the layer's R-tree index table, or None if absent or SQLite lacks the rtree module."""
+    name = f"rtree_{table}_{geom_col}"
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone():
+        return None
+    try:
+        conn.execute(f'SELECT id FROM "{name}" LIMIT 1').fetchall()
+    except sqlite3.OperationalError:
+        return None
+    return name
+
+
+def select_features(conn, table: str, columns: Sequence[str], bbox: Optional[Bounds] = None,
+                    where: Optional[str] = None, params: Sequence = (),
+                    order_by: Optional[str] = None) -> Iterator[tuple]:
+    """Yield (*columns, geometry_blob) rows, limited to features whose envelope intersects bbox.
+
+    The R-tree narrows the scan to candidate feature ids so SQLite only reads
+    their pages; its float32 boxes are conservative, so every candidate is
+    re-checked against the blob envelope (the only check without an R-tree).
+    """
+    geom_col, _ = geometry_column(conn, table)
+    conditions = [f"({where})"] if where else []
+    params = list(params)
+    rtree = rtree_table(conn, table, geom_col) if bbox else None
+    if rtree:
+        pk = primary_key_column(conn, table)
+        conditions.append(
+            f'"{pk}" IN (SELECT id FROM "{rtree}" WHERE minx <= ? AND maxx >= ? AND miny <= ? AND maxy >= ?)'
+        )
+        params += [bbox[2], bbox[0], bbox[3], bbox[1]]
+
+    select = ', '.join(f'"{c}"' for c in columns)
+    sql = f'SELECT {select}, "{geom_col}" FROM "{table}"'
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    if order_by:
+        sql += f' ORDER BY {order_by}'
+
+    for row in conn.execute(sql, params):
+        if bbox is not None:
+            bounds = gpkg_bounds(row[-1])
+            if bounds is None or not bounds_intersect(bounds, bbox):
+                continue
+        yield row
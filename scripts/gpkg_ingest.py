@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Generic GeoPackage ingestion: discover every layer from gpkg_contents /
+gpkg_geometry_columns, stream its features with typed attributes, and load
+all layers through one pipeline into layers.gpkg_features.
+
+Each feature becomes one row keyed by (source, layer, fid):
+
+    source         GeoPackage file stem (identical layers, e.g. copies of the
+                   same file, load once; see asset_store.py)
+    layer          table name from gpkg_contents
+    properties     attributes, typed from the declared column types
+                   (INTEGER/MEDIUMINT -> int, DOUBLE/REAL -> float, DATETIME
+                   -> ISO text, BLOB columns dropped)
+    geometry       GeoJSON in the layer's own CRS or --srs (srs_id), NULL for
+                   attribute-only tables; rings are closed, de-duplicated
+                   and oriented by geometry_validate.repair_geometry (run
+                   geometry_validate.py first for the per-feature report)
+    bbox_*         feature envelope (from the GPKG header when stored)
+
+Layers are processed in parallel, one worker per layer, each streaming
+rows in batches straight to its sink (Supabase, the dry-run sink, or an
+NDJSON file per layer). --bbox limits every layer to features whose
+envelope intersects the box (layer CRS, via the GeoPackage R-tree when
+present); attribute-only tables are skipped then. --srs EPSG reprojects
+every layer to one CRS (see reproject.py), e.g. --srs 4326 for the web map.
+
+Usage:
+    python scripts/gpkg_ingest.py --list [gpkg ...]
+    python scripts/gpkg_ingest.py [--dry-run] [--out DIR] [--bbox minx,miny,maxx,maxy] [--srs EPSG] [gpkg ...]
+
+With no paths, every *.gpkg under minnesota_gov/GIS is ingested.
+"""
+
+import json
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from geometry_validate import repair_geometry
+from gpkg_geometry import (
+    Bounds, decode_gpkg_geometry, geometry_bounds, gpkg_bounds, parse_bbox, primary_key_column, select_features,
+    to_geojson,
+)
+from reproject import get_transformer, reproject_geometries
+
+ROOT = Path(__file__).resolve().parent.parent
+GIS_DIR = ROOT / "minnesota_gov" / "GIS"
+
+BATCH_SIZE = 500
+MAX_WORKERS = 4
+TARGET_SCHEMA = 'layers'
+TARGET_TABLE = 'gpkg_features'
+
+INTEGER_TYPES = {'INTEGER', 'INT', 'MEDIUMINT', 'SMALLINT', 'TINYINT', 'BOOLEAN'}
+FLOAT_TYPES = {'DOUBLE', 'REAL', 'FLOAT', 'NUMERIC'}
+
+
+def _as_int(value):
+    return int(value) if isinstance(value, (int, float)) else value
+
+
+def _as_float(value):
+    return float(value) if isinstance(value, (int, float)) else value
+
+
+def _as_text(value):
+    return value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+
+
+def attribute_caster(declared_type: str) -> Optional[Callable]:
+    """Map a GPKG column type ('TEXT(254)', 'MEDIUMINT', 'DOUBLE', ...) to a caster; None drops the column."""
+    base = (declared_type or '').upper().split('(')[0].strip()
+    if base == 'BLOB':
+        return None
+    if base in INTEGER_TYPES:
+        return _as_int
+    if base in FLOAT_TYPES:
+        return _as_float
+    return _as_text
+
+
+def discover_layers(gpkg_path) -> List[Dict]:
+    """List the feature and attribute tables of a GeoPackage with their columns and CRS."""
+    conn = sqlite3.connect(f"file:{gpkg_path}?mode=ro", uri=True)
+    try:
+        geometry_columns = {
+            table: (column, geometry_type, srs_id)
+            for table, column, geometry_type, srs_id in conn.execute(
+                "SELECT table_name, column_name, geometry_type_name, srs_id FROM gpkg_geometry_columns")
+        }
+        layers = []
+        for table, data_type in conn.execute(
+                "SELECT table_name, data_type FROM gpkg_contents "
+                "WHERE data_type IN ('features', 'attributes') ORDER BY table_name").fetchall():
+            geom_col, geometry_type, srs_id = geometry_columns.get(table, (None, None, None))
+            pk = primary_key_column(conn, table)
+            columns = {}
+            for _, name, declared, _, _, _ in conn.execute(f'PRAGMA table_info("{table}")'):
+                if name in (pk, geom_col):
+                    continue
+                if attribute_caster(declared) is not None:
+                    columns[name] = declared
+            layers.append({
+                'path': str(gpkg_path),
+                'source': Path(gpkg_path).stem,
+                'layer': table,
+                'data_type': data_type,
+                'geometry_column': geom_col,
+                'geometry_type': geometry_type,
+                'srs_id': srs_id,
+                'pk': pk,
+                'columns': columns,
+                'feature_count': conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0],
+            })
+        return layers
+    finally:
+        conn.close()
+
+
+def iter_feature_batches(layer: Dict, batch_size: int = BATCH_SIZE, bbox: Optional[Bounds] = None,
+                         srs: Optional[int] = None) -> Iterator[List[Dict]]:
+    """Stream a layer as batches of gpkg_features rows, optionally limited to a bbox (layer CRS).
+
+    With srs, each batch's geometries are reprojected in one call and the
+    envelopes recomputed in the target CRS.
+    """
+    names = list(layer['columns'])
+    reproject = bool(srs) and (layer['srs_id'] or 0) > 0 and srs != layer['srs_id']
+    casters = [attribute_caster(layer['columns'][n]) for n in names]
+    geom_col = layer['geometry_column']
+    if bbox is not None and not geom_col:
+        return
+
+    conn = sqlite3.connect(f"file:{layer['path']}?mode=ro", uri=True)
+    try:
+        if geom_col:
+            rows = select_features(conn, layer['layer'], [layer['pk']] + names, bbox, order_by=f'"{layer["pk"]}"')
+        else:
+            select = ', '.join(f'"{c}"' for c in [layer['pk']] + names)
+            rows = conn.execute(f'SELECT {select} FROM "{layer["layer"]}" ORDER BY 1')
+        while True:
+            fetched = list(islice(rows, batch_size))
+            if not fetched:
+                return
+            blobs = [row[-1] if geom_col else None for row in fetched]
+            geometries = [repair_geometry(decode_gpkg_geometry(blob))[0] if blob else None for blob in blobs]
+            if reproject:
+                geometries = reproject_geometries(geometries, layer['srs_id'], srs)
+            batch = []
+            for row, blob, geometry in zip(fetched, blobs, geometries):
+                values = row[1:1 + len(names)]
+                if reproject:
+                    bounds = geometry_bounds(geometry) if geometry else None
+                else:
+                    bounds = gpkg_bounds(blob) if blob else None
+                batch.append({
+                    'source': layer['source'],
+                    'layer': layer['layer'],
+                    'fid': row[0],
+                    'geometry_type': layer['geometry_type'],
+                    'srs_id': srs if reproject else layer['srs_id'],
+                    'properties': {n: (c(v) if v is not None else None) for n, c, v in zip(names, casters, values)},
+                    'geometry': to_geojson(geometry),
+                    'bbox_minx': bounds[0] if bounds else None,
+                    'bbox_miny': bounds[1] if bounds else None,
+                    'bbox_maxx': bounds[2] if bounds else None,
+                    'bbox_maxy': bounds[3] if bounds else None,
+                })
+            yield batch
+    finally:
+        conn.close()
+
+
+def ingest_layer(task) -> Dict:
+    """Worker: stream one layer to its sink. task = (layer, out_dir or None, dry_run, bbox or None, srs or None)."""
+    layer, out_dir, dry_run, bbox, srs = task
+    stats = {'source': layer['source'], 'layer': layer['layer'], 'features': 0, 'rejected': 0}
+
+    if out_dir:
+        out_path = Path(out_dir) / f"{layer['source']}__{layer['layer']}.ndjson"
+        with open(out_path, 'w', encoding='utf-8') as f:
+            for batch in iter_feature_batches(layer, bbox=bbox, srs=srs):
+                f.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in batch)
+                stats['features'] += len(batch)
+        stats['output'] = str(out_path)
+        return stats
+
+    from common import supabase_client
+
+    supabase = supabase_client(dry_run=dry_run)
+    table = supabase.schema(TARGET_SCHEMA).from_(TARGET_TABLE)
+    for batch in iter_feature_batches(layer, bbox=bbox, srs=srs):
+        table.upsert(batch, on_conflict='source,layer,fid').execute()
+        stats['features'] += len(batch)
+    if dry_run:
+        stats['rejected'] = sum(supabase.rejected.values())
+    return stats
+
+
+def find_gpkg_files(root: Path = GIS_DIR) -> List[Path]:
+    return sorted(root.rglob('*.gpkg'))
+
+
+def collect_layers(paths: Sequence[Path]) -> List[Dict]:
+    """Discover layers across files; a layer whose content digest was already seen is skipped."""
+    from asset_store import AssetStore
+
+    store = AssetStore()
+    layers, seen = [], set()
+    for path in paths:
+        digests = store.layer_digests(path)
+        for layer in discover_layers(path):
+            key = digests.get(layer['layer'], (layer['source'], layer['layer']))
+            if key not in seen:
+                seen.add(key)
+                layers.append(layer)
+    store.save()
+    return layers
+
+
+def ingest(layers: List[Dict], out_dir: Optional[Path] = None, dry_run: bool = False,
+           max_workers: int = MAX_WORKERS, bbox: Optional[Bounds] = None, srs: Optional[int] = None) -> List[Dict]:
+    """Run every layer through ingest_layer, largest first, in parallel."""
+    if not layers:
+        return []
+    tasks = [(layer, str(out_dir) if out_dir else None, dry_run, bbox, srs)
+             for layer in sorted(layers, key=lambda l: -l['feature_count'])]
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+        return list(pool.map(ingest_layer, tasks))
+
+
+def main():
+    args = sys.argv[1:]
+    list_only = '--list' in args
+    dry_run = '--dry-run' in args
+    options = {}
+    for flag in ('--out', '--bbox', '--srs'):
+        if flag in args:
+            idx = args.index(flag)
+            if idx + 1 >= len(args):
+                print("Usage: python3 gpkg_ingest.py [--list] [--dry-run] [--out DIR] [--bbox minx,miny,maxx,maxy] "
+                      "[--srs EPSG] [gpkg ...]")
+                sys.exit(1)
+            options[flag] = args[idx + 1]
+            del args[idx:idx + 2]
+    out_dir = Path(options['--out']) if '--out' in options else None
+    try:
+        bbox = parse_bbox(options['--bbox']) if '--bbox' in options else None
+        srs = int(options['--srs']) if '--srs' in options else None
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    paths = [Path(a) for a in args if not a.startswith('--')] or find_gpkg_files()
+
+    missing = [p for p in paths if not p.exists()]
+    if missing:
+        print(f"Error: GeoPackage not found: {missing[0]}")
+        sys.exit(1)
+
+    layers = collect_layers(paths)
+    for layer in layers:
+        kind = layer['geometry_type'] or 'attributes'
+        print(f"📁 {layer['source']} / {layer['layer']}: {layer['feature_count']:,} {kind} "
+              f"(srs {layer['srs_id']}, {len(layer['columns'])} columns)")
+    if list_only:
+        return
+
+    # Fail before any worker starts if a layer's CRS cannot be converted
+    try:
+        for layer in layers:
+            if srs and (layer['srs_id'] or 0) > 0:
+                get_transformer(layer['srs_id'], srs)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    results = ingest(layers, out_dir, dry_run, bbox=bbox, srs=srs)
+    for stats in results:
+        destination = stats.get('output') or f"{TARGET_SCHEMA}.{TARGET_TABLE}"
+        rejected = f", {stats['rejected']:,} rejected" if dry_run else ''
+        print(f"✅ {stats['source']} / {stats['layer']}: {stats['features']:,} features -> {destination}{rejected}")
+
+    if dry_run and any(s['rejected'] for s in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
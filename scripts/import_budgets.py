@@ -2,38 +2,40 @@
 """
 Import budgets data from CSV files into checkbook.budgets table.
 
+Each row carries a row_digest (md5 of its values, see budget_row_digest);
+rows are deduplicated on it within and across files before upload, and
+the upsert conflicts on that single indexed column.
+
+Also refreshes checkbook.budget_rollups (agency × period × fund × program
+totals) from the same parsed rows.
+
 Usage:
-    python scripts/import_budgets.py
+    python scripts/import_budgets.py [--dry-run]
+
+    --dry-run  validate rows against the table schema and report throughput
+               without writing to Supabase
 
 Environment variables required:
     NEXT_PUBLIC_SUPABASE_URL
     SUPABASE_SERVICE_ROLE_KEY
 """
 
-import os
 import csv
+import hashlib
 import sys
 from pathlib import Path
 from typing import Optional, Dict
-from dotenv import load_dotenv
 
-try:
-    from supabase import create_client, Client
-except ImportError:
-    print("Error: supabase-py not installed. Run: pip install supabase python-dotenv")
-    sys.exit(1)
-
-# Load environment variables (check .env.local first, then .env)
-env_path = Path(__file__).parent.parent / '.env.local'
-if env_path.exists():
-    load_dotenv(env_path)
-else:
-    load_dotenv()
+from checkbook_rollups import Rollup, budget_rollup, upload_rollup
+from common import supabase_client
 
 # Configuration
 BATCH_SIZE = 1000
 CSV_DIR = Path(__file__).parent.parent / "minnesota_gov" / "Budget"
 YEARS = [2020, 2021, 2022, 2023, 2024, 2025, 2026]
+TEXT_COLUMNS = ['agency', 'fund', 'program', 'activity']
+AMOUNT_COLUMNS = ['available_amount', 'obligated_amount', 'spend_amount', 'remaining_amount',
+                  'budget_amount', 'budget_remaining_amount']
 
 
 def parse_decimal(value: str) -> float:
@@ -90,12 +92,23 @@ def parse_budget_row(row: Dict[str, str]) -> Optional[Dict]:
         return None
 
 
-def import_budget_file(supabase: Client, file_path: Path, year: int) -> tuple[int, int]:
-    """Import a single budget CSV file."""
+def budget_row_digest(record: Dict) -> str:
+    """md5 of the row's values, matching checkbook.budget_row_digest() in SQL."""
+    parts = [str(record['budget_period'])]
+    parts += [record[c] or '' for c in TEXT_COLUMNS]
+    # NUMERIC(15, 2)::text renders two decimals; + 0.0 folds -0.00 into 0.00
+    parts += [f"{round(record[c], 2) + 0.0:.2f}" for c in AMOUNT_COLUMNS]
+    return hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def import_budget_file(supabase, file_path: Path, year: int, rollup: Rollup,
+                       seen: set) -> tuple[int, int]:
+    """Import a single budget CSV file, skipping rows whose digest is in `seen`."""
     print(f"  Processing {file_path.name}...")
     
     records = []
     skipped = 0
+    duplicates = 0
     
     try:
         with open(file_path, 'r', encoding='utf-8-sig') as f:
@@ -104,26 +117,36 @@ def import_budget_file(supabase: Client, file_path: Path, year: int) -> tuple[in
             for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
                 parsed = parse_budget_row(row)
                 if parsed:
+                    parsed['row_digest'] = budget_row_digest(parsed)
+                    if parsed['row_digest'] in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(parsed['row_digest'])
                     records.append(parsed)
                 else:
                     skipped += 1
                     if skipped <= 5:  # Only log first 5 skipped rows
                         print(f"    Skipped row {row_num}: invalid budget_period")
         
+        if duplicates:
+            print(f"    Dropped {duplicates} duplicate rows")
         if not records:
-            print(f"  No valid records found in {file_path.name}")
+            print(f"  No new records found in {file_path.name}")
             return 0, skipped
         
+        rollup.add_all(records)
+        
         # Batch insert with duplicate handling
         total_inserted = 0
         for i in range(0, len(records), BATCH_SIZE):
             batch = records[i:i + BATCH_SIZE]
             try:
-                # Use upsert with ON CONFLICT DO NOTHING to skip duplicates
-                # The unique index will prevent duplicates
+                # Use upsert with ON CONFLICT DO NOTHING to skip rows already loaded
+                # The unique index on row_digest will prevent duplicates
                 result = supabase.table('budgets').upsert(
                     batch,
-                    on_conflict='budget_period,agency,fund,program,activity,available_amount,obligated_amount,spend_amount,remaining_amount,budget_amount,budget_remaining_amount'
+                    on_conflict='row_digest',
+                    ignore_duplicates=True,
                 ).execute()
                 inserted = len(result.data) if result.data else 0
                 total_inserted += inserted
@@ -151,24 +174,9 @@ def import_budget_file(supabase: Client, file_path: Path, year: int) -> tuple[in
 
 def main():
     """Main import function."""
-    # Validate environment
-    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
-    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-    
-    if not supabase_url:
-        print("Error: NEXT_PUBLIC_SUPABASE_URL not set in environment")
-        sys.exit(1)
-    
-    if not supabase_key:
-        print("Error: SUPABASE_SERVICE_ROLE_KEY not set in environment")
-        sys.exit(1)
-    
-    # Initialize Supabase client
-    try:
-        supabase: Client = create_client(supabase_url, supabase_key)
-    except Exception as e:
-        print(f"Error creating Supabase client: {e}")
-        sys.exit(1)
+    # Validate environment and initialize Supabase client (or the local dry-run sink)
+    dry_run = '--dry-run' in sys.argv
+    supabase = supabase_client(dry_run=dry_run)
     
     # Validate CSV directory
     if not CSV_DIR.exists():
@@ -185,6 +193,8 @@ def main():
     # Process each year
     total_inserted = 0
     total_skipped = 0
+    rollup = budget_rollup()
+    seen = set()
     
     for year in YEARS:
         file_path = CSV_DIR / f"{year}_ALL_budgets.csv"
@@ -194,11 +204,15 @@ def main():
             continue
         
         print(f"📁 Year {year}:")
-        inserted, skipped = import_budget_file(supabase, file_path, year)
+        inserted, skipped = import_budget_file(supabase, file_path, year, rollup, seen)
         total_inserted += inserted
         total_skipped += skipped
         print()
     
+    if len(rollup):
+        upload_rollup(supabase, rollup)
+        print()
+    
     # Summary
     print("=" * 60)
     print("Import Summary")
@@ -207,6 +221,9 @@ def main():
     print(f"Total rows skipped: {total_skipped:,}")
     print("=" * 60)
 
+    if dry_run and supabase.report():
+        sys.exit(1)
+
 
 if __name__ == '__main__':
     main()
@@ -1,16 +1,16 @@
 #!/usr/bin/env python3
 """
 Import FY2022 payroll from Excel into checkbook.payroll.
-Uses pandas + Supabase upsert. Requires: unique constraint payroll_unique_record on (temporary_id, record_nbr, fiscal_year).
+Uses pandas + Supabase upsert; also refreshes checkbook.payroll_rollups for the year. Requires: unique constraint payroll_unique_record on (temporary_id, record_nbr, fiscal_year).
 
 Usage:
-  python scripts/import_fy2022_payroll.py
+  python scripts/import_fy2022_payroll.py [--dry-run]
 
 Env: SUPABASE_URL (or NEXT_PUBLIC_SUPABASE_URL), SUPABASE_SERVICE_KEY (or SUPABASE_SERVICE_ROLE_KEY).
 """
 from pathlib import Path
-import os
 import math
+import sys
 
 # Resolve project root and file path
 ROOT = Path(__file__).resolve().parent.parent
@@ -20,23 +20,16 @@ FILE_PATH = ROOT / "minnesota_gov" / "State Payrole" / "fiscal-year-2022.xlsx"
 BATCH_SIZE = 1000
 FISCAL_YEAR = "2022"
 
-# Load env (support .env.local)
-try:
-    from dotenv import load_dotenv
-    load_dotenv(ROOT / ".env.local")
-    load_dotenv(ROOT / ".env")
-except ImportError:
-    pass
-
 def main():
     import pandas as pd
-    from supabase import create_client
+    from common import find_active_column, find_sheet_by_pattern, supabase_client
+    from checkbook_rollups import payroll_rollup, upload_rollup
     import numpy as np
 
     # Resolve sheet names (FY22 HR INFO, FY22 EARNINGS in this file)
     xl = pd.ExcelFile(FILE_PATH)
-    hr_sheet = next((s for s in xl.sheet_names if "HR INFO" in s), None)
-    earn_sheet = next((s for s in xl.sheet_names if "EARNINGS" in s), None)
+    hr_sheet = find_sheet_by_pattern(xl, "HR INFO")
+    earn_sheet = find_sheet_by_pattern(xl, "EARNINGS")
     if not hr_sheet or not earn_sheet:
         raise SystemExit("Sheets 'HR INFO' and 'EARNINGS' not found in workbook.")
 
@@ -123,7 +116,7 @@ def main():
         "TOTAL_WAGES": "total_wages",
     }
     # FY-specific active column (e.g. ACTIVE_ON_JUNE_30_2022)
-    active_col = next((c for c in df.columns if "ACTIVE_ON_JUNE_30" in str(c).upper()), None)
+    active_col = find_active_column(df.columns)
     if active_col:
         column_map[active_col] = "active_on_june_30"
 
@@ -159,11 +152,8 @@ def main():
             df[c] = df[c].apply(lambda x: int(x) if x is not None and not (isinstance(x, float) and math.isnan(x)) else None)
 
     # Supabase client
-    url = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-    key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-    if not url or not key:
-        raise SystemExit("Set SUPABASE_URL (or NEXT_PUBLIC_SUPABASE_URL) and SUPABASE_SERVICE_KEY (or SUPABASE_SERVICE_ROLE_KEY).")
-    supabase = create_client(url, key)
+    dry_run = "--dry-run" in sys.argv
+    supabase = supabase_client(dry_run=dry_run)
 
     # Batch upsert
     records = df.to_dict(orient="records")
@@ -192,8 +182,15 @@ def main():
         ).execute()
         print(f"Batch {batch_num}/{total_batches} complete — {i + len(batch)} rows upserted")
 
+    rollup = payroll_rollup()
+    rollup.add_all(records)
+    upload_rollup(supabase, rollup)
+
     print("FY2022 import complete.")
 
+    if dry_run and supabase.report():
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Import payee-level payment files into checkbook.payments table.
+
+Reads every CSV under minnesota_gov/Payments/Payments and Payees/<Agency>/
+(e.g. Department of Human Services/2020.csv, 2021_DHS_payees.csv, ...),
+parsing the files in parallel, keeping one row per (budget_period, agency,
+payee) across files (the last file read wins), tagging each row with a
+resolved payee_id (see payee_resolution.py), and upserting on that key so
+reruns and refreshed files update the amount instead of adding a row.
+Agency × period totals are written to checkbook.payment_rollups in the
+same pass.
+
+Payee files use the column order
+    Payment Amount,Budget Period,Agency,Payee
+unlike the agency-level YYYY_payments.csv files; columns are matched by
+header name so either order works.
+
+Usage:
+    python scripts/import_payees.py [--dry-run]
+
+    --dry-run  validate rows against the table schema and report throughput
+               without writing to Supabase
+
+Environment variables required:
+    NEXT_PUBLIC_SUPABASE_URL
+    SUPABASE_SERVICE_ROLE_KEY
+"""
+
+import csv
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+from checkbook_rollups import payment_rollup, upload_rollup
+from common import supabase_client
+from payee_resolution import load_payee_ids, resolve_payees, save_payee_ids
+
+# Configuration
+BATCH_SIZE = 1000
+MAX_WORKERS = 8
+PAYEES_DIR = Path(__file__).parent.parent / "minnesota_gov" / "Payments" / "Payments and Payees"
+CONFLICT_COLUMNS = 'budget_period,agency,payee'
+YEAR_PATTERN = re.compile(r'(20\d{2})')
+
+
+def parse_decimal(value: str) -> float:
+    """Parse string to float for NUMERIC(15,2) fields, return 0.0 if invalid."""
+    if not value or not value.strip():
+        return 0.0
+    try:
+        # Remove commas and dollar signs, round to cents
+        cleaned = value.strip().replace(',', '').replace('$', '')
+        return round(float(cleaned), 2)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def parse_integer(value: str) -> Optional[int]:
+    """Parse string to integer, return None if invalid."""
+    if not value or not value.strip():
+        return None
+    try:
+        return int(value.strip())
+    except (ValueError, TypeError):
+        return None
+
+
+def normalize_text(value: str) -> Optional[str]:
+    """Normalize text field: empty strings become None."""
+    if not value or not value.strip():
+        return None
+    return value.strip()
+
+
+def file_year(file_path: Path) -> Optional[int]:
+    """Get the year from a payee file name (2020.csv or 2021_DHS_payees.csv)."""
+    match = YEAR_PATTERN.search(file_path.stem)
+    return int(match.group(1)) if match else None
+
+
+def find_payee_files(root: Path = PAYEES_DIR) -> List[Path]:
+    """Find every payee CSV under the per-agency directories, ordered by agency then year."""
+    files = [p for p in root.glob('*/*.csv') if file_year(p) is not None]
+    return sorted(files, key=lambda p: (p.parent.name, file_year(p)))
+
+
+def parse_payee_row(row: Dict[str, str], default_period: Optional[int]) -> Optional[Dict]:
+    """Parse a CSV row into a payment record."""
+    budget_period = parse_integer(row.get('Budget Period', '')) or default_period
+    if budget_period is None:
+        return None
+
+    return {
+        'budget_period': budget_period,
+        'payment_amount': parse_decimal(row.get('Payment Amount', '0')),
+        'agency': normalize_text(row.get('Agency', '')),
+        'payee': normalize_text(row.get('Payee', '')),
+    }
+
+
+def parse_payee_file(file_path: Path) -> Tuple[str, List[Dict], int]:
+    """Parse one payee CSV; returns (file name, records, skipped rows)."""
+    default_period = file_year(file_path)
+    records = []
+    skipped = 0
+
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            parsed = parse_payee_row(row, default_period)
+            if parsed:
+                records.append(parsed)
+            else:
+                skipped += 1
+
+    return file_path.name, records, skipped
+
+
+def record_key(record: Dict) -> Tuple:
+    """Identity of a payment row, matching idx_payments_unique_record."""
+    return (record['budget_period'], record['agency'], record['payee'])
+
+
+def latest_records(parsed_files: List[Tuple[str, List[Dict], int]]) -> Dict[Tuple, Dict]:
+    """Map each record key to its last occurrence across files (refreshed files come later)."""
+    return {record_key(record): record for _, records, _ in parsed_files for record in records}
+
+
+def dedupe_records(records: List[Dict], latest: Dict[Tuple, Dict]) -> List[Dict]:
+    """Keep only the records that are the latest occurrence of their key."""
+    return [record for record in records if latest[record_key(record)] is record]
+
+
+def upload_records(supabase, records: List[Dict]) -> int:
+    """Upsert records in batches; existing rows for the same key take the new amount."""
+    total_inserted = 0
+    for i in range(0, len(records), BATCH_SIZE):
+        batch = records[i:i + BATCH_SIZE]
+        try:
+            result = supabase.schema('checkbook').from_('payments').upsert(
+                batch,
+                on_conflict=CONFLICT_COLUMNS,
+            ).execute()
+            inserted = len(result.data) if result.data else 0
+            total_inserted += inserted
+            print(f"    Processed batch: {inserted} records upserted (total: {total_inserted}/{len(records)})")
+        except Exception as e:
+            print(f"    Error inserting batch {i//BATCH_SIZE + 1}: {e}")
+            raise
+    return total_inserted
+
+
+def main():
+    """Main import function."""
+    # Validate environment and initialize Supabase client (or the local dry-run sink)
+    dry_run = '--dry-run' in sys.argv
+    supabase = supabase_client(dry_run=dry_run)
+
+    # Validate payee directory
+    if not PAYEES_DIR.exists():
+        print(f"Error: Payee directory not found: {PAYEES_DIR}")
+        sys.exit(1)
+
+    files = find_payee_files()
+    if not files:
+        print(f"Error: No payee CSV files found under {PAYEES_DIR}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Payee Payments Import Script")
+    print("=" * 60)
+    print(f"Payee Directory: {PAYEES_DIR}")
+    print(f"Files: {len(files)}")
+    print(f"Batch Size: {BATCH_SIZE}")
+    print()
+
+    # Parse all files in parallel
+    with ProcessPoolExecutor(max_workers=min(MAX_WORKERS, len(files))) as pool:
+        parsed_files = list(pool.map(parse_payee_file, files))
+
+    # Resolve payee spellings across every file so IDs are consistent between years
+    # Cores already stored in checkbook.payments keep their payee_id; upserts rewrite
+    # payee_id on existing rows, so rows from earlier runs converge on the same IDs
+    known_ids = load_payee_ids(supabase)
+    resolved = resolve_payees((r['payee'] for _, records, _ in parsed_files for r in records), known_ids=known_ids)
+    if not dry_run:
+        save_payee_ids(resolved, known_ids)
+    print(f"Resolved {len(resolved):,} payee spellings into {len({v['payee_id'] for v in resolved.values()}):,} payees")
+    print()
+
+    # Dedupe and upload in file order
+    total_inserted = 0
+    total_skipped = 0
+    total_duplicates = 0
+    latest = latest_records(parsed_files)
+    rollup = payment_rollup()
+
+    for file_path, (name, records, skipped) in zip(files, parsed_files):
+        print(f"📁 {file_path.parent.name} / {name}:")
+        unique = dedupe_records(records, latest)
+        duplicates = len(records) - len(unique)
+        print(f"  Parsed {len(records):,} rows ({skipped} skipped, {duplicates} superseded)")
+
+        for record in unique:
+            match = resolved.get(record['payee'])
+            record['payee_id'] = match['payee_id'] if match else None
+        rollup.add_all(unique)
+
+        if unique:
+            total_inserted += upload_records(supabase, unique)
+        total_skipped += skipped
+        total_duplicates += duplicates
+        print()
+
+    if len(rollup):
+        upload_rollup(supabase, rollup)
+        print()
+
+    # Summary
+    print("=" * 60)
+    print("Import Summary")
+    print("=" * 60)
+    print(f"Total records upserted: {total_inserted:,}")
+    print(f"Total rows skipped: {total_skipped:,}")
+    print(f"Total superseded rows dropped: {total_duplicates:,}")
+    print("=" * 60)
+
+    if dry_run and supabase.report():
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
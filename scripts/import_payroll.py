@@ -2,34 +2,36 @@
 """
 Import payroll data from Excel files into checkbook.payroll table.
 
+Also refreshes checkbook.payroll_rollups (wage totals, headcount and FTE by
+agency, bargaining unit and county) for each imported fiscal year.
+
 Usage:
-    python scripts/import_payroll.py
+    python scripts/import_payroll.py [--dry-run]
+
+    --dry-run  validate rows against the table schema and report throughput
+               without writing to Supabase
 
 Environment variables required:
     NEXT_PUBLIC_SUPABASE_URL
     SUPABASE_SERVICE_ROLE_KEY
 """
 
-import os
 import sys
 from pathlib import Path
 from typing import Optional, Dict, List
-from dotenv import load_dotenv
 
-try:
-    from supabase import create_client, Client
-    import openpyxl
-except ImportError:
-    print("Error: Required packages not installed.")
-    print("Run: pip install supabase python-dotenv openpyxl")
-    sys.exit(1)
+from checkbook_rollups import payroll_rollup, upload_rollup
+from common import (
+    find_active_column,
+    find_sheet_by_pattern,
+    lazy_import,
+    parse_cell_float as parse_float,
+    parse_cell_integer as parse_integer,
+    parse_cell_text as parse_text,
+    supabase_client,
+)
 
-# Load environment variables
-env_path = Path(__file__).parent.parent / '.env.local'
-if env_path.exists():
-    load_dotenv(env_path)
-else:
-    load_dotenv()
+openpyxl = lazy_import('openpyxl')
 
 # Configuration
 BATCH_SIZE = 1000
@@ -37,58 +39,6 @@ EXCEL_DIR = Path(__file__).parent.parent / "minnesota_gov" / "State Payrole"
 FISCAL_YEARS = [2020]  # Testing with 2020 first
 
 
-def parse_integer(value) -> Optional[int]:
-    """Parse value to integer, return None if invalid."""
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return None
-    if isinstance(value, str):
-        value = value.strip()
-        if not value or value == '-':
-            return None
-        try:
-            return int(float(value))
-        except (ValueError, TypeError):
-            return None
-    return None
-
-
-def parse_float(value) -> Optional[float]:
-    """Parse value to float, return None if invalid."""
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return None
-    if isinstance(value, str):
-        value = value.strip()
-        if not value or value == '-':
-            return None
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return None
-    return None
-
-
-def parse_text(value) -> Optional[str]:
-    """Normalize text field: empty strings become None."""
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return str(value).strip() if value else None
-    if isinstance(value, str):
-        value = value.strip()
-        return value if value and value != '-' else None
-    return None
-
-
 def parse_last_hire_date(value) -> Optional[str]:
     """Parse LAST_HIRE_DATE which can be integer or '-' string."""
     if value is None:
@@ -107,27 +57,13 @@ def parse_last_hire_date(value) -> Optional[str]:
     return None
 
 
-def find_sheet_by_pattern(workbook, pattern: str) -> Optional[str]:
-    """Find sheet name containing pattern."""
-    for sheet_name in workbook.sheetnames:
-        if pattern.lower() in sheet_name.lower():
-            return sheet_name
-    return None
-
-
 def get_active_column_name(workbook, fiscal_year: int) -> Optional[str]:
     """Get the ACTIVE_ON_JUNE_30 column name (varies by year)."""
     hr_sheet_name = find_sheet_by_pattern(workbook, 'HR INFO')
     if not hr_sheet_name:
         return None
     
-    sheet = workbook[hr_sheet_name]
-    # Get header row
-    header_row = [cell.value for cell in sheet[1]]
-    for col_name in header_row:
-        if col_name and 'ACTIVE_ON_JUNE_30' in str(col_name).upper():
-            return col_name
-    return None
+    return find_active_column(cell.value for cell in workbook[hr_sheet_name][1])
 
 
 def parse_hr_row(row: List, headers: List[str], active_col_name: str) -> Optional[Dict]:
@@ -210,7 +146,7 @@ def parse_earnings_row(row: List, headers: List[str]) -> Optional[Dict]:
         return None
 
 
-def import_payroll_file(supabase: Client, file_path: Path, fiscal_year: int) -> tuple[int, int]:
+def import_payroll_file(supabase, file_path: Path, fiscal_year: int) -> tuple[int, int]:
     """Import a single payroll Excel file."""
     print(f"  Processing {file_path.name}...")
     
@@ -272,6 +208,9 @@ def import_payroll_file(supabase: Client, file_path: Path, fiscal_year: int) ->
             print(f"  No valid records found in {file_path.name}")
             return 0, 0
         
+        rollup = payroll_rollup()
+        rollup.add_all(records)
+        
         # Batch insert
         total_inserted = 0
         skipped = 0
@@ -287,6 +226,7 @@ def import_payroll_file(supabase: Client, file_path: Path, fiscal_year: int) ->
                 print(f"    Error inserting batch {i//BATCH_SIZE + 1}: {e}")
                 skipped += len(batch)
         
+        upload_rollup(supabase, rollup)
         return total_inserted, skipped
     
     except FileNotFoundError:
@@ -301,24 +241,9 @@ def import_payroll_file(supabase: Client, file_path: Path, fiscal_year: int) ->
 
 def main():
     """Main import function."""
-    # Validate environment
-    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
-    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-    
-    if not supabase_url:
-        print("Error: NEXT_PUBLIC_SUPABASE_URL not set in environment")
-        sys.exit(1)
-    
-    if not supabase_key:
-        print("Error: SUPABASE_SERVICE_ROLE_KEY not set in environment")
-        sys.exit(1)
-    
-    # Initialize Supabase client
-    try:
-        supabase: Client = create_client(supabase_url, supabase_key)
-    except Exception as e:
-        print(f"Error creating Supabase client: {e}")
-        sys.exit(1)
+    # Validate environment and initialize Supabase client (or the local dry-run sink)
+    dry_run = '--dry-run' in sys.argv
+    supabase = supabase_client(dry_run=dry_run)
     
     # Validate Excel directory
     if not EXCEL_DIR.exists():
@@ -357,6 +282,9 @@ def main():
     print(f"Total rows skipped: {total_skipped:,}")
     print("=" * 60)
 
+    if dry_run and supabase.report():
+        sys.exit(1)
+
 
 if __name__ == '__main__':
     main()
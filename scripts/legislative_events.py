@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Parse the legislative committee calendars (minnesota_gov/house_events.md and
+senate_events.md) and load them incrementally into civic.legislative_events.
+
+house_events.md is a 3-line record format:
+
+    (9:30 AM) 1/8/2026
+    [G-3 State Capitol]
+    Legislative Commission on Data Practices [Commission] Canceled
+
+senate_events.md is a block per meeting, headed by a full date-time line
+("Thursday, January 8th, 2026 9:30 AM", or "Meeting has been cancelled
+for..." in front of it) followed by the committee, Chair:, Location: and
+an Agenda section.
+
+Both parsers stream line by line and yield the same normalized record.
+Each event gets an event_key (chamber + start time + committee) and a
+content_hash of its fields; reloading compares hashes against the table and
+only writes new or changed events, deleting events that vanished from the
+date range the file covers.
+
+Usage:
+    python scripts/legislative_events.py [events_md ...]
+
+Environment variables required:
+    NEXT_PUBLIC_SUPABASE_URL
+    SUPABASE_SERVICE_ROLE_KEY
+"""
+
+import hashlib
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+from zoneinfo import ZoneInfo
+
+ROOT = Path(__file__).resolve().parent.parent
+EVENT_FILES = [ROOT / "minnesota_gov" / "house_events.md", ROOT / "minnesota_gov" / "senate_events.md"]
+
+TIMEZONE = ZoneInfo("America/Chicago")
+BATCH_SIZE = 500
+HASHED_FIELDS = ['chamber', 'committee', 'committee_type', 'starts_at', 'location', 'room', 'building',
+                 'chair', 'canceled', 'agenda']
+UNKNOWN_LOCATIONS = {'tbd', 'to be determined', ''}
+
+HOUSE_TIME_RE = re.compile(r'^\((\d{1,2}:\d{2}\s*[AP]M)\)\s+(\d{1,2}/\d{1,2}/\d{4})$', re.I)
+HOUSE_LOCATION_RE = re.compile(r'^\[(.*)\]$')
+HOUSE_COMMITTEE_RE = re.compile(r'^(.*?)\s*(?:\[([^\]]+)\])?\s*(Canceled|Cancelled)?$', re.I)
+SENATE_DATETIME_RE = re.compile(
+    r'^(?P<cancel>Meeting has been cancell?ed for\s*)?'
+    r'(?:[A-Z][a-z]+day,\s*)?(?P<month>[A-Z][a-z]+)\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?,\s*(?P<year>\d{4})'
+    r'(?:\s+(?P<time>\d{1,2}:\d{2}\s*[AP]M))?$', re.I)
+SENATE_FIELD_RE = re.compile(r'^(Chair|Location|Public Notice Date|Agenda)\s*:?\s*(.*)$', re.I)
+ROOM_RE = re.compile(r'^(?:\([^)]*\)\s*)?([A-Z]?-?\d+[A-Z]?)\s+(.+)$', re.I)
+
+
+def _starts_at(date_text: str, time_text: str, date_format: str) -> str:
+    moment = datetime.strptime(f"{date_text} {time_text.upper().replace(' ', '')}", f"{date_format} %I:%M%p")
+    return moment.replace(tzinfo=TIMEZONE).isoformat()
+
+
+def split_location(location: Optional[str]):
+    """Return (location, room, building); '120 State Capitol' -> room '120', building 'State Capitol'."""
+    text = re.sub(r'\s+', ' ', location or '').strip()
+    if text.lower() in UNKNOWN_LOCATIONS:
+        return None, None, None
+    match = ROOM_RE.match(text)
+    if match:
+        return text, match.group(1), match.group(2)
+    return text, None, text
+
+
+def _event(chamber: str, committee: str, starts_at: str, location: Optional[str], **fields) -> Dict:
+    location, room, building = split_location(location)
+    event = {
+        'chamber': chamber,
+        'committee': re.sub(r'\s+', ' ', committee).strip(),
+        'committee_type': None,
+        'starts_at': starts_at,
+        'location': location,
+        'room': room,
+        'building': building,
+        'chair': None,
+        'canceled': False,
+        'agenda': None,
+    }
+    event.update(fields)
+    return event
+
+
+def parse_house_events(lines: Iterable[str]) -> Iterator[Dict]:
+    """Yield events from the house 3-line record format."""
+    starts_at = location = None
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        time_match = HOUSE_TIME_RE.match(line)
+        if time_match:
+            starts_at = _starts_at(time_match.group(2), time_match.group(1), '%m/%d/%Y')
+            location = None
+            continue
+        if starts_at is None:
+            continue  # header row or stray text
+        location_match = HOUSE_LOCATION_RE.match(line)
+        if location_match:
+            location = location_match.group(1)
+            continue
+        committee = HOUSE_COMMITTEE_RE.match(line)
+        yield _event('house', committee.group(1), starts_at, location,
+                     committee_type=committee.group(2), canceled=bool(committee.group(3)))
+        starts_at = location = None
+
+
+def parse_senate_events(lines: Iterable[str]) -> Iterator[Dict]:
+    """Yield events from the senate block format."""
+    current = None
+    in_agenda = False
+    agenda: List[str] = []
+
+    def finish():
+        if current and current['committee']:
+            if agenda:
+                current['agenda'] = '\n'.join(agenda)
+            yield _event('senate', current.pop('committee'), current.pop('starts_at'), current.pop('location'),
+                         **current)
+
+    for raw in lines:
+        line = raw.strip()
+        header = SENATE_DATETIME_RE.match(line)
+        if header:
+            if not header.group('time'):
+                continue  # day heading
+            yield from finish()
+            date_text = f"{header.group('month')} {header.group('day')} {header.group('year')}"
+            current = {'committee': None, 'location': None, 'chair': None,
+                       'starts_at': _starts_at(date_text, header.group('time'), '%B %d %Y'),
+                       'canceled': bool(header.group('cancel'))}
+            in_agenda = False
+            agenda = []
+            continue
+        if current is None or not line:
+            continue
+
+        field = SENATE_FIELD_RE.match(line)
+        if field and not in_agenda:
+            label, value = field.group(1).lower(), field.group(2).strip()
+            if label == 'chair':
+                current['chair'] = value or None
+            elif label == 'location':
+                current['location'] = value
+            elif label == 'agenda':
+                in_agenda = True
+                if value:
+                    agenda.append(value)
+        elif current['committee'] is None:
+            current['committee'] = line
+        else:
+            # Agenda text, or free text such as "The Senate will be in Session at 12:00 pm"
+            agenda.append(line)
+
+    yield from finish()
+
+
+def content_hash(event: Dict) -> str:
+    payload = json.dumps([event[f] for f in HASHED_FIELDS], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def event_key(event: Dict) -> str:
+    committee = re.sub(r'[^a-z0-9]+', '-', event['committee'].lower()).strip('-')
+    return f"{event['chamber']}:{event['starts_at']}:{committee}"
+
+
+def parse_events_file(path: Path) -> List[Dict]:
+    """Parse one calendar file, choosing the format by file name, and key/hash every event."""
+    parser = parse_house_events if 'house' in Path(path).name else parse_senate_events
+    events = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for event in parser(f):
+            event['event_key'] = event_key(event)
+            event['content_hash'] = content_hash(event)
+            event['source'] = Path(path).name
+            events[event['event_key']] = event  # a repeated listing replaces the earlier one
+    return list(events.values())
+
+
+def plan_changes(events: List[Dict], existing: Dict[str, str]):
+    """Split parsed events against {event_key: content_hash} already stored.
+
+    Returns (to_upsert, to_delete_keys, unchanged_count). Stored events are
+    only deleted when they fall inside the parsed events' date range.
+    """
+    to_upsert = [e for e in events if existing.get(e['event_key']) != e['content_hash']]
+    unchanged = len(events) - len(to_upsert)
+    parsed_keys = {e['event_key'] for e in events}
+    if not events:
+        return to_upsert, [], unchanged
+    first, last = min(e['starts_at'] for e in events), max(e['starts_at'] for e in events)
+    chambers = {e['chamber'] for e in events}
+    to_delete = []
+    for key in existing:
+        chamber, starts_at = key.split(':', 1)[0], key.split(':', 1)[1].rsplit(':', 1)[0]
+        if key not in parsed_keys and chamber in chambers and first <= starts_at <= last:
+            to_delete.append(key)
+    return to_upsert, to_delete, unchanged
+
+
+def fetch_existing(supabase, chamber: str) -> Dict[str, str]:
+    existing = {}
+    offset = 0
+    while True:
+        result = supabase.schema('civic').from_('legislative_events').select('event_key,content_hash') \
+            .eq('chamber', chamber).range(offset, offset + 999).execute()
+        rows = result.data or []
+        existing.update({r['event_key']: r['content_hash'] for r in rows})
+        if len(rows) < 1000:
+            return existing
+        offset += 1000
+
+
+def load_events(supabase, events: List[Dict]) -> Dict[str, int]:
+    """Incrementally apply parsed events for the chambers they cover."""
+    stats = {'upserted': 0, 'deleted': 0, 'unchanged': 0}
+    for chamber in sorted({e['chamber'] for e in events}):
+        chamber_events = [e for e in events if e['chamber'] == chamber]
+        to_upsert, to_delete, unchanged = plan_changes(chamber_events, fetch_existing(supabase, chamber))
+        table = supabase.schema('civic').from_('legislative_events')
+        for i in range(0, len(to_upsert), BATCH_SIZE):
+            table.upsert(to_upsert[i:i + BATCH_SIZE], on_conflict='event_key').execute()
+        for i in range(0, len(to_delete), BATCH_SIZE):
+            table.delete().in_('event_key', to_delete[i:i + BATCH_SIZE]).execute()
+        stats['upserted'] += len(to_upsert)
+        stats['deleted'] += len(to_delete)
+        stats['unchanged'] += unchanged
+    return stats
+
+
+def main():
+    from common import supabase_client
+
+    supabase = supabase_client()
+
+    paths = [Path(p) for p in sys.argv[1:]] or EVENT_FILES
+    events = []
+    for path in paths:
+        if not path.exists():
+            print(f"⚠️  Skipping {path.name}: File not found")
+            continue
+        parsed = parse_events_file(path)
+        print(f"📁 {path.name}: {len(parsed)} events ({sum(e['canceled'] for e in parsed)} canceled)")
+        events.extend(parsed)
+
+    stats = load_events(supabase, events)
+    print(f"✅ {stats['upserted']} new/changed, {stats['deleted']} removed, {stats['unchanged']} unchanged")
+
+
+if __name__ == '__main__':
+    main()
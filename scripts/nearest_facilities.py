@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Nearest-facility lookup tables: for every CTU (Jurisdiction_Lookup points,
+keyed by GNIS feature id as in civic.ctu_boundaries) and every voting
+precinct (centroids of the cd*.md features, keyed by PrecinctID), the k
+nearest school buildings, park-and-ride lots / transit centers,
+park-and-pool lots and transit stops.
+
+Each facility layer is loaded once into a KD-tree (spatial_index.KDTree)
+in EPSG:26915 metres; precinct centroids are projected from WGS84 with
+geometry_measure.lonlat_to_utm. All origins are queried in one vectorized
+call per facility layer, so the statewide tables build in seconds.
+
+Rows go to civic.nearest_facilities, keyed by
+(origin_type, origin_id, facility_type, rank):
+
+    origin_type      'ctu' | 'precinct'
+    facility_type    'school' | 'park_and_ride' | 'park_and_pool' | 'transit_stop'
+    rank             1 = nearest
+    distance_m       straight-line distance in metres
+
+Usage:
+    python scripts/nearest_facilities.py [--k N] [--dry-run] [--out rows.ndjson]
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from district_geocoder import JURISDICTION_GPKG, feature_point
+from geometry_measure import lonlat_to_utm
+from gpkg_geometry import decode_gpkg_geometry, geometry_column, primary_key_column
+from precinct_features import PRECINCT_DIR, iter_all_features
+from spatial_index import KDTree, default_feature_table
+from transit_graph import STOP_LAYERS, STOP_NAME_FIELDS
+
+ROOT = Path(__file__).resolve().parent.parent
+SCHOOL_GPKG = ROOT / "minnesota_gov" / "GIS" / "School Data" / "school_structures" / "struc_school_buildings.gpkg"
+
+# facility_type -> (GeoPackage, table or None for the first feature table)
+FACILITY_LAYERS = {
+    'school': (SCHOOL_GPKG, 'struc_school_buildings'),
+    'transit_stop': STOP_LAYERS[0],
+    'park_and_ride': STOP_LAYERS[1],
+    'park_and_pool': STOP_LAYERS[2],
+}
+FACILITY_NAME_FIELDS = ['name'] + STOP_NAME_FIELDS
+PROJECTED_SRS = 26915
+
+DEFAULT_K = 3
+BATCH_SIZE = 1000
+TARGET_SCHEMA = 'civic'
+TARGET_TABLE = 'nearest_facilities'
+
+
+class PointSet:
+    """Ids, names and (n, 2) EPSG:26915 coordinates of one origin or facility layer."""
+
+    def __init__(self, ids: List, names: List, points: np.ndarray):
+        self.ids = ids
+        self.names = names
+        self.points = points
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def collapse_ids(self) -> 'PointSet':
+        """One point per id (the mean of its points), e.g. a city split across counties."""
+        if len(set(self.ids)) == len(self.ids):
+            return self
+        first: Dict = {}
+        group = np.array([first.setdefault(fid, len(first)) for fid in self.ids], dtype=np.int64)
+        counts = np.bincount(group, minlength=len(first))
+        points = np.column_stack([np.bincount(group, self.points[:, axis], minlength=len(first)) / counts
+                                  for axis in range(2)])
+        names = dict(zip(reversed(self.ids), reversed(self.names)))
+        return PointSet(list(first), [names[fid] for fid in first], points)
+
+
+def load_gpkg_points(gpkg_path, table: Optional[str] = None, id_field: Optional[str] = None,
+                     name_fields: Sequence[str] = FACILITY_NAME_FIELDS) -> PointSet:
+    """Read a point or polygon layer (polygons by centroid) as a PointSet in EPSG:26915."""
+    conn = sqlite3.connect(gpkg_path)
+    try:
+        table = table or default_feature_table(conn)
+        geom_col, srs_id = geometry_column(conn, table)
+        if srs_id != PROJECTED_SRS:
+            raise ValueError(f"{table} is EPSG:{srs_id}, expected EPSG:{PROJECTED_SRS}")
+        columns = {r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')}
+        id_col = id_field or primary_key_column(conn, table)
+        name_col = next((c for c in name_fields if c in columns), None)
+        name_sql = f'"{name_col}"' if name_col else 'NULL'
+        ids, names, points = [], [], []
+        for fid, name, blob in conn.execute(f'SELECT "{id_col}", {name_sql}, "{geom_col}" FROM "{table}"'):
+            point = feature_point(decode_gpkg_geometry(blob))
+            if point is not None and fid is not None:
+                ids.append(fid)
+                names.append(name)
+                points.append(point)
+    finally:
+        conn.close()
+    return PointSet(ids, names, np.array(points, dtype=np.float64).reshape(-1, 2))
+
+
+def load_ctu_origins(gpkg_path=JURISDICTION_GPKG) -> PointSet:
+    """One origin per GNIS id; the lookup has a point per county part of a split CTU."""
+    points = load_gpkg_points(gpkg_path, 'Jurisdiction_Lookup_for_Minnesota', 'GNIS_FEATURE_ID', ['FEATURE_NAME'])
+    return points.collapse_ids()
+
+
+def load_precinct_origins(precinct_dir=PRECINCT_DIR) -> PointSet:
+    """Precinct centroids from the WGS84 cd*.md features, projected to UTM 15N."""
+    ids, names, lonlat = [], [], []
+    for feature in iter_all_features(precinct_dir):
+        props = feature.get('properties') or {}
+        point = feature_point(feature.get('geometry'))
+        if point is not None and props.get('PrecinctID'):
+            ids.append(props['PrecinctID'])
+            names.append(props.get('Precinct'))
+            lonlat.append(point)
+    return PointSet(ids, names, lonlat_to_utm(np.array(lonlat, dtype=np.float64).reshape(-1, 2)))
+
+
+def load_facilities(layers: Dict[str, Tuple] = FACILITY_LAYERS) -> Dict[str, PointSet]:
+    """Load every facility layer present on disk; missing GeoPackages are skipped."""
+    return {kind: load_gpkg_points(path, table) for kind, (path, table) in layers.items() if Path(path).exists()}
+
+
+def nearest_rows(origin_type: str, origins: PointSet, facilities: Dict[str, PointSet], k: int = DEFAULT_K) -> List[Dict]:
+    """civic.nearest_facilities rows for the k nearest facilities of each type per origin."""
+    rows = []
+    for facility_type, facility in facilities.items():
+        tree = KDTree.build(facility.points)
+        nearest, distance = tree.query(origins.points, k=k)
+        for i, j in zip(*np.nonzero(nearest >= 0)):
+            f = nearest[i, j]
+            rows.append({
+                'origin_type': origin_type,
+                'origin_id': str(origins.ids[i]),
+                'origin_name': origins.names[i],
+                'facility_type': facility_type,
+                'rank': int(j) + 1,
+                'facility_fid': int(facility.ids[f]),
+                'facility_name': facility.names[f],
+                'distance_m': round(float(distance[i, j]), 1),
+            })
+    return rows
+
+
+def main():
+    args = sys.argv[1:]
+    dry_run = '--dry-run' in args
+    options = {}
+    for flag in ('--k', '--out'):
+        if flag in args:
+            idx = args.index(flag)
+            if idx + 1 >= len(args):
+                print("Usage: python3 nearest_facilities.py [--k N] [--dry-run] [--out rows.ndjson]")
+                sys.exit(1)
+            options[flag] = args[idx + 1]
+    try:
+        k = int(options.get('--k', DEFAULT_K))
+    except ValueError:
+        print(f"Error: --k must be an integer, got {options['--k']}")
+        sys.exit(1)
+
+    if not JURISDICTION_GPKG.exists():
+        print(f"Error: GeoPackage not found: {JURISDICTION_GPKG}")
+        sys.exit(1)
+
+    facilities = load_facilities()
+    for kind, facility in facilities.items():
+        print(f"📁 {kind}: {len(facility):,} facilities")
+    origins = {'ctu': load_ctu_origins(), 'precinct': load_precinct_origins()}
+
+    rows = []
+    for origin_type, points in origins.items():
+        rows.extend(nearest_rows(origin_type, points, facilities, k))
+        print(f"📁 {origin_type}: {len(points):,} origins")
+
+    if '--out' in options:
+        with open(options['--out'], 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        print(f"✅ {len(rows):,} rows -> {options['--out']}")
+        return
+
+    from common import supabase_client
+
+    supabase = supabase_client(dry_run=dry_run)
+    table = supabase.schema(TARGET_SCHEMA).from_(TARGET_TABLE)
+    for start in range(0, len(rows), BATCH_SIZE):
+        table.upsert(rows[start:start + BATCH_SIZE], on_conflict='origin_type,origin_id,facility_type,rank').execute()
+    print(f"✅ {len(rows):,} rows -> {TARGET_SCHEMA}.{TARGET_TABLE}")
+    if dry_run and supabase.report():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
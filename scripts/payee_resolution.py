@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Payee name normalization and entity resolution for checkbook payments.
+
+Payee text arrives with stray whitespace (" THE GARDENS AT FOLEY LLC"),
+inconsistent punctuation and legal-suffix variants (L.L.C., INC.,
+INCORPORATED) that fragment one vendor across years. Names are first
+canonicalized; names that share a core (the name minus legal suffixes and
+a leading THE) are the same payee. Remaining near-duplicates are found by
+comparing character-trigram sets only within blocks of names that share a
+leading token, so the work grows with block sizes rather than n².
+
+Numbers, standalone Roman numerals (I, II, ... XX) and directions (N,
+NORTH, NE, ...) distinguish payees: "OPCO II" and "OPCO", or "... WEST"
+and "... EAST", are never merged by similarity.
+
+Each resolved cluster gets a stable payee ID: the ID already stored for
+one of its cores in checkbook.payments (PAYEE_ID_MAP is only an offline
+fallback), else a hash of its lexicographically smallest core, so neither
+row frequencies, input order nor the machine running the import change it.
+
+Usage:
+    python scripts/payee_resolution.py [output_csv]
+"""
+
+import csv
+import hashlib
+import json
+import re
+import sys
+from collections import Counter, defaultdict
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+PAYEE_ID_MAP = ROOT / ".cache" / "payee_ids.json"
+
+SIMILARITY_THRESHOLD = 0.85
+MAX_BLOCK_SIZE = 400
+
+TOKEN_REPLACEMENTS = {
+    '&': 'AND',
+    'INCORPORATED': 'INC',
+    'CORPORATION': 'CORP',
+    'COMPANY': 'CO',
+    'LIMITED': 'LTD',
+    'SAINT': 'ST',
+    'CENTRE': 'CENTER',
+}
+LEGAL_SUFFIXES = {'LLC', 'INC', 'CORP', 'CO', 'LTD', 'LLP', 'PLLC', 'PC', 'PA', 'LP', 'PLC'}
+
+_DROP_CHARS = re.compile(r"[.,'`\"]")
+_SEPARATORS = re.compile(r'[^A-Z0-9&#]+')
+_ROMAN_NUMERAL = re.compile(r'^X{0,2}(IX|IV|V?I{0,3})$')
+DIRECTIONS = {'N', 'S', 'E', 'W', 'NE', 'NW', 'SE', 'SW', 'NORTH', 'SOUTH', 'EAST', 'WEST',
+              'NORTHEAST', 'NORTHWEST', 'SOUTHEAST', 'SOUTHWEST'}
+
+
+def _join_initials(tokens: List[str]) -> List[str]:
+    """Collapse runs of single letters ("L L C") into one token ("LLC")."""
+    joined, run = [], []
+    for token in tokens + ['']:
+        if len(token) == 1 and token.isalpha():
+            run.append(token)
+            continue
+        if run:
+            joined.append(''.join(run) if len(run) > 1 else run[0])
+            run = []
+        if token:
+            joined.append(token)
+    return joined
+
+
+def canonicalize_payee(name: Optional[str]) -> Optional[str]:
+    """Uppercase, drop punctuation, collapse whitespace and normalize suffix spellings."""
+    if not name or not name.strip():
+        return None
+    text = _DROP_CHARS.sub('', name.upper())
+    text = text.replace('&', ' & ')
+    tokens = _join_initials([t for t in _SEPARATORS.split(text) if t])
+    tokens = [TOKEN_REPLACEMENTS.get(t, t) for t in tokens]
+    return ' '.join(tokens) or None
+
+
+def core_name(canonical: str) -> str:
+    """Strip a leading THE and trailing legal suffixes from a canonical name."""
+    tokens = canonical.split()
+    if len(tokens) > 1 and tokens[0] == 'THE':
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens = tokens[:-1]
+    return ' '.join(tokens)
+
+
+def payee_id(core: str) -> str:
+    """ID for a new payee cluster, from its lexicographically smallest core."""
+    return 'P' + hashlib.sha1(core.encode('utf-8')).hexdigest()[:15]
+
+
+def fetch_payee_ids(supabase, page_size: int = 1000) -> Dict[str, str]:
+    """{core name: payee_id} from the (payee, payee_id) pairs stored in checkbook.payments.
+
+    A core stored under several IDs keeps its most common one (then the smallest).
+    """
+    pairs = Counter()
+    offset = 0
+    while True:
+        result = supabase.schema('checkbook').from_('payments').select('payee,payee_id') \
+            .order('id').range(offset, offset + page_size - 1).execute()
+        rows = result.data or []
+        for row in rows:
+            canonical = canonicalize_payee(row.get('payee'))
+            if canonical and row.get('payee_id'):
+                pairs[(core_name(canonical), row['payee_id'])] += 1
+        if len(rows) < page_size:
+            break
+        offset += page_size
+    ids = {}
+    for (core, pid), count in sorted(pairs.items(), key=lambda kv: (-kv[1], kv[0][1])):
+        ids.setdefault(core, pid)
+    return ids
+
+
+def load_payee_ids(supabase=None, path: Path = PAYEE_ID_MAP) -> Dict[str, str]:
+    """{core name: payee_id} from checkbook.payments, over the local cache from earlier imports.
+
+    The cache only fills in cores the database doesn't have (e.g. offline or dry runs).
+    """
+    ids = {}
+    if Path(path).exists():
+        with open(path, encoding='utf-8') as f:
+            ids = json.load(f)
+    if supabase is not None:
+        ids.update(fetch_payee_ids(supabase))
+    return ids
+
+
+def save_payee_ids(resolved: Dict[str, Dict], known_ids: Dict[str, str], path: Path = PAYEE_ID_MAP) -> None:
+    """Record the ID of every core seen, keeping earlier assignments."""
+    ids = dict(known_ids)
+    for info in resolved.values():
+        ids.setdefault(info['core'], info['payee_id'])
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(ids, f, sort_keys=True, indent=0)
+
+
+def _trigrams(text: str) -> frozenset:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _distinguishing_tokens(text: str) -> frozenset:
+    """Numbers, standalone Roman numerals and directions: names differing in these are different payees."""
+    tokens = text.split()
+    return frozenset(re.findall(r'\d+', text)) | frozenset(
+        t for t in tokens if t in DIRECTIONS or (t and _ROMAN_NUMERAL.match(t)))
+
+
+def _blocking_keys(core: str) -> List[str]:
+    """Keys on the first and last tokens, so a typo in one still lands in a shared block."""
+    tokens = core.split()
+    keys = [f"F:{tokens[0]}:{tokens[1][:1] if len(tokens) > 1 else ''}"]
+    if len(tokens) > 1:
+        keys.append(f"L:{tokens[-1]}:{tokens[0][:1]}")
+    return keys
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _similar_pairs(cores: List[str], threshold: float) -> Iterable[Tuple[int, int]]:
+    grams = [_trigrams(c) for c in cores]
+    distinct = [_distinguishing_tokens(c) for c in cores]
+
+    blocks = defaultdict(list)
+    for idx, core in enumerate(cores):
+        for key in _blocking_keys(core):
+            blocks[key].append(idx)
+
+    seen = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for a, b in combinations(members, 2):
+            if (a, b) in seen:
+                continue
+            seen.add((a, b))
+            # Numbered or directional locations (store #1344 vs #1345, II vs III, WEST vs EAST) differ
+            if distinct[a] != distinct[b]:
+                continue
+            ga, gb = grams[a], grams[b]
+            if min(len(ga), len(gb)) < threshold * max(len(ga), len(gb)):
+                continue
+            if len(ga & gb) >= threshold * len(ga | gb):
+                yield a, b
+
+
+def resolve_payees(names: Iterable[Optional[str]], threshold: float = SIMILARITY_THRESHOLD,
+                   known_ids: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+    """Resolve raw payee names to clusters.
+
+    Returns {raw name: {"payee_id", "canonical_name", "core", "core_name"}},
+    where core is the name's own core and core_name the cluster's display
+    name (most frequent core, then shortest). payee_id comes from known_ids
+    (core -> ID from earlier imports) when any core of the cluster has one,
+    else from the cluster's smallest core.
+    """
+    known_ids = known_ids or {}
+    counts = Counter(n for n in names if n and n.strip())
+
+    raw_core = {}
+    core_counts = Counter()
+    for raw, count in counts.items():
+        canonical = canonicalize_payee(raw)
+        if canonical is None:
+            continue
+        core = core_name(canonical)
+        raw_core[raw] = (canonical, core)
+        core_counts[core] += count
+
+    cores = sorted(core_counts)
+    core_index = {c: i for i, c in enumerate(cores)}
+    clusters = _UnionFind(len(cores))
+    for a, b in _similar_pairs(cores, threshold):
+        clusters.union(a, b)
+
+    members = defaultdict(list)
+    for idx, core in enumerate(cores):
+        members[clusters.find(idx)].append(core)
+    representative, cluster_id = {}, {}
+    for root, group in members.items():
+        representative[root] = min(group, key=lambda c: (-core_counts[c], len(c), c))
+        # group is sorted, so the first known core and group[0] are order-independent
+        cluster_id[root] = next((known_ids[c] for c in group if c in known_ids), None) or payee_id(group[0])
+
+    resolved = {}
+    for raw, (canonical, core) in raw_core.items():
+        root = clusters.find(core_index[core])
+        resolved[raw] = {"payee_id": cluster_id[root], "canonical_name": canonical, "core": core,
+                         "core_name": representative[root]}
+    return resolved
+
+
+if __name__ == "__main__":
+    from import_payees import find_payee_files, parse_payee_file
+
+    output_path = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    names = Counter()
+    for file_path in find_payee_files():
+        _, records, _ = parse_payee_file(file_path)
+        names.update(r['payee'] for r in records if r['payee'])
+
+    resolved = resolve_payees(names.elements(), known_ids=load_payee_ids())
+    clusters = defaultdict(list)
+    for raw, info in resolved.items():
+        clusters[info['payee_id']].append(raw)
+
+    print(f"✅ Resolved {len(names):,} distinct payee strings into {len(clusters):,} payees")
+    merged = sorted((v for v in clusters.values() if len(v) > 1), key=len, reverse=True)
+    print(f"   Payees with more than one spelling: {len(merged):,}")
+    for variants in merged[:10]:
+        print(f"     {' | '.join(sorted(variants)[:4])}")
+
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['payee_id', 'core_name', 'canonical_name', 'raw_name', 'rows'])
+            for raw, info in sorted(resolved.items(), key=lambda kv: (kv[1]['core_name'], kv[0])):
+                writer.writerow([info['payee_id'], info['core_name'], info['canonical_name'], raw, names[raw]])
+        print(f"   Mapping written to {output_path}")
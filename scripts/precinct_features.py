@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for the precinct FeatureCollections in
+minnesota_gov/GIS/Congressional Districts JSON (cd1.md - cd8.md).
+
+The files are GeoJSON written one feature per line, separated by
+trailing commas, inside a .md wrapper. Rather than json.load()ing a whole
+file, features are decoded line by line (falling back to buffering when a
+feature spans several lines), so memory stays bounded by one feature.
+Files can be read in parallel, one worker process per file.
+
+Usage:
+    python scripts/precinct_features.py [precinct_dir]
+"""
+
+import json
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+PRECINCT_DIR = ROOT / "minnesota_gov" / "GIS" / "Congressional Districts JSON"
+
+_decoder = json.JSONDecoder()
+
+
+def precinct_files(precinct_dir=PRECINCT_DIR) -> List[Path]:
+    """Return the cd*.md files in congressional district order."""
+    return sorted(Path(precinct_dir).glob('cd*.md'), key=lambda p: int(p.stem[2:]) if p.stem[2:].isdigit() else 0)
+
+
+def _clean(line: str) -> str:
+    return line.strip().rstrip(',').strip()
+
+
+def read_collection_metadata(path) -> Dict:
+    """Read the top-level members (name, date, ...) that precede the features array."""
+    metadata = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            text = _clean(line)
+            if text in ('{', ''):
+                continue
+            if text.startswith('"features"'):
+                break
+            try:
+                metadata.update(json.loads('{' + text + '}'))
+            except json.JSONDecodeError:
+                continue
+    return metadata
+
+
+def iter_raw_features(path) -> Iterator[str]:
+    """Yield the JSON text of each feature without decoding it."""
+    in_features = False
+    buffer = ''
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not in_features:
+                if '"features"' in line:
+                    in_features = True
+                    rest = line.split('[', 1)[1] if '[' in line else ''
+                    buffer = _clean(rest)
+                continue
+
+            text = _clean(line)
+            if not buffer and text.startswith('{"type":"Feature"') and text.endswith('}'):
+                yield text
+                continue
+            if not buffer and text in (']', '}', ']}', ''):
+                continue
+
+            # Pretty-printed or wrapped feature: buffer until it decodes
+            buffer = f"{buffer}\n{line}" if buffer else line
+            try:
+                _, end = _decoder.raw_decode(buffer.strip())
+            except json.JSONDecodeError:
+                continue
+            yield buffer.strip()[:end]
+            buffer = ''
+
+
+def iter_features(path, transform: Optional[Callable[[dict], Optional[dict]]] = None) -> Iterator[dict]:
+    """Yield decoded features one at a time, optionally mapped through `transform`."""
+    for raw in iter_raw_features(path):
+        feature = json.loads(raw)
+        if transform is not None:
+            feature = transform(feature)
+            if feature is None:
+                continue
+        yield feature
+
+
+def _read_file(args) -> List[dict]:
+    path, transform = args
+    return list(iter_features(path, transform))
+
+
+def iter_all_features(precinct_dir=PRECINCT_DIR, transform: Optional[Callable[[dict], Optional[dict]]] = None,
+                      workers: Optional[int] = None) -> Iterator[dict]:
+    """Yield every statewide precinct feature, parsing files in parallel when workers > 1.
+
+    `transform` must be a module-level function when workers > 1 so it can be
+    sent to the worker processes.
+    """
+    paths = precinct_files(precinct_dir)
+    if not workers or workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield from iter_features(path, transform)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        for features in pool.map(_read_file, [(p, transform) for p in paths]):
+            yield from features
+
+
+if __name__ == "__main__":
+    precinct_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else PRECINCT_DIR
+
+    if not precinct_dir.exists():
+        print(f"ERROR: Precinct directory not found: {precinct_dir}")
+        sys.exit(1)
+
+    for path in precinct_files(precinct_dir):
+        metadata = read_collection_metadata(path)
+        print(f"  {path.name}: {metadata.get('description', metadata.get('name'))} ({metadata.get('date')})")
+
+    senate, house, total = Counter(), Counter(), 0
+    for feature in iter_all_features(precinct_dir, workers=8):
+        props = feature.get('properties') or {}
+        senate[props.get('MNSenDist')] += 1
+        house[props.get('MNLegDist')] += 1
+        total += 1
+
+    print(f"✅ Read {total} precincts ({len(senate)} senate districts, {len(house)} house districts)")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Vectorized reprojection for decoded geometries.
+
+get_transformer(src, dst) returns a cached Transformer per CRS pair; its
+transform() converts a whole (n, 2) coordinate array in one numpy call.
+reproject_geometries() packs every coordinate of every feature in a layer
+into one array, transforms it once and splits it back, so there is no
+per-point (or per-ring) Python work.
+
+Built in, with no extra dependencies:
+
+    EPSG:4326                WGS84 lon/lat
+    EPSG:4269                NAD83 lon/lat (same as 4326 here, see below)
+    EPSG:3857                Web Mercator
+    EPSG:269xx / 326xx / 327xx   NAD83 / WGS84 UTM zones
+
+NAD83 and WGS84 are treated as one datum (they differ by 1-2 m in
+Minnesota), as geometry_measure.py does. Other pairs go through pyproj
+when it is installed.
+
+Usage:
+    python scripts/reproject.py <in.geojson> <out.geojson> <src_epsg> [dst_epsg]
+"""
+
+import json
+import sys
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+
+from geometry_measure import SEMI_MAJOR_AXIS, lonlat_to_utm, utm_to_lonlat
+from gpkg_geometry import iter_coordinate_arrays, to_geojson
+
+try:
+    import pyproj
+    HAS_PYPROJ = True
+except ImportError:
+    HAS_PYPROJ = False
+
+WGS84 = 4326
+NAD83 = 4269
+WEB_MERCATOR = 3857
+SOUTH_FALSE_NORTHING = 10000000.0
+
+
+def utm_zone(srs_id: int) -> Optional[tuple]:
+    """(zone, south) for NAD83 (269xx) and WGS84 (326xx north / 327xx south) UTM codes."""
+    if 26901 <= srs_id <= 26923:
+        return srs_id - 26900, False
+    if 32601 <= srs_id <= 32660:
+        return srs_id - 32600, False
+    if 32701 <= srs_id <= 32760:
+        return srs_id - 32700, True
+    return None
+
+
+def _web_mercator(lonlat: np.ndarray) -> np.ndarray:
+    lat = np.radians(np.clip(lonlat[:, 1], -85.06, 85.06))
+    return np.column_stack([SEMI_MAJOR_AXIS * np.radians(lonlat[:, 0]),
+                            SEMI_MAJOR_AXIS * np.log(np.tan(np.pi / 4 + lat / 2))])
+
+
+def _web_mercator_inverse(xy: np.ndarray) -> np.ndarray:
+    lat = 2 * np.arctan(np.exp(xy[:, 1] / SEMI_MAJOR_AXIS)) - np.pi / 2
+    return np.column_stack([np.degrees(xy[:, 0] / SEMI_MAJOR_AXIS), np.degrees(lat)])
+
+
+def _to_lonlat(srs_id: int) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    if srs_id in (WGS84, NAD83):
+        return lambda coords: coords
+    if srs_id == WEB_MERCATOR:
+        return _web_mercator_inverse
+    zone = utm_zone(srs_id)
+    if zone is None:
+        return None
+    number, south = zone
+    if south:
+        return lambda coords: utm_to_lonlat(coords - [0.0, SOUTH_FALSE_NORTHING], number)
+    return lambda coords: utm_to_lonlat(coords, number)
+
+
+def _from_lonlat(srs_id: int) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    if srs_id in (WGS84, NAD83):
+        return lambda coords: coords
+    if srs_id == WEB_MERCATOR:
+        return _web_mercator
+    zone = utm_zone(srs_id)
+    if zone is None:
+        return None
+    number, south = zone
+    if south:
+        return lambda coords: lonlat_to_utm(coords, number) + [0.0, SOUTH_FALSE_NORTHING]
+    return lambda coords: lonlat_to_utm(coords, number)
+
+
+class Transformer:
+    """Converts (n, 2) coordinate arrays from src_srs to dst_srs."""
+
+    def __init__(self, src_srs: int, dst_srs: int):
+        self.src_srs = src_srs
+        self.dst_srs = dst_srs
+        self.is_identity = src_srs == dst_srs or {src_srs, dst_srs} == {WGS84, NAD83}
+        to_lonlat, from_lonlat = _to_lonlat(src_srs), _from_lonlat(dst_srs)
+        if to_lonlat and from_lonlat:
+            self._steps = [to_lonlat, from_lonlat]
+        elif HAS_PYPROJ:
+            proj = pyproj.Transformer.from_crs(src_srs, dst_srs, always_xy=True)
+            self._steps = [lambda coords: np.column_stack(proj.transform(coords[:, 0], coords[:, 1]))]
+        else:
+            raise ValueError(f"No transform from EPSG:{src_srs} to EPSG:{dst_srs} (install pyproj for other CRSs)")
+
+    def transform(self, coords) -> np.ndarray:
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        if self.is_identity or not len(coords):
+            return coords
+        for step in self._steps:
+            coords = step(coords)
+        return coords
+
+
+@lru_cache(maxsize=None)
+def get_transformer(src_srs: int, dst_srs: int) -> Transformer:
+    """Cached Transformer for a CRS pair."""
+    return Transformer(int(src_srs), int(dst_srs))
+
+
+def _rebuild(geometry: dict, arrays: Iterator[np.ndarray]) -> dict:
+    """Rebuild a geometry from transformed arrays, in iter_coordinate_arrays() order."""
+    geom_type = geometry["type"]
+    if geom_type == 'GeometryCollection':
+        return {"type": geom_type, "geometries": [_rebuild(g, arrays) for g in geometry["geometries"]]}
+    coords = geometry["coordinates"]
+    if geom_type == 'Point':
+        coords = next(arrays)[0]
+    elif geom_type in ('LineString', 'MultiPoint'):
+        coords = next(arrays)
+    elif geom_type in ('Polygon', 'MultiLineString'):
+        coords = [next(arrays) for _ in coords]
+    elif geom_type == 'MultiPolygon':
+        coords = [[next(arrays) for _ in polygon] for polygon in coords]
+    return {"type": geom_type, "coordinates": coords}
+
+
+def reproject_geometries(geometries: List[Optional[dict]], src_srs: int, dst_srs: int) -> List[Optional[dict]]:
+    """Reproject a list of decoded geometries with one transform call for all their coordinates."""
+    transformer = get_transformer(src_srs, dst_srs)
+    arrays = [list(iter_coordinate_arrays(g)) if g else [] for g in geometries]
+    flat = [a for feature in arrays for a in feature]
+    if not flat:
+        return list(geometries)
+    lengths = [len(a) for a in flat]
+    moved = np.split(transformer.transform(np.concatenate(flat)), np.cumsum(lengths)[:-1])
+    it = iter(moved)
+    return [_rebuild(g, it) if g else g for g in geometries]
+
+
+def reproject_geometry(geometry: Optional[dict], src_srs: int, dst_srs: int) -> Optional[dict]:
+    return reproject_geometries([geometry], src_srs, dst_srs)[0]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print("Usage: python3 reproject.py <in.geojson> <out.geojson> <src_epsg> [dst_epsg]")
+        sys.exit(1)
+    in_path, out_path = sys.argv[1], sys.argv[2]
+    try:
+        src_srs = int(sys.argv[3])
+        dst_srs = int(sys.argv[4]) if len(sys.argv) > 4 else WGS84
+        get_transformer(src_srs, dst_srs)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    with open(in_path, encoding='utf-8') as f:
+        collection = json.load(f)
+    features = collection.get('features', [])
+    geometries = reproject_geometries([f.get('geometry') for f in features], src_srs, dst_srs)
+    for feature, geometry in zip(features, geometries):
+        feature['geometry'] = to_geojson(geometry)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(collection, f)
+    print(f"✅ {len(features):,} features EPSG:{src_srs} -> EPSG:{dst_srs} -> {out_path}")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Roster parser for legislator sources: minnesota_gov/senate.md, house.md and
+the JSON rosters in minnesota_gov/peoples/.
+
+Markdown rosters are read in one pass: each line is matched once against
+precompiled header / field patterns and the field label is dispatched
+through FIELD_HANDLERS. JSON rosters (peoples/*.md: a heading followed by a
+JSON array) are decoded directly. Records from every source are merged per
+chamber and district, so the markdown's office, title and email fill in
+around the full names and building IDs from peoples/.
+
+Merged members can go to any sink: seed SQL (generate_senate_seed.py), a
+psql COPY script, or a direct Supabase upsert.
+
+Usage:
+    python scripts/roster_parser.py sql [output_dir]
+    python scripts/roster_parser.py copy [output_file]
+    python scripts/roster_parser.py upsert
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, TextIO
+
+ROOT = Path(__file__).resolve().parent.parent
+GOV_DIR = ROOT / "minnesota_gov"
+PEOPLES_DIR = GOV_DIR / "peoples"
+
+# (path, chamber) in merge priority order: earlier sources win for each field
+ROSTER_SOURCES = [
+    (PEOPLES_DIR / "senate.md", "senate"),
+    (PEOPLES_DIR / "house.md", "house"),
+    (GOV_DIR / "senate.md", "senate"),
+    (GOV_DIR / "house.md", "house"),
+]
+
+DISTRICT_PREFIX = {"senate": "SD", "house": "HD"}
+MEMBER_FIELDS = ['chamber', 'name', 'slug', 'party', 'district', 'title', 'email', 'phone', 'address', 'building_id']
+PEOPLE_COLUMNS = ['name', 'slug', 'party', 'district', 'email', 'phone', 'address', 'building_id']
+
+HEADER_RE = re.compile(r'^##\s+(\d+)\.\s+(.+)$')
+FIELD_RE = re.compile(r'^\*\*([^*:]+):\*\*\s*(.*)$')
+EMAIL_RE = re.compile(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')
+DISTRICT_RE = re.compile(r'(\d+)\s*([A-Za-z]?)')
+
+
+def make_slug(name: str) -> str:
+    slug = re.sub(r'[^a-zA-Z0-9\s-]', '', name.lower())
+    slug = re.sub(r'\s+', '-', slug)
+    return slug.strip('-')
+
+
+def normalize_district(chamber: str, value: Optional[str]) -> Optional[str]:
+    """'35' -> 'SD35', '1a' -> 'HD01A' (the civic.people district format)."""
+    if not value:
+        return None
+    match = DISTRICT_RE.search(str(value))
+    if not match:
+        return str(value).strip()
+    return f"{DISTRICT_PREFIX[chamber]}{int(match.group(1)):02d}{match.group(2).upper()}"
+
+
+def _email(member: Dict, value: str) -> None:
+    match = EMAIL_RE.search(value)
+    member['email'] = match.group(1) if match else None
+
+
+def _phone(member: Dict, value: str) -> None:
+    member['phone'] = value or None
+    member['_in_office'] = False
+
+
+def _office(member: Dict, value: str) -> None:
+    member['_in_office'] = True
+
+
+FIELD_HANDLERS: Dict[str, Callable[[Dict, str], None]] = {
+    'district': lambda m, v: m.__setitem__('district', v or None),
+    'party': lambda m, v: m.__setitem__('party', v or None),
+    'title': lambda m, v: m.__setitem__('title', v or None),
+    'phone': _phone,
+    'email': _email,
+    'office': _office,
+}
+
+
+def _new_member(chamber: str, name: str) -> Dict:
+    member = dict.fromkeys(MEMBER_FIELDS)
+    member.update({'chamber': chamber, 'name': name, '_address': [], '_in_office': False})
+    return member
+
+
+def _finish(member: Dict) -> Dict:
+    address = member.pop('_address')
+    member.pop('_in_office')
+    if address:
+        member['address'] = '\n'.join(address)
+    member['district'] = normalize_district(member['chamber'], member['district'])
+    member['slug'] = make_slug(member['name'])
+    return member
+
+
+def parse_markdown_roster(text: str, chamber: str) -> List[Dict]:
+    """Parse '## N. Name' sections with **Label:** fields and an Office address block."""
+    members = []
+    current = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        header = HEADER_RE.match(line)
+        if header:
+            if current:
+                members.append(_finish(current))
+            current = _new_member(chamber, header.group(2).strip())
+            continue
+        if current is None or not line or line.startswith(('---', '#')):
+            continue
+
+        field = FIELD_RE.match(line)
+        if field:
+            handler = FIELD_HANDLERS.get(field.group(1).strip().lower())
+            if handler:
+                handler(current, field.group(2).strip())
+        elif current['_in_office']:
+            current['_address'].append(line)
+
+    if current:
+        members.append(_finish(current))
+    return members
+
+
+def parse_json_roster(text: str, chamber: str) -> List[Dict]:
+    """Parse a peoples/ roster: optional markdown heading, then a JSON array."""
+    members = []
+    for item in json.loads(text[text.index('['):]):
+        member = _new_member(chamber, item['name'].strip())
+        for field in ('party', 'district', 'email', 'phone', 'building_id'):
+            member[field] = item.get(field) or None
+        members.append(_finish(member))
+    return members
+
+
+def load_roster(path: Path, chamber: str) -> List[Dict]:
+    text = Path(path).read_text(encoding='utf-8')
+    body = '\n'.join(l for l in text.splitlines() if not l.startswith('#')).lstrip()
+    if body.startswith('['):
+        return parse_json_roster(text, chamber)
+    return parse_markdown_roster(text, chamber)
+
+
+def merge_members(records: Iterable[Dict]) -> List[Dict]:
+    """Merge records of the same seat (chamber, district); the first record with a value wins.
+
+    The longest name is kept, so a surname-only header ("Abeler") gives way to
+    the full name from peoples/.
+    """
+    merged: Dict[tuple, Dict] = {}
+    unkeyed = []
+    for record in records:
+        if not record['district']:
+            unkeyed.append(dict(record))
+            continue
+        key = (record['chamber'], record['district'])
+        if key not in merged:
+            merged[key] = dict(record)
+            continue
+        member = merged[key]
+        for field, value in record.items():
+            if member.get(field) is None and value is not None:
+                member[field] = value
+        if len(record['name']) > len(member['name']):
+            member['name'] = record['name']
+            member['slug'] = record['slug']
+
+    # One row per slug so an upsert never touches the same person twice
+    unique: Dict[str, Dict] = {}
+    for member in list(merged.values()) + unkeyed:
+        unique.setdefault(member['slug'], member)
+    return list(unique.values())
+
+
+def load_members(chamber: Optional[str] = None, sources=ROSTER_SOURCES) -> List[Dict]:
+    """Parse and merge every roster source (optionally one chamber)."""
+    records = []
+    for path, source_chamber in sources:
+        if (chamber is None or source_chamber == chamber) and Path(path).exists():
+            records.extend(load_roster(path, source_chamber))
+    return merge_members(records)
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def write_copy(members: List[Dict], stream: TextIO) -> None:
+    """Write a psql script that COPYs members into a staging table and upserts civic.people."""
+    columns = ', '.join(PEOPLE_COLUMNS)
+    stream.write(f"CREATE TEMP TABLE people_stage ({', '.join(f'{c} TEXT' for c in PEOPLE_COLUMNS)});\n")
+    stream.write(f"COPY people_stage ({columns}) FROM stdin;\n")
+    for member in members:
+        stream.write('\t'.join(_copy_value(member[c]) for c in PEOPLE_COLUMNS) + '\n')
+    stream.write("\\.\n")
+    stream.write(f"INSERT INTO civic.people ({columns})\n")
+    stream.write(f"SELECT {', '.join(c + '::uuid' if c == 'building_id' else c for c in PEOPLE_COLUMNS)} FROM people_stage\n")
+    stream.write("ON CONFLICT (slug) DO UPDATE SET\n")
+    updates = [f"  {c} = EXCLUDED.{c}" for c in PEOPLE_COLUMNS if c not in ('slug', 'building_id')]
+    updates.append("  building_id = COALESCE(EXCLUDED.building_id, civic.people.building_id)")
+    stream.write(',\n'.join(updates) + ';\n')
+
+
+def upsert_members(supabase, members: List[Dict], batch_size: int = 500) -> int:
+    """Upsert members straight into civic.people on slug."""
+    rows = [{c: m[c] for c in PEOPLE_COLUMNS} for m in members]
+    for i in range(0, len(rows), batch_size):
+        supabase.schema('civic').from_('people').upsert(rows[i:i + batch_size], on_conflict='slug').execute()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    sink = sys.argv[1] if len(sys.argv) > 1 else 'sql'
+
+    if sink == 'sql':
+        from generate_senate_seed import CHAMBERS, generate_seed_sql
+
+        output_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else Path('.')
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for chamber, config in CHAMBERS.items():
+            members = load_members(chamber)
+            output_path = output_dir / f"seed_mn_{chamber}.sql"
+            output_path.write_text(generate_seed_sql(members, chamber), encoding='utf-8')
+            print(f"✅ {len(members)} {config['label']} -> {output_path}")
+    elif sink == 'copy':
+        members = load_members()
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], 'w', encoding='utf-8') as f:
+                write_copy(members, f)
+            print(f"✅ Wrote COPY script for {len(members)} members to {sys.argv[2]}")
+        else:
+            write_copy(members, sys.stdout)
+    elif sink == 'upsert':
+        from common import supabase_client
+
+        supabase = supabase_client()
+        members = load_members()
+        print(f"✅ Upserted {upsert_members(supabase, members)} members into civic.people")
+    else:
+        print("Usage: python3 roster_parser.py [sql|copy|upsert] [output]")
+        sys.exit(1)
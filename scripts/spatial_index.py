@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Packed Sort-Tile-Recursive (STR) R-tree over feature bounding boxes, and a
+balanced KD-tree over points for k-nearest-neighbour queries.
+
+Built once from a GeoPackage layer (using the envelope in each geometry
+blob header, or the decoded coordinates when the writer left it out),
+saved to a flat binary file and memory-mapped on load. Queries are
+vectorized per tree level, so a batch of millions of query boxes or
+points is pruned to candidate (query, feature) pairs in a few numpy ops.
+
+Usage:
+    python scripts/spatial_index.py <gpkg_path> <output_index_path> [table]
+"""
+
+import sqlite3
+import struct
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from gpkg_geometry import geometry_column, gpkg_bounds, primary_key_column
+
+INDEX_MAGIC = b'STRIDX01'
+NODE_CAPACITY = 16
+QUERY_CHUNK_SIZE = 65536
+KD_LEAF_SIZE = 16
+
+
+def _str_order(boxes: np.ndarray, node_capacity: int) -> np.ndarray:
+    """Return the Sort-Tile-Recursive ordering of boxes."""
+    n = len(boxes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    cx = (boxes[:, 0] + boxes[:, 2]) * 0.5
+    cy = (boxes[:, 1] + boxes[:, 3]) * 0.5
+
+    leaf_count = -(-n // node_capacity)
+    slice_count = int(np.ceil(np.sqrt(leaf_count)))
+    slice_size = slice_count * node_capacity
+
+    by_x = np.argsort(cx, kind='stable')
+    slice_id = np.empty(n, dtype=np.int64)
+    slice_id[by_x] = np.arange(n) // slice_size
+    return np.lexsort((cy, slice_id))
+
+
+def _parent_boxes(level: np.ndarray, node_capacity: int) -> np.ndarray:
+    starts = np.arange(0, len(level), node_capacity)
+    return np.column_stack([
+        np.minimum.reduceat(level[:, 0], starts),
+        np.minimum.reduceat(level[:, 1], starts),
+        np.maximum.reduceat(level[:, 2], starts),
+        np.maximum.reduceat(level[:, 3], starts),
+    ])
+
+
+def _intersects(boxes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    return (
+        (boxes[:, 0] <= query[:, 2]) & (boxes[:, 2] >= query[:, 0]) &
+        (boxes[:, 1] <= query[:, 3]) & (boxes[:, 3] >= query[:, 1])
+    )
+
+
+class STRtree:
+    """Static packed R-tree; level 0 holds item boxes, the last level the root."""
+
+    def __init__(self, boxes: np.ndarray, ids: np.ndarray, level_sizes, node_capacity: int = NODE_CAPACITY):
+        self.boxes = boxes
+        self.ids = ids
+        self.level_sizes = [int(s) for s in level_sizes]
+        self.level_offsets = [0]
+        for size in self.level_sizes[:-1]:
+            self.level_offsets.append(self.level_offsets[-1] + size)
+        self.node_capacity = node_capacity
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, boxes, ids=None, node_capacity: int = NODE_CAPACITY) -> 'STRtree':
+        """Build a tree from an (n, 4) array of (minx, miny, maxx, maxy) boxes."""
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        ids = np.arange(len(boxes), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(boxes):
+            raise ValueError("ids and boxes must have the same length")
+
+        order = _str_order(boxes, node_capacity)
+        level = boxes[order]
+        levels = [level]
+        while len(level) > 1:
+            level = _parent_boxes(level, node_capacity)
+            levels.append(level)
+
+        return cls(np.concatenate(levels) if len(boxes) else boxes, ids[order], [len(l) for l in levels], node_capacity)
+
+    @property
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        if not len(self.ids):
+            return None
+        return tuple(float(v) for v in self.boxes[self.level_offsets[-1]])
+
+    def query_bboxes(self, query, chunk_size: int = QUERY_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (query_index, item_id) pairs for every item box hitting a query box."""
+        query = np.asarray(query, dtype=np.float64).reshape(-1, 4)
+        if not len(self.ids) or not len(query):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        hits_q, hits_item = [], []
+        for start in range(0, len(query), chunk_size):
+            q_idx, item = self._query_chunk(query[start:start + chunk_size])
+            hits_q.append(q_idx + start)
+            hits_item.append(item)
+        return np.concatenate(hits_q), np.concatenate(hits_item)
+
+    def _query_chunk(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        cap = self.node_capacity
+        top = len(self.level_sizes) - 1
+
+        q_idx = np.arange(len(query), dtype=np.int64)
+        node = np.zeros(len(query), dtype=np.int64)
+        keep = _intersects(self.boxes[self.level_offsets[top] + node], query[q_idx])
+        q_idx, node = q_idx[keep], node[keep]
+
+        for child_level in range(top - 1, -1, -1):
+            children = (node[:, None] * cap + np.arange(cap)).ravel()
+            q_idx = np.repeat(q_idx, cap)
+            valid = children < self.level_sizes[child_level]
+            children, q_idx = children[valid], q_idx[valid]
+            keep = _intersects(self.boxes[self.level_offsets[child_level] + children], query[q_idx])
+            q_idx, node = q_idx[keep], children[keep]
+
+        return q_idx, self.ids[node]
+
+    def query(self, bbox) -> np.ndarray:
+        """Return the ids of items whose boxes intersect one (minx, miny, maxx, maxy) box."""
+        return np.sort(self.query_bboxes([bbox])[1])
+
+    def query_points(self, points, chunk_size: int = QUERY_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (point_index, item_id) candidate pairs for an (n, 2) array of points."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return self.query_bboxes(np.hstack([points, points]), chunk_size)
+
+    def save(self, path) -> None:
+        """Write the tree to a flat binary file readable by STRtree.load()."""
+        header = struct.pack(
+            '<8sIIQ', INDEX_MAGIC, self.node_capacity, len(self.level_sizes), len(self.ids)
+        ) + struct.pack(f'<{len(self.level_sizes)}Q', *self.level_sizes)
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(np.ascontiguousarray(self.boxes, dtype='<f8').tobytes())
+            f.write(np.ascontiguousarray(self.ids, dtype='<i8').tobytes())
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> 'STRtree':
+        """Load a saved tree, memory-mapping the node and id arrays by default."""
+        with open(path, 'rb') as f:
+            magic, node_capacity, n_levels, n_items = struct.unpack('<8sIIQ', f.read(24))
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"Not a spatial index file: {path}")
+            level_sizes = struct.unpack(f'<{n_levels}Q', f.read(8 * n_levels))
+
+        n_nodes = sum(level_sizes)
+        boxes_offset = 24 + 8 * n_levels
+        ids_offset = boxes_offset + n_nodes * 32
+        if mmap and n_items:
+            boxes = np.memmap(path, dtype='<f8', mode='r', offset=boxes_offset, shape=(n_nodes, 4))
+            ids = np.memmap(path, dtype='<i8', mode='r', offset=ids_offset, shape=(n_items,))
+        else:
+            raw = Path(path).read_bytes()
+            boxes = np.frombuffer(raw, dtype='<f8', count=n_nodes * 4, offset=boxes_offset).reshape(n_nodes, 4)
+            ids = np.frombuffer(raw, dtype='<i8', count=n_items, offset=ids_offset)
+        return cls(boxes, ids, level_sizes, node_capacity)
+
+
+def _box_distance(boxes: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Distance from each point to its paired box (0 inside)."""
+    dx = np.maximum(np.maximum(boxes[:, 0] - points[:, 0], points[:, 0] - boxes[:, 2]), 0)
+    dy = np.maximum(np.maximum(boxes[:, 1] - points[:, 1], points[:, 1] - boxes[:, 3]), 0)
+    return np.hypot(dx, dy)
+
+
+class KDTree:
+    """Static balanced KD-tree over points, stored as implicit heap-ordered node boxes.
+
+    Level d holds 2**d nodes; node j's children are 2j and 2j+1 on the next
+    level, and the last level's nodes are leaves owning contiguous runs of
+    the reordered points. Every level is split at the median of each node's
+    wider axis in one lexsort, and queries walk all points level by level.
+    """
+
+    def __init__(self, points: np.ndarray, ids: np.ndarray, boxes: np.ndarray, leaf_starts: np.ndarray):
+        self.points = points
+        self.ids = ids
+        self.boxes = boxes
+        self.leaf_starts = leaf_starts
+        self.depth = int(np.log2(len(leaf_starts) - 1))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, points, ids=None, leaf_size: int = KD_LEAF_SIZE) -> 'KDTree':
+        """Build a tree from an (n, 2) array of points."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        ids = np.arange(len(points), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(points):
+            raise ValueError("ids and points must have the same length")
+
+        n = len(points)
+        depth = int(np.ceil(np.log2(n / leaf_size))) if n > leaf_size else 0
+        order = np.arange(n)
+        starts = np.array([0, n], dtype=np.int64)
+        for _ in range(depth):
+            node = np.searchsorted(starts, np.arange(n), side='right') - 1
+            xy = points[order]
+            lo = np.minimum.reduceat(xy, starts[:-1])
+            hi = np.maximum.reduceat(xy, starts[:-1])
+            axis = ((hi - lo)[:, 1] > (hi - lo)[:, 0]).astype(np.int64)
+            key = xy[np.arange(n), axis[node]]
+            order = order[np.lexsort((key, node))]
+            mid = (starts[:-1] + starts[1:]) // 2
+            starts = np.insert(starts, np.arange(1, len(starts)), mid)
+
+        xy = points[order]
+        leaf_boxes = (np.column_stack([np.minimum.reduceat(xy, starts[:-1]), np.maximum.reduceat(xy, starts[:-1])])
+                      if n else np.zeros((1, 4)))
+        levels = [leaf_boxes]
+        for _ in range(depth):
+            child = levels[-1]
+            levels.append(np.column_stack([np.minimum(child[0::2, :2], child[1::2, :2]),
+                                           np.maximum(child[0::2, 2:], child[1::2, 2:])]))
+        boxes = np.concatenate(levels[::-1])
+        return cls(xy, ids[order], boxes, starts)
+
+    def _level(self, depth: int, node: np.ndarray) -> np.ndarray:
+        return self.boxes[(1 << depth) - 1 + node]
+
+    def _leaf_candidates(self, leaf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (row, point position) for every point in each given leaf."""
+        starts, ends = self.leaf_starts[leaf], self.leaf_starts[leaf + 1]
+        counts = ends - starts
+        row = np.repeat(np.arange(len(leaf)), counts)
+        pos = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + starts[row]
+        return row, pos
+
+    def query(self, points, k: int = 1, max_distance: float = np.inf,
+              chunk_size: int = QUERY_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (ids, distances), each (n, k), of the k nearest items per point.
+
+        Missing neighbours (fewer than k items within max_distance) are -1 / inf.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        ids = np.full((len(points), k), -1, dtype=np.int64)
+        dist = np.full((len(points), k), np.inf)
+        if not len(self.ids):
+            return ids, dist
+        for start in range(0, len(points), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            ids[chunk], dist[chunk] = self._query_chunk(points[chunk], k, max_distance)
+        return ids, dist
+
+    def _query_chunk(self, points: np.ndarray, k: int, max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(points)
+        q_all = np.arange(n)
+
+        # Upper bound per point: k-th distance within the leaf reached by always taking the nearer child
+        node = np.zeros(n, dtype=np.int64)
+        for depth in range(1, self.depth + 1):
+            left, right = node * 2, node * 2 + 1
+            nearer = _box_distance(self._level(depth, right), points) < _box_distance(self._level(depth, left), points)
+            node = np.where(nearer, right, left)
+        row, pos = self._leaf_candidates(node)
+        d = np.hypot(*(self.points[pos] - points[row]).T)
+        bound = np.full(n, np.inf)
+        order = np.lexsort((d, row))
+        rank = np.arange(len(order)) - np.searchsorted(row[order], row[order])
+        kth = order[rank == k - 1]
+        bound[row[kth]] = d[kth]
+        bound = np.minimum(bound, max_distance)
+
+        # Exact search: keep (point, node) pairs whose box is within the bound, level by level
+        q_idx, node = q_all, np.zeros(n, dtype=np.int64)
+        for depth in range(1, self.depth + 1):
+            q_idx, node = np.repeat(q_idx, 2), (node[:, None] * 2 + np.arange(2)).ravel()
+            keep = _box_distance(self._level(depth, node), points[q_idx]) <= bound[q_idx]
+            q_idx, node = q_idx[keep], node[keep]
+
+        row, pos = self._leaf_candidates(node)
+        q_idx = q_idx[row]
+        d = np.hypot(*(self.points[pos] - points[q_idx]).T)
+        keep = d <= bound[q_idx]
+        q_idx, pos, d = q_idx[keep], pos[keep], d[keep]
+        order = np.lexsort((d, q_idx))
+        q_idx, pos, d = q_idx[order], pos[order], d[order]
+        rank = np.arange(len(q_idx)) - np.searchsorted(q_idx, q_idx)
+        keep = rank < k
+
+        ids = np.full((n, k), -1, dtype=np.int64)
+        dist = np.full((n, k), np.inf)
+        ids[q_idx[keep], rank[keep]] = self.ids[pos[keep]]
+        dist[q_idx[keep], rank[keep]] = d[keep]
+        return ids, dist
+
+
+def default_feature_table(conn) -> str:
+    """Return the first feature table listed in gpkg_contents."""
+    row = conn.execute(
+        "SELECT table_name FROM gpkg_contents WHERE data_type = 'features' ORDER BY table_name"
+    ).fetchone()
+    if not row:
+        raise ValueError("GeoPackage has no feature tables")
+    return row[0]
+
+
+def build_gpkg_index(gpkg_path, table: Optional[str] = None, node_capacity: int = NODE_CAPACITY) -> STRtree:
+    """Build an STR tree keyed by feature id from one GeoPackage layer."""
+    conn = sqlite3.connect(gpkg_path)
+    try:
+        table = table or default_feature_table(conn)
+        geom_col, _ = geometry_column(conn, table)
+        pk_col = primary_key_column(conn, table)
+
+        ids, boxes = [], []
+        for fid, blob in conn.execute(f'SELECT "{pk_col}", "{geom_col}" FROM "{table}"'):
+            bounds = gpkg_bounds(blob)
+            if bounds is None:
+                continue
+            ids.append(fid)
+            boxes.append(bounds)
+    finally:
+        conn.close()
+
+    return STRtree.build(np.array(boxes, dtype=np.float64).reshape(-1, 4), ids, node_capacity)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python3 spatial_index.py <gpkg_path> <output_index_path> [table]")
+        sys.exit(1)
+
+    gpkg_path = sys.argv[1]
+    output_path = sys.argv[2]
+    table = sys.argv[3] if len(sys.argv) > 3 else None
+
+    if not Path(gpkg_path).exists():
+        print(f"ERROR: GeoPackage file not found: {gpkg_path}")
+        sys.exit(1)
+
+    tree = build_gpkg_index(gpkg_path, table)
+    tree.save(output_path)
+    print(f"✅ Indexed {len(tree)} features ({len(tree.level_sizes)} levels) -> {output_path}")
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Transit network graph from the TransitRoutes lines and the stop layers
+(transit stops when the GeoPackage is present, park-and-ride lots / transit
+centers, park-and-pool lots).
+
+Route vertices are merged on a 1 m grid so routes sharing a street share
+nodes; consecutive vertices become undirected edges weighted by length.
+Each stop is snapped to its nearest route segment (STR tree over segment
+boxes) and joined to both segment ends. The graph is stored in CSR form
+(indptr / indices / weights) in a flat binary file that is memory-mapped
+on load, and cached in the asset store keyed by the input files' digests,
+so unchanged inputs reload instantly.
+
+Bulk queries take (n, 2) arrays of points in the same CRS (EPSG:26915):
+nearest stop, stops within a radius, and network distance from a stop.
+
+Usage:
+    python scripts/transit_graph.py build [output_path]
+    python scripts/transit_graph.py query <points_gpkg> <output_json> [table] [radius_m]
+"""
+
+import hashlib
+import heapq
+import json
+import sqlite3
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gpkg_geometry import decode_gpkg_geometry, geometry_column, iter_coordinate_arrays, primary_key_column
+from spatial_index import STRtree, default_feature_table
+
+ROOT = Path(__file__).resolve().parent.parent
+TRANSIT_DIR = ROOT / "minnesota_gov" / "GIS" / "Transit"
+ROUTES_GPKG = TRANSIT_DIR / "line_routes" / "gpkg_trans_transit_routes" / "trans_transit_routes.gpkg"
+
+# (path, table or None for the first feature table); missing files are skipped
+STOP_LAYERS = [
+    (TRANSIT_DIR / "transit_stops" / "gpkg_trans_transit_stops" / "trans_transit_stops.gpkg", None),
+    (TRANSIT_DIR / "park_and_ride" / "gpkg_trans_park_rides_transit_centers" / "trans_park_rides_transit_centers.gpkg",
+     'ParkAndRideLotsTransitCenters'),
+    (TRANSIT_DIR / "park_and_pool_lots" / "gpkg_trans_park_and_pool_lots" / "trans_park_and_pool_lots.gpkg",
+     'ParkAndPoolLots'),
+]
+STOP_NAME_FIELDS = ['Name', 'StopName', 'stop_name', 'site_on', 'NAME']
+
+GRAPH_MAGIC = b'TRGRAPH1'
+VERTEX_PRECISION = 1.0   # metres; vertices closer than this merge into one node
+SNAP_RADIUS = 500.0      # metres; stops farther than this from every route stay unconnected
+NEAREST_START_RADIUS = 1000.0
+DEFAULT_QUERY_RADIUS = 800.0
+
+
+def _segment_projection(points: np.ndarray, seg: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (t along segment in [0, 1], distance) for paired points and (x0, y0, x1, y1) segments."""
+    d = seg[:, 2:] - seg[:, :2]
+    length_sq = (d ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(length_sq > 0, ((points - seg[:, :2]) * d).sum(axis=1) / length_sq, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    nearest = seg[:, :2] + t[:, None] * d
+    return t, np.hypot(*(points - nearest).T)
+
+
+class TransitGraph:
+    """Undirected weighted graph in CSR form; stops are the last len(stops) nodes."""
+
+    def __init__(self, node_xy, indptr, indices, weights, stop_node, stop_snap, stops: List[dict]):
+        self.node_xy = node_xy
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.stop_node = stop_node
+        self.stop_snap = stop_snap
+        self.stops = stops
+        self._stop_tree = None
+
+    @property
+    def stop_xy(self) -> np.ndarray:
+        return self.node_xy[self.stop_node]
+
+    @classmethod
+    def build(cls, lines: Sequence[np.ndarray], stop_xy, stops: List[dict],
+              precision: float = VERTEX_PRECISION, snap_radius: float = SNAP_RADIUS) -> 'TransitGraph':
+        """Build from route polylines ((n, 2) arrays) and stop points with their properties."""
+        lines = [np.asarray(l, dtype=np.float64).reshape(-1, 2) for l in lines if len(l) >= 2]
+        stop_xy = np.asarray(stop_xy, dtype=np.float64).reshape(-1, 2)
+        all_xy = np.concatenate(lines) if lines else np.zeros((0, 2))
+        line_end = np.cumsum([len(l) for l in lines])
+
+        # Merge coincident vertices (shared stops/streets between routes)
+        keys = np.round(all_xy / precision).astype(np.int64)
+        _, first, vertex = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        vertex = vertex.ravel()
+        vertex_xy = all_xy[first]
+
+        follows = np.ones(len(all_xy), dtype=bool)
+        follows[line_end - 1] = False  # last vertex of a line has no successor
+        src = vertex[:-1][follows[:-1]]
+        dst = vertex[1:][follows[:-1]]
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        seg = np.hstack([vertex_xy[src], vertex_xy[dst]])
+        length = np.hypot(seg[:, 2] - seg[:, 0], seg[:, 3] - seg[:, 1])
+
+        # Snap each stop to its nearest segment within snap_radius
+        n_vertices = len(vertex_xy)
+        stop_node = n_vertices + np.arange(len(stop_xy), dtype=np.int64)
+        stop_snap = np.full(len(stop_xy), np.inf)
+        edge_src, edge_dst, edge_w = [src], [dst], [length]
+        if len(seg) and len(stop_xy):
+            seg_boxes = np.column_stack([np.minimum(seg[:, 0], seg[:, 2]), np.minimum(seg[:, 1], seg[:, 3]),
+                                         np.maximum(seg[:, 0], seg[:, 2]), np.maximum(seg[:, 1], seg[:, 3])])
+            tree = STRtree.build(seg_boxes)
+            stop_idx, seg_idx = tree.query_bboxes(np.hstack([stop_xy - snap_radius, stop_xy + snap_radius]))
+            t, dist = _segment_projection(stop_xy[stop_idx], seg[seg_idx])
+            order = np.lexsort((dist, stop_idx))
+            best = order[np.r_[True, stop_idx[order][1:] != stop_idx[order][:-1]]] if len(order) else order
+            best = best[dist[best] <= snap_radius]
+            s, g, tb, db = stop_idx[best], seg_idx[best], t[best], dist[best]
+            stop_snap[s] = db
+            edge_src += [stop_node[s], stop_node[s]]
+            edge_dst += [src[g], dst[g]]
+            edge_w += [db + tb * length[g], db + (1 - tb) * length[g]]
+
+        a = np.concatenate(edge_src)
+        b = np.concatenate(edge_dst)
+        w = np.concatenate(edge_w)
+        a, b, w = np.concatenate([a, b]), np.concatenate([b, a]), np.concatenate([w, w])
+
+        # Keep the shortest of parallel edges, then lay out CSR rows
+        order = np.lexsort((w, b, a))
+        a, b, w = a[order], b[order], w[order]
+        first_of_pair = np.r_[True, (a[1:] != a[:-1]) | (b[1:] != b[:-1])] if len(a) else np.zeros(0, dtype=bool)
+        a, b, w = a[first_of_pair], b[first_of_pair], w[first_of_pair]
+
+        n_nodes = n_vertices + len(stop_xy)
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(a, minlength=n_nodes), out=indptr[1:])
+        node_xy = np.vstack([vertex_xy, stop_xy])
+        return cls(node_xy, indptr, b.astype(np.int64), w, stop_node, stop_snap, stops)
+
+    def __len__(self) -> int:
+        return len(self.node_xy)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def neighbors(self, node: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def stop_tree(self) -> STRtree:
+        if self._stop_tree is None:
+            xy = self.stop_xy
+            self._stop_tree = STRtree.build(np.hstack([xy, xy]))
+        return self._stop_tree
+
+    def stops_within(self, points, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (point_index, stop_index, distance) for every stop within radius of a point."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        point_idx, stop_idx = self.stop_tree().query_bboxes(np.hstack([points - radius, points + radius]))
+        dist = np.hypot(*(points[point_idx] - self.stop_xy[stop_idx]).T)
+        inside = dist <= radius
+        order = np.lexsort((dist[inside], point_idx[inside]))
+        return point_idx[inside][order], stop_idx[inside][order], dist[inside][order]
+
+    def nearest_stops(self, points, max_radius: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (stop_index or -1, distance or inf) per point, widening the search radius as needed."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        nearest = np.full(len(points), -1, dtype=np.int64)
+        distance = np.full(len(points), np.inf)
+        if not len(self.stops) or not len(points):
+            return nearest, distance
+
+        box = self.stop_tree().bounds
+        span = np.hypot(np.maximum(np.abs(points[:, 0] - box[0]), np.abs(points[:, 0] - box[2])),
+                        np.maximum(np.abs(points[:, 1] - box[1]), np.abs(points[:, 1] - box[3]))).max()
+        limit = span if max_radius is None else min(max_radius, span)
+        pending = np.arange(len(points))
+        radius = min(NEAREST_START_RADIUS, limit)
+        while len(pending):
+            point_idx, stop_idx, dist = self.stops_within(points[pending], radius)
+            if len(point_idx):
+                first = np.r_[True, point_idx[1:] != point_idx[:-1]]
+                found = pending[point_idx[first]]
+                nearest[found], distance[found] = stop_idx[first], dist[first]
+                pending = pending[nearest[pending] < 0]
+            if radius >= limit:
+                break
+            radius = min(radius * 2, limit)
+        return nearest, distance
+
+    def network_distances(self, stop_index: int, limit: float) -> Dict[int, float]:
+        """Dijkstra from a stop over the route network; returns {stop_index: metres} within limit."""
+        node_to_stop = {int(n): i for i, n in enumerate(self.stop_node)}
+        source = int(self.stop_node[stop_index])
+        best = {source: 0.0}
+        heap = [(0.0, source)]
+        reached = {}
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > best.get(node, np.inf):
+                continue
+            if node in node_to_stop:
+                reached[node_to_stop[node]] = d
+            for nxt, w in zip(*self.neighbors(node)):
+                nd = d + float(w)
+                if nd <= limit and nd < best.get(int(nxt), np.inf):
+                    best[int(nxt)] = nd
+                    heapq.heappush(heap, (nd, int(nxt)))
+        return reached
+
+    def save(self, path) -> None:
+        """Write the graph to a flat binary file readable by TransitGraph.load()."""
+        meta = json.dumps(self.stops, ensure_ascii=False).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<8sQQQQ', GRAPH_MAGIC, len(self.node_xy), len(self.indices),
+                                len(self.stop_node), len(meta)))
+            for array, dtype in ((self.node_xy, '<f8'), (self.indptr, '<i8'), (self.indices, '<i8'),
+                                 (self.weights, '<f8'), (self.stop_node, '<i8'), (self.stop_snap, '<f8')):
+                f.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+            f.write(meta)
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> 'TransitGraph':
+        """Load a saved graph, memory-mapping the arrays by default."""
+        with open(path, 'rb') as f:
+            magic, n_nodes, n_edges, n_stops, meta_len = struct.unpack('<8sQQQQ', f.read(40))
+        if magic != GRAPH_MAGIC:
+            raise ValueError(f"Not a transit graph file: {path}")
+
+        shapes = [('<f8', (n_nodes, 2)), ('<i8', (n_nodes + 1,)), ('<i8', (n_edges,)), ('<f8', (n_edges,)),
+                  ('<i8', (n_stops,)), ('<f8', (n_stops,))]
+        raw = None if mmap else Path(path).read_bytes()
+        arrays, offset = [], 40
+        for dtype, shape in shapes:
+            count = int(np.prod(shape))
+            if not count:
+                arrays.append(np.zeros(shape, dtype=dtype))
+            elif mmap:
+                arrays.append(np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape))
+            else:
+                arrays.append(np.frombuffer(raw, dtype=dtype, count=count, offset=offset).reshape(shape))
+            offset += count * 8
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            stops = json.loads(f.read(meta_len).decode('utf-8'))
+        return cls(*arrays, stops)
+
+
+def load_route_lines(gpkg_path=ROUTES_GPKG, table: str = 'TransitRoutes') -> List[np.ndarray]:
+    """Every linestring part of every route as an (n, 2) array."""
+    conn = sqlite3.connect(gpkg_path)
+    try:
+        geom_col, _ = geometry_column(conn, table)
+        lines = []
+        for (blob,) in conn.execute(f'SELECT "{geom_col}" FROM "{table}"'):
+            geometry = decode_gpkg_geometry(blob)
+            if geometry:
+                lines.extend(iter_coordinate_arrays(geometry))
+        return lines
+    finally:
+        conn.close()
+
+
+def load_stops(layers=STOP_LAYERS) -> Tuple[np.ndarray, List[dict]]:
+    """Stop points and {'layer', 'fid', 'name'} properties from every stop layer present."""
+    xy, stops = [], []
+    for path, table in layers:
+        if not Path(path).exists():
+            continue
+        conn = sqlite3.connect(path)
+        try:
+            table = table or default_feature_table(conn)
+            geom_col, _ = geometry_column(conn, table)
+            pk = primary_key_column(conn, table)
+            columns = {r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')}
+            name_col = next((c for c in STOP_NAME_FIELDS if c in columns), None)
+            name_sql = f'"{name_col}"' if name_col else 'NULL'
+            for fid, name, blob in conn.execute(f'SELECT "{pk}", {name_sql}, "{geom_col}" FROM "{table}"'):
+                geometry = decode_gpkg_geometry(blob)
+                if not geometry:
+                    continue
+                point = next(iter_coordinate_arrays(geometry))[0]
+                xy.append(point)
+                stops.append({'layer': table, 'fid': fid, 'name': name})
+        finally:
+            conn.close()
+    return np.array(xy, dtype=np.float64).reshape(-1, 2), stops
+
+
+def input_paths() -> List[Path]:
+    return [ROUTES_GPKG] + [Path(p) for p, _ in STOP_LAYERS if Path(p).exists()]
+
+
+def build_graph() -> TransitGraph:
+    stop_xy, stops = load_stops()
+    return TransitGraph.build(load_route_lines(), stop_xy, stops)
+
+
+def cached_graph() -> TransitGraph:
+    """Load the graph for the current inputs from the asset store, building it once."""
+    from asset_store import AssetStore
+
+    store = AssetStore()
+    digest = hashlib.sha256(''.join(store.file_digest(p) for p in input_paths()).encode()).hexdigest()
+    path = store.derive(digest, 'transit_graph', lambda out: build_graph().save(out),
+                        params={'precision': VERTEX_PRECISION, 'snap_radius': SNAP_RADIUS}, suffix='.bin')
+    store.save()
+    return TransitGraph.load(path)
+
+
+def load_points(gpkg_path, table: Optional[str] = None) -> Tuple[str, List, np.ndarray]:
+    """(table, ids, points) for a point or polygon layer (polygons by centroid)."""
+    from district_geocoder import feature_point
+
+    conn = sqlite3.connect(gpkg_path)
+    try:
+        table = table or default_feature_table(conn)
+        geom_col, _ = geometry_column(conn, table)
+        pk = primary_key_column(conn, table)
+        ids, points = [], []
+        for fid, blob in conn.execute(f'SELECT "{pk}", "{geom_col}" FROM "{table}"'):
+            point = feature_point(decode_gpkg_geometry(blob))
+            if point is not None:
+                ids.append(fid)
+                points.append(point)
+    finally:
+        conn.close()
+    return table, ids, np.array(points, dtype=np.float64).reshape(-1, 2)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+
+    if not ROUTES_GPKG.exists():
+        print(f"ERROR: Transit routes GeoPackage not found: {ROUTES_GPKG}")
+        sys.exit(1)
+
+    if command == 'build':
+        if len(sys.argv) > 2:
+            graph = build_graph()
+            graph.save(sys.argv[2])
+        else:
+            graph = cached_graph()
+        connected = int(np.isfinite(graph.stop_snap).sum())
+        print(f"✅ {len(graph):,} nodes, {graph.edge_count:,} edges, "
+              f"{len(graph.stops)} stops ({connected} snapped to a route)")
+    elif command == 'query':
+        if len(sys.argv) < 4:
+            print("Usage: python3 transit_graph.py query <points_gpkg> <output_json> [table] [radius_m]")
+            sys.exit(1)
+        points_gpkg, output_path = sys.argv[2], sys.argv[3]
+        if not Path(points_gpkg).exists():
+            print(f"ERROR: GeoPackage file not found: {points_gpkg}")
+            sys.exit(1)
+        radius = float(sys.argv[5]) if len(sys.argv) > 5 else DEFAULT_QUERY_RADIUS
+
+        graph = cached_graph()
+        table, ids, points = load_points(points_gpkg, sys.argv[4] if len(sys.argv) > 4 else None)
+        nearest, distance = graph.nearest_stops(points)
+        point_idx, _, _ = graph.stops_within(points, radius)
+        within = np.bincount(point_idx, minlength=len(points))
+
+        records = []
+        for i, fid in enumerate(ids):
+            stop = graph.stops[nearest[i]] if nearest[i] >= 0 else None
+            records.append({
+                'id': fid,
+                'nearest_stop': stop,
+                'nearest_stop_m': round(float(distance[i]), 1) if stop else None,
+                f'stops_within_{int(radius)}m': int(within[i]),
+            })
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2)
+        print(f"✅ {len(records)} {table} features: {int((within > 0).sum())} with a stop within {radius:.0f} m")
+    else:
+        print("Usage: python3 transit_graph.py [build|query] ...")
+        sys.exit(1)
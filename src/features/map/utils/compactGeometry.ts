@@ -0,0 +1,164 @@
+/**
+ * Decoder for the compact binary geometry encoding written by
+ * scripts/geometry_codec.py (quantized, delta-encoded zigzag varints).
+ *
+ * - decodeCompactGeometry: one blob (e.g. civic.ctu_boundaries.geometry_compact)
+ * - byteaToBytes: PostgREST bytea hex text ('\x...') to bytes
+ * - readCompactGeometries: stream (key, geometry) records out of a .mngeom
+ *   container without buffering the whole file
+ */
+
+const FORMAT_VERSION = 1;
+const CONTAINER_MAGIC = 'MNGEOM01';
+const TYPE_NAMES = ['', 'Point', 'LineString', 'Polygon', 'MultiPoint', 'MultiLineString', 'MultiPolygon'] as const;
+
+export type CompactGeometryHeader = {
+  type: (typeof TYPE_NAMES)[number];
+  precision: number;
+  srsId: number | null;
+};
+
+class VarintReader {
+  constructor(private bytes: Uint8Array, public pos = 0) {}
+
+  /** Unsigned LEB128; arithmetic instead of bit ops so values above 2^31 stay exact. */
+  uint(): number {
+    let value = 0;
+    let scale = 1;
+    for (;;) {
+      if (this.pos >= this.bytes.length) throw new Error('Truncated compact geometry');
+      const byte = this.bytes[this.pos++];
+      value += (byte & 0x7f) * scale;
+      if (!(byte & 0x80)) return value;
+      scale *= 128;
+    }
+  }
+
+  int(): number {
+    const v = this.uint();
+    return v % 2 === 0 ? v / 2 : -(v + 1) / 2;
+  }
+}
+
+function readHeader(bytes: Uint8Array, reader: VarintReader): CompactGeometryHeader {
+  const typeCode = bytes[0] & 0x0f;
+  if (bytes.length === 0 || bytes[0] >> 4 !== FORMAT_VERSION || !TYPE_NAMES[typeCode]) {
+    throw new Error('Not a compact geometry blob');
+  }
+  reader.pos = 1;
+  const precision = reader.int();
+  const srsId = reader.uint();
+  return { type: TYPE_NAMES[typeCode], precision, srsId: srsId || null };
+}
+
+export function readCompactGeometryHeader(bytes: Uint8Array): CompactGeometryHeader {
+  return readHeader(bytes, new VarintReader(bytes));
+}
+
+export function decodeCompactGeometry(bytes: Uint8Array): GeoJSON.Geometry {
+  const reader = new VarintReader(bytes);
+  const { type, precision } = readHeader(bytes, reader);
+  const scale = Math.pow(10, precision);
+  let x = 0;
+  let y = 0;
+
+  const points = (n: number): GeoJSON.Position[] => {
+    const out: GeoJSON.Position[] = new Array(n);
+    for (let i = 0; i < n; i++) {
+      x += reader.int();
+      y += reader.int();
+      out[i] = [x / scale, y / scale];
+    }
+    return out;
+  };
+  const ring = (): GeoJSON.Position[] => {
+    const pts = points(reader.uint());
+    if (pts.length) pts.push([pts[0][0], pts[0][1]]);
+    return pts;
+  };
+  const polygon = (): GeoJSON.Position[][] => Array.from({ length: reader.uint() }, ring);
+
+  switch (type) {
+    case 'Point':
+      return { type, coordinates: points(1)[0] };
+    case 'LineString':
+    case 'MultiPoint':
+      return { type, coordinates: points(reader.uint()) };
+    case 'Polygon':
+      return { type, coordinates: polygon() };
+    case 'MultiLineString':
+      return { type, coordinates: Array.from({ length: reader.uint() }, () => points(reader.uint())) };
+    case 'MultiPolygon':
+      return { type, coordinates: Array.from({ length: reader.uint() }, polygon) };
+    default:
+      throw new Error('Not a compact geometry blob');
+  }
+}
+
+export function byteaToBytes(hex: string): Uint8Array {
+  const digits = hex.startsWith('\\x') ? hex.slice(2) : hex;
+  const out = new Uint8Array(digits.length / 2);
+  for (let i = 0; i < out.length; i++) {
+    out[i] = parseInt(digits.substr(i * 2, 2), 16);
+  }
+  return out;
+}
+
+/**
+ * Yield { key, geometry } for each record of a .mngeom container as its bytes arrive.
+ */
+export async function* readCompactGeometries(
+  stream: ReadableStream<Uint8Array>
+): AsyncGenerator<{ key: string; geometry: GeoJSON.Geometry }> {
+  const source = stream.getReader();
+  const decoder = new TextDecoder();
+  let buffer = new Uint8Array(0);
+  let magicChecked = false;
+
+  const append = (chunk: Uint8Array) => {
+    const next = new Uint8Array(buffer.length + chunk.length);
+    next.set(buffer);
+    next.set(chunk, buffer.length);
+    buffer = next;
+  };
+
+  /** Parse one complete record at the start of buffer, or return null if more bytes are needed. */
+  const takeRecord = (): { key: string; blob: Uint8Array } | null => {
+    try {
+      const reader = new VarintReader(buffer);
+      const keyLength = reader.uint();
+      if (reader.pos + keyLength > buffer.length) return null;
+      const key = decoder.decode(buffer.subarray(reader.pos, reader.pos + keyLength));
+      reader.pos += keyLength;
+      const blobLength = reader.uint();
+      if (reader.pos + blobLength > buffer.length) return null;
+      const blob = buffer.slice(reader.pos, reader.pos + blobLength);
+      buffer = buffer.subarray(reader.pos + blobLength);
+      return { key, blob };
+    } catch {
+      return null; // varint split across chunks
+    }
+  };
+
+  for (;;) {
+    const { done, value } = await source.read();
+    if (value) append(value);
+
+    if (!magicChecked && buffer.length >= CONTAINER_MAGIC.length) {
+      if (decoder.decode(buffer.subarray(0, CONTAINER_MAGIC.length)) !== CONTAINER_MAGIC) {
+        throw new Error('Not a compact geometry container');
+      }
+      buffer = buffer.subarray(CONTAINER_MAGIC.length);
+      magicChecked = true;
+    }
+    if (magicChecked) {
+      for (let record = takeRecord(); record; record = takeRecord()) {
+        yield { key: record.key, geometry: decodeCompactGeometry(record.blob) };
+      }
+    }
+    if (done) {
+      if (!magicChecked || buffer.length) throw new Error('Truncated compact geometry container');
+      return;
+    }
+  }
+}
@@ -0,0 +1,16 @@
+-- layers.cities_and_towns: bbox and centroid computed during extraction
+-- scripts/extract_ctu_geometry.py and extract-ctu-simple.py now fill acres,
+-- bbox and centroid from the decoded geometry in one batch.
+
+ALTER TABLE layers.cities_and_towns
+  ADD COLUMN IF NOT EXISTS bbox JSONB,
+  ADD COLUMN IF NOT EXISTS centroid JSONB;
+
+COMMENT ON COLUMN layers.cities_and_towns.acres IS
+  'Equal-area acreage calculated from geometry during import';
+
+COMMENT ON COLUMN layers.cities_and_towns.bbox IS
+  'Bounding box [min_x, min_y, max_x, max_y] in the geometry''s coordinate system';
+
+COMMENT ON COLUMN layers.cities_and_towns.centroid IS
+  'Area-weighted centroid [x, y] in the geometry''s coordinate system';
@@ -0,0 +1,34 @@
+-- Unique key for payee-level payment rows loaded by scripts/import_payees.py
+-- Payee files carry one aggregated row per (budget_period, agency, payee), so
+-- that is the row's identity; a refreshed file updates payment_amount in place.
+-- Agency-level rows (payee IS NULL) never conflict since NULLs are distinct.
+
+-- ============================================================================
+-- STEP 1: Remove duplicate payee rows (keep the newest)
+-- ============================================================================
+
+DELETE FROM checkbook.payments
+WHERE id IN (
+  SELECT id
+  FROM (
+    SELECT id,
+           ROW_NUMBER() OVER (
+             PARTITION BY budget_period, agency, payee
+             ORDER BY created_at DESC, updated_at DESC
+           ) as rn
+    FROM checkbook.payments
+    WHERE agency IS NOT NULL
+      AND payee IS NOT NULL
+  ) t
+  WHERE rn > 1
+);
+
+-- ============================================================================
+-- STEP 2: Add unique index usable as an ON CONFLICT target
+-- ============================================================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_payments_unique_record
+ON checkbook.payments (budget_period, agency, payee);
+
+COMMENT ON INDEX checkbook.idx_payments_unique_record IS
+  'Prevents duplicate payee payment rows; ON CONFLICT target for import_payees.py';
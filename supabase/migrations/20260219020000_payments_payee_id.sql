@@ -0,0 +1,17 @@
+-- Resolved payee identity for checkbook.payments
+-- scripts/import_payees.py clusters payee spelling variants (case, whitespace,
+-- LLC/INC suffixes, near-duplicates) and stores one stable ID per payee, so
+-- grouping by payee_id no longer fragments the same vendor across years.
+
+ALTER TABLE checkbook.payments
+  ADD COLUMN IF NOT EXISTS payee_id TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_payments_payee_id
+  ON checkbook.payments(payee_id)
+  WHERE payee_id IS NOT NULL;
+
+-- Recreate public view so it exposes the new column
+CREATE OR REPLACE VIEW public.payments AS SELECT * FROM checkbook.payments;
+
+COMMENT ON COLUMN checkbook.payments.payee_id IS
+  'Stable resolved payee ID (same vendor across spelling variants and years); NULL for agency-level rows';
@@ -0,0 +1,194 @@
+-- Precomputed checkbook rollups
+-- Written by the importers (scripts/checkbook_rollups.py) in the same pass as
+-- the detail rows, so dashboard totals are key lookups instead of scans over
+-- checkbook.budgets / payments / payroll. Backfilled here from the rows
+-- already loaded so get_budget_stats has data as soon as it reads the rollup.
+
+-- ============================================================================
+-- STEP 1: Create rollup tables
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS checkbook.budget_rollups (
+  budget_period INTEGER NOT NULL,
+  agency TEXT,
+  fund TEXT,
+  program TEXT,
+  available_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  obligated_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  spend_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  remaining_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  budget_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  budget_remaining_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  row_count INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  CONSTRAINT budget_rollups_key UNIQUE NULLS NOT DISTINCT (budget_period, agency, fund, program)
+);
+
+CREATE TABLE IF NOT EXISTS checkbook.payment_rollups (
+  budget_period INTEGER NOT NULL,
+  agency TEXT,
+  payment_amount NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  row_count INTEGER NOT NULL DEFAULT 0,
+  payee_count INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  CONSTRAINT payment_rollups_key UNIQUE NULLS NOT DISTINCT (budget_period, agency)
+);
+
+CREATE TABLE IF NOT EXISTS checkbook.payroll_rollups (
+  fiscal_year TEXT NOT NULL,
+  agency_name TEXT,
+  bargaining_unit_name TEXT,
+  location_county_name TEXT,
+  regular_wages NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  overtime_wages NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  other_wages NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  total_wages NUMERIC(15, 2) NOT NULL DEFAULT 0,
+  position_fte NUMERIC(12, 2) NOT NULL DEFAULT 0,
+  headcount INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  CONSTRAINT payroll_rollups_key UNIQUE NULLS NOT DISTINCT (fiscal_year, agency_name, bargaining_unit_name, location_county_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_budget_rollups_agency ON checkbook.budget_rollups(agency, budget_period);
+CREATE INDEX IF NOT EXISTS idx_payroll_rollups_agency ON checkbook.payroll_rollups(agency_name, fiscal_year);
+CREATE INDEX IF NOT EXISTS idx_payroll_rollups_county ON checkbook.payroll_rollups(location_county_name, fiscal_year);
+
+-- ============================================================================
+-- STEP 2: updated_at triggers
+-- ============================================================================
+
+CREATE TRIGGER update_budget_rollups_updated_at
+  BEFORE UPDATE ON checkbook.budget_rollups
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+CREATE TRIGGER update_payment_rollups_updated_at
+  BEFORE UPDATE ON checkbook.payment_rollups
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+CREATE TRIGGER update_payroll_rollups_updated_at
+  BEFORE UPDATE ON checkbook.payroll_rollups
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+-- ============================================================================
+-- STEP 3: RLS (public read, service_role write) and grants
+-- ============================================================================
+
+ALTER TABLE checkbook.budget_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE checkbook.payment_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE checkbook.payroll_rollups ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view budget rollups" ON checkbook.budget_rollups
+  FOR SELECT TO authenticated, anon USING (true);
+CREATE POLICY "Service role can manage budget rollups" ON checkbook.budget_rollups
+  FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+CREATE POLICY "Anyone can view payment rollups" ON checkbook.payment_rollups
+  FOR SELECT TO authenticated, anon USING (true);
+CREATE POLICY "Service role can manage payment rollups" ON checkbook.payment_rollups
+  FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+CREATE POLICY "Anyone can view payroll rollups" ON checkbook.payroll_rollups
+  FOR SELECT TO authenticated, anon USING (true);
+CREATE POLICY "Service role can manage payroll rollups" ON checkbook.payroll_rollups
+  FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+GRANT SELECT ON checkbook.budget_rollups, checkbook.payment_rollups, checkbook.payroll_rollups TO anon, authenticated;
+GRANT ALL ON checkbook.budget_rollups, checkbook.payment_rollups, checkbook.payroll_rollups TO service_role;
+
+-- ============================================================================
+-- STEP 4: Public schema views for Supabase client access
+-- ============================================================================
+
+CREATE OR REPLACE VIEW public.budget_rollups AS SELECT * FROM checkbook.budget_rollups;
+CREATE OR REPLACE VIEW public.payment_rollups AS SELECT * FROM checkbook.payment_rollups;
+CREATE OR REPLACE VIEW public.payroll_rollups AS SELECT * FROM checkbook.payroll_rollups;
+
+GRANT SELECT ON public.budget_rollups, public.payment_rollups, public.payroll_rollups TO anon, authenticated;
+GRANT ALL ON public.budget_rollups, public.payment_rollups, public.payroll_rollups TO service_role;
+
+-- ============================================================================
+-- STEP 5: Backfill rollups from the existing detail rows
+-- ============================================================================
+
+INSERT INTO checkbook.budget_rollups (
+  budget_period, agency, fund, program,
+  available_amount, obligated_amount, spend_amount, remaining_amount,
+  budget_amount, budget_remaining_amount, row_count
+)
+SELECT
+  budget_period, agency, fund, program,
+  SUM(available_amount), SUM(obligated_amount), SUM(spend_amount), SUM(remaining_amount),
+  SUM(budget_amount), SUM(budget_remaining_amount), COUNT(*)
+FROM checkbook.budgets
+GROUP BY budget_period, agency, fund, program
+ON CONFLICT ON CONSTRAINT budget_rollups_key DO NOTHING;
+
+INSERT INTO checkbook.payment_rollups (budget_period, agency, payment_amount, row_count, payee_count)
+SELECT
+  budget_period, agency,
+  SUM(payment_amount), COUNT(*), COUNT(DISTINCT payee_id)
+FROM checkbook.payments
+GROUP BY budget_period, agency
+ON CONFLICT ON CONSTRAINT payment_rollups_key DO NOTHING;
+
+-- Payroll rows repeat the employee's full earnings on every HR record, so
+-- wages are taken once per temporary_id before summing; FTE is per record.
+INSERT INTO checkbook.payroll_rollups (
+  fiscal_year, agency_name, bargaining_unit_name, location_county_name,
+  regular_wages, overtime_wages, other_wages, total_wages, position_fte, headcount
+)
+SELECT
+  fiscal_year, agency_name, bargaining_unit_name, location_county_name,
+  SUM(regular_wages), SUM(overtime_wages), SUM(other_wages), SUM(total_wages),
+  SUM(position_fte), COUNT(*)
+FROM (
+  SELECT
+    fiscal_year, agency_name, bargaining_unit_name, location_county_name, temporary_id,
+    MAX(regular_wages) AS regular_wages,
+    MAX(overtime_wages) AS overtime_wages,
+    MAX(other_wages) AS other_wages,
+    MAX(total_wages) AS total_wages,
+    COALESCE(SUM(position_fte), 0) AS position_fte
+  FROM checkbook.payroll
+  WHERE fiscal_year IS NOT NULL
+  GROUP BY fiscal_year, agency_name, bargaining_unit_name, location_county_name, temporary_id
+) employees
+GROUP BY fiscal_year, agency_name, bargaining_unit_name, location_county_name
+ON CONFLICT ON CONSTRAINT payroll_rollups_key DO NOTHING;
+
+-- ============================================================================
+-- STEP 6: Serve budget stats from the rollup (same signature as migration 339)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION checkbook.get_budget_stats(p_period INTEGER DEFAULT NULL)
+RETURNS TABLE (
+  total_budget NUMERIC,
+  total_spend NUMERIC
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    COALESCE(SUM(budget_amount), 0)::NUMERIC as total_budget,
+    COALESCE(SUM(spend_amount), 0)::NUMERIC as total_spend
+  FROM checkbook.budget_rollups
+  WHERE (p_period IS NULL OR budget_period = p_period);
+END;
+$$;
+
+-- ============================================================================
+-- STEP 7: Add comments
+-- ============================================================================
+
+COMMENT ON TABLE checkbook.budget_rollups IS 'Budget totals by period, agency, fund and program; rebuilt by scripts/import_budgets.py';
+COMMENT ON TABLE checkbook.payment_rollups IS 'Payment totals and distinct payee counts by period and agency; rebuilt by scripts/import_payees.py';
+COMMENT ON TABLE checkbook.payroll_rollups IS 'Payroll wage totals, headcount and FTE by fiscal year, agency, bargaining unit and county; rebuilt by the payroll importers';
+COMMENT ON COLUMN checkbook.budget_rollups.row_count IS 'Number of checkbook.budgets rows (activities) summed into this row';
+COMMENT ON COLUMN checkbook.payment_rollups.payee_count IS 'Distinct resolved payee_id values';
+COMMENT ON COLUMN checkbook.payroll_rollups.headcount IS 'Distinct employees (temporary_id) in this row; wages are counted once per employee';
+COMMENT ON FUNCTION checkbook.get_budget_stats(INTEGER) IS 'Returns sum of budget_amount and spend_amount for a given period (NULL = all periods), read from budget_rollups';
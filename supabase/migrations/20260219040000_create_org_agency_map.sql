@@ -0,0 +1,50 @@
+-- Create checkbook.org_agency_map
+-- Crosswalk from each source's agency spelling (budgets, payments, payroll)
+-- to one agency_id. Seeded from scripts/agency_crosswalk.py output
+-- (org_agency_map_seed.sql).
+
+-- ============================================================================
+-- STEP 1: Create table
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS checkbook.org_agency_map (
+  source TEXT NOT NULL CHECK (source IN ('budgets', 'payments', 'payroll')),
+  source_name TEXT NOT NULL,
+  agency_id TEXT NOT NULL,
+  canonical_name TEXT NOT NULL,
+  org_id UUID REFERENCES civic.orgs(id) ON DELETE SET NULL,
+  first_year INTEGER,
+  last_year INTEGER,
+  PRIMARY KEY (source, source_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_org_agency_map_agency_id ON checkbook.org_agency_map(agency_id);
+CREATE INDEX IF NOT EXISTS idx_org_agency_map_org_id ON checkbook.org_agency_map(org_id) WHERE org_id IS NOT NULL;
+
+-- ============================================================================
+-- STEP 2: RLS (public read, service_role write) and grants
+-- ============================================================================
+
+ALTER TABLE checkbook.org_agency_map ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view org agency map" ON checkbook.org_agency_map
+  FOR SELECT TO authenticated, anon USING (true);
+CREATE POLICY "Service role can manage org agency map" ON checkbook.org_agency_map
+  FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+GRANT SELECT ON checkbook.org_agency_map TO anon, authenticated;
+GRANT ALL ON checkbook.org_agency_map TO service_role;
+
+CREATE OR REPLACE VIEW public.org_agency_map AS SELECT * FROM checkbook.org_agency_map;
+
+GRANT SELECT ON public.org_agency_map TO anon, authenticated;
+GRANT ALL ON public.org_agency_map TO service_role;
+
+-- ============================================================================
+-- STEP 3: Add comments
+-- ============================================================================
+
+COMMENT ON TABLE checkbook.org_agency_map IS 'Agency name crosswalk across budgets, payments and payroll; generated by scripts/agency_crosswalk.py';
+COMMENT ON COLUMN checkbook.org_agency_map.source_name IS 'Agency name exactly as it appears in the source data';
+COMMENT ON COLUMN checkbook.org_agency_map.agency_id IS 'Stable agency identifier shared by every spelling of the agency';
+COMMENT ON COLUMN checkbook.org_agency_map.org_id IS 'Optional link to the matching civic.orgs row';
@@ -0,0 +1,94 @@
+-- Replace the 11-column budgets unique index with a narrow row digest
+-- idx_budgets_unique_record (migration 338) spans every data column,
+-- including six NUMERIC amounts, and is probed on every import batch.
+-- row_digest is md5 over the same values, computed identically by
+-- scripts/import_budgets.py (budget_row_digest) so the importer can dedupe
+-- client-side and conflict on one indexed column.
+
+-- ============================================================================
+-- STEP 1: Digest function (must match budget_row_digest in import_budgets.py)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION checkbook.budget_row_digest(b checkbook.budgets)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT md5(concat_ws('|',
+    b.budget_period::text,
+    COALESCE(b.agency, ''),
+    COALESCE(b.fund, ''),
+    COALESCE(b.program, ''),
+    COALESCE(b.activity, ''),
+    b.available_amount::text,
+    b.obligated_amount::text,
+    b.spend_amount::text,
+    b.remaining_amount::text,
+    b.budget_amount::text,
+    b.budget_remaining_amount::text
+  ));
+$$;
+
+-- ============================================================================
+-- STEP 2: Add and backfill row_digest
+-- ============================================================================
+
+ALTER TABLE checkbook.budgets
+  ADD COLUMN IF NOT EXISTS row_digest TEXT;
+
+UPDATE checkbook.budgets b
+SET row_digest = checkbook.budget_row_digest(b)
+WHERE row_digest IS NULL;
+
+-- Keep the earliest row of any digest group (normally none after migration 338)
+DELETE FROM checkbook.budgets
+WHERE id IN (
+  SELECT id
+  FROM (
+    SELECT id,
+           ROW_NUMBER() OVER (PARTITION BY row_digest ORDER BY created_at ASC) as rn
+    FROM checkbook.budgets
+  ) t
+  WHERE rn > 1
+);
+
+ALTER TABLE checkbook.budgets
+  ALTER COLUMN row_digest SET NOT NULL;
+
+-- ============================================================================
+-- STEP 3: Compute row_digest on write so it always matches the row
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION checkbook.set_budget_row_digest()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.row_digest := checkbook.budget_row_digest(NEW);
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS set_budgets_row_digest ON checkbook.budgets;
+CREATE TRIGGER set_budgets_row_digest
+  BEFORE INSERT OR UPDATE ON checkbook.budgets
+  FOR EACH ROW
+  EXECUTE FUNCTION checkbook.set_budget_row_digest();
+
+-- ============================================================================
+-- STEP 4: Swap the unique indexes
+-- ============================================================================
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_budgets_row_digest ON checkbook.budgets(row_digest);
+
+DROP INDEX IF EXISTS checkbook.idx_budgets_unique_record;
+
+-- Recreate public view so it exposes the new column
+CREATE OR REPLACE VIEW public.budgets AS SELECT * FROM checkbook.budgets;
+
+-- ============================================================================
+-- STEP 5: Add comments
+-- ============================================================================
+
+COMMENT ON COLUMN checkbook.budgets.row_digest IS 'md5 of all data columns (checkbook.budget_row_digest); unique, used as the import conflict key';
+COMMENT ON INDEX checkbook.idx_budgets_row_digest IS 'Prevents duplicate budget records; replaces idx_budgets_unique_record';
@@ -0,0 +1,63 @@
+-- Create civic.legislative_events
+-- Committee meetings parsed from house_events.md / senate_events.md by
+-- scripts/legislative_events.py. event_key identifies a meeting (chamber +
+-- start time + committee); content_hash lets reloads skip unchanged rows.
+
+-- ============================================================================
+-- STEP 1: Create table
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS civic.legislative_events (
+  event_key TEXT PRIMARY KEY,
+  content_hash TEXT NOT NULL,
+  chamber TEXT NOT NULL CHECK (chamber IN ('house', 'senate')),
+  committee TEXT NOT NULL,
+  committee_type TEXT,
+  starts_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  location TEXT,
+  room TEXT,
+  building TEXT,
+  chair TEXT,
+  canceled BOOLEAN NOT NULL DEFAULT false,
+  agenda TEXT,
+  source TEXT,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_legislative_events_starts_at ON civic.legislative_events(starts_at);
+CREATE INDEX IF NOT EXISTS idx_legislative_events_chamber_starts_at ON civic.legislative_events(chamber, starts_at);
+CREATE INDEX IF NOT EXISTS idx_legislative_events_committee ON civic.legislative_events(committee);
+
+CREATE TRIGGER update_legislative_events_updated_at
+  BEFORE UPDATE ON civic.legislative_events
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+-- ============================================================================
+-- STEP 2: RLS (public read, service_role write) and grants
+-- ============================================================================
+
+ALTER TABLE civic.legislative_events ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view legislative events" ON civic.legislative_events
+  FOR SELECT TO authenticated, anon USING (true);
+CREATE POLICY "Service role can manage legislative events" ON civic.legislative_events
+  FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+GRANT SELECT ON civic.legislative_events TO anon, authenticated;
+GRANT ALL ON civic.legislative_events TO service_role;
+
+CREATE OR REPLACE VIEW public.legislative_events AS SELECT * FROM civic.legislative_events;
+
+GRANT SELECT ON public.legislative_events TO anon, authenticated;
+GRANT ALL ON public.legislative_events TO service_role;
+
+-- ============================================================================
+-- STEP 3: Add comments
+-- ============================================================================
+
+COMMENT ON TABLE civic.legislative_events IS 'House and Senate committee calendar, loaded incrementally by scripts/legislative_events.py';
+COMMENT ON COLUMN civic.legislative_events.event_key IS 'chamber:starts_at:committee-slug';
+COMMENT ON COLUMN civic.legislative_events.content_hash IS 'sha1 of the parsed event fields; unchanged events are not rewritten';
+COMMENT ON COLUMN civic.legislative_events.room IS 'Room number parsed from location (e.g. G-3), NULL when not given';
@@ -0,0 +1,67 @@
+-- Create layers.gpkg_features
+-- Every layer of the shipped GeoPackages (school districts / attendance areas /
+-- buildings, jurisdictions, city boundaries, transit routes, park-and-ride and
+-- park-and-pool lots) loaded by scripts/gpkg_ingest.py through one pipeline.
+-- One row per feature; attributes keep their GeoPackage names in properties.
+
+-- ============================================================================
+-- STEP 1: Create table
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS layers.gpkg_features (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  source TEXT NOT NULL,
+  layer TEXT NOT NULL,
+  fid INTEGER NOT NULL,
+  geometry_type TEXT,
+  srs_id INTEGER,
+  properties JSONB NOT NULL DEFAULT '{}'::jsonb,
+  geometry JSONB,
+  bbox_minx DOUBLE PRECISION,
+  bbox_miny DOUBLE PRECISION,
+  bbox_maxx DOUBLE PRECISION,
+  bbox_maxy DOUBLE PRECISION,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  CONSTRAINT gpkg_features_source_layer_fid_key UNIQUE (source, layer, fid)
+);
+
+CREATE INDEX IF NOT EXISTS idx_gpkg_features_layer ON layers.gpkg_features(layer);
+CREATE INDEX IF NOT EXISTS idx_gpkg_features_bbox
+  ON layers.gpkg_features(bbox_minx, bbox_miny, bbox_maxx, bbox_maxy)
+  WHERE bbox_minx IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_gpkg_features_properties ON layers.gpkg_features USING GIN (properties);
+
+CREATE TRIGGER update_gpkg_features_updated_at
+  BEFORE UPDATE ON layers.gpkg_features
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+-- ============================================================================
+-- STEP 2: RLS (public read, service_role write) and grants
+-- ============================================================================
+
+ALTER TABLE layers.gpkg_features ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view gpkg features" ON layers.gpkg_features
+  FOR SELECT TO authenticated, anon USING (true);
+CREATE POLICY "Service role can manage gpkg features" ON layers.gpkg_features
+  FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+GRANT SELECT ON layers.gpkg_features TO anon, authenticated;
+GRANT ALL ON layers.gpkg_features TO service_role;
+
+CREATE OR REPLACE VIEW public.gpkg_features AS SELECT * FROM layers.gpkg_features;
+
+GRANT SELECT ON public.gpkg_features TO anon, authenticated;
+GRANT ALL ON public.gpkg_features TO service_role;
+
+-- ============================================================================
+-- STEP 3: Add comments
+-- ============================================================================
+
+COMMENT ON TABLE layers.gpkg_features IS 'Features from every GeoPackage layer, loaded by scripts/gpkg_ingest.py';
+COMMENT ON COLUMN layers.gpkg_features.source IS 'GeoPackage file stem (e.g. bdry_jurisdiction)';
+COMMENT ON COLUMN layers.gpkg_features.layer IS 'Layer (table) name from gpkg_contents';
+COMMENT ON COLUMN layers.gpkg_features.fid IS 'Feature primary key within the layer';
+COMMENT ON COLUMN layers.gpkg_features.geometry IS 'GeoJSON geometry in the layer CRS (srs_id, e.g. 26915 = NAD83 UTM 15N); NULL for attribute tables';
@@ -0,0 +1,60 @@
+-- Create civic.nearest_facilities
+-- Precomputed k-nearest school buildings, park-and-ride lots / transit centers,
+-- park-and-pool lots and transit stops for every CTU and voting precinct,
+-- built by scripts/nearest_facilities.py so the app never searches at request time.
+
+-- ============================================================================
+-- STEP 1: Create table
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS civic.nearest_facilities (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  origin_type TEXT NOT NULL CHECK (origin_type IN ('ctu', 'precinct')),
+  origin_id TEXT NOT NULL,
+  origin_name TEXT,
+  facility_type TEXT NOT NULL CHECK (facility_type IN ('school', 'park_and_ride', 'park_and_pool', 'transit_stop')),
+  rank INTEGER NOT NULL CHECK (rank >= 1),
+  facility_fid INTEGER NOT NULL,
+  facility_name TEXT,
+  distance_m NUMERIC(10, 1) NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  CONSTRAINT nearest_facilities_origin_facility_rank_key UNIQUE (origin_type, origin_id, facility_type, rank)
+);
+
+CREATE INDEX IF NOT EXISTS idx_nearest_facilities_facility
+  ON civic.nearest_facilities(facility_type, facility_fid);
+
+CREATE TRIGGER update_nearest_facilities_updated_at
+  BEFORE UPDATE ON civic.nearest_facilities
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+-- ============================================================================
+-- STEP 2: RLS (public read, service_role write) and grants
+-- ============================================================================
+
+ALTER TABLE civic.nearest_facilities ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view nearest facilities" ON civic.nearest_facilities
+  FOR SELECT TO authenticated, anon USING (true);
+CREATE POLICY "Service role can manage nearest facilities" ON civic.nearest_facilities
+  FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+GRANT SELECT ON civic.nearest_facilities TO anon, authenticated;
+GRANT ALL ON civic.nearest_facilities TO service_role;
+
+CREATE OR REPLACE VIEW public.nearest_facilities AS SELECT * FROM civic.nearest_facilities;
+
+GRANT SELECT ON public.nearest_facilities TO anon, authenticated;
+GRANT ALL ON public.nearest_facilities TO service_role;
+
+-- ============================================================================
+-- STEP 3: Add comments
+-- ============================================================================
+
+COMMENT ON TABLE civic.nearest_facilities IS 'k nearest facilities per CTU / precinct, built by scripts/nearest_facilities.py';
+COMMENT ON COLUMN civic.nearest_facilities.origin_id IS 'GNIS feature id (ctu, matches ctu_boundaries.gnis_feature_id) or PrecinctID (precinct)';
+COMMENT ON COLUMN civic.nearest_facilities.facility_fid IS 'Feature id in the source GeoPackage layer';
+COMMENT ON COLUMN civic.nearest_facilities.rank IS '1 = nearest facility of this type';
+COMMENT ON COLUMN civic.nearest_facilities.distance_m IS 'Straight-line distance in metres (NAD83 / UTM 15N)';
@@ -0,0 +1,61 @@
+-- Create civic.boundary_crosswalks
+-- Many-to-many overlaps between cities (CTUs), voting precincts, school districts
+-- and school attendance areas with area-weighted fractions, built offline by
+-- scripts/boundary_overlay.py so the app never intersects polygons at request time.
+
+-- ============================================================================
+-- STEP 1: Create table
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS civic.boundary_crosswalks (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  source_type TEXT NOT NULL CHECK (source_type IN ('ctu', 'precinct', 'school_district', 'attendance_area')),
+  source_id TEXT NOT NULL,
+  source_name TEXT,
+  target_type TEXT NOT NULL CHECK (target_type IN ('ctu', 'precinct', 'school_district', 'attendance_area')),
+  target_id TEXT NOT NULL,
+  target_name TEXT,
+  overlap_m2 DOUBLE PRECISION NOT NULL,
+  source_fraction NUMERIC(7, 6) NOT NULL,
+  target_fraction NUMERIC(7, 6) NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  CONSTRAINT boundary_crosswalks_source_target_key UNIQUE (source_type, source_id, target_type, target_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_boundary_crosswalks_target
+  ON civic.boundary_crosswalks(target_type, target_id);
+
+CREATE TRIGGER update_boundary_crosswalks_updated_at
+  BEFORE UPDATE ON civic.boundary_crosswalks
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at_column();
+
+-- ============================================================================
+-- STEP 2: RLS (public read, service_role write) and grants
+-- ============================================================================
+
+ALTER TABLE civic.boundary_crosswalks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view boundary crosswalks" ON civic.boundary_crosswalks
+  FOR SELECT TO authenticated, anon USING (true);
+CREATE POLICY "Service role can manage boundary crosswalks" ON civic.boundary_crosswalks
+  FOR ALL TO service_role USING (true) WITH CHECK (true);
+
+GRANT SELECT ON civic.boundary_crosswalks TO anon, authenticated;
+GRANT ALL ON civic.boundary_crosswalks TO service_role;
+
+CREATE OR REPLACE VIEW public.boundary_crosswalks AS SELECT * FROM civic.boundary_crosswalks;
+
+GRANT SELECT ON public.boundary_crosswalks TO anon, authenticated;
+GRANT ALL ON public.boundary_crosswalks TO service_role;
+
+-- ============================================================================
+-- STEP 3: Add comments
+-- ============================================================================
+
+COMMENT ON TABLE civic.boundary_crosswalks IS 'Area overlaps between boundary layers, built by scripts/boundary_overlay.py';
+COMMENT ON COLUMN civic.boundary_crosswalks.source_id IS 'GNIS feature id (ctu), PrecinctID (precinct), sdorgid (school_district) or OBJECTID (attendance_area)';
+COMMENT ON COLUMN civic.boundary_crosswalks.overlap_m2 IS 'Overlap area in square metres (NAD83 / UTM 15N plane)';
+COMMENT ON COLUMN civic.boundary_crosswalks.source_fraction IS 'Share of the source feature''s area inside the target feature';
+COMMENT ON COLUMN civic.boundary_crosswalks.target_fraction IS 'Share of the target feature''s area inside the source feature';
@@ -0,0 +1,17 @@
+-- layers.cities_and_towns: compact binary geometry alongside the JSONB geometry
+-- scripts/extract_ctu_geometry.py and extract-ctu-simple.py fill
+-- geometry_compact with scripts/geometry_codec.py; the map client decodes it
+-- with src/features/map/utils/compactGeometry.ts.
+
+ALTER TABLE layers.cities_and_towns
+  ADD COLUMN IF NOT EXISTS geometry_compact BYTEA;
+
+COMMENT ON COLUMN layers.cities_and_towns.geometry_compact IS
+  'Quantized delta/zigzag varint encoding of geometry (scripts/geometry_codec.py): header byte (version << 4 | type), precision, srs_id, then counts and coordinate deltas; polygon rings omit the closing vertex';
+
+-- public.ctu_boundaries was created as SELECT *, which Postgres expands at
+-- creation time; re-create it so the new column is exposed.
+CREATE OR REPLACE VIEW public.ctu_boundaries AS
+  SELECT * FROM layers.cities_and_towns;
+GRANT SELECT ON public.ctu_boundaries TO anon, authenticated;
+GRANT ALL ON public.ctu_boundaries TO service_role;